@@ -1,21 +1,45 @@
-"""Simple alpha–beta AI for Dots & Boxes (3×3 default).
+"""Simple alpha–beta AI for Dots & Boxes (3×3 default, any board size).
 
 Overview
 --------
-- Search: depth-limited **minimax with alpha–beta pruning**.
-- Move ordering: prioritize moves that complete cells (0..2) to improve pruning.
+- Search: depth-limited **minimax with alpha–beta pruning**, optionally
+  iterative deepening under a wall-clock budget (`search`, `best_move`).
+- Move ordering: captures first, then safe moves, sacrifices (third side of a
+  cell) last; the buckets are maintained incrementally by `engine.Board`.
 - Heuristic: score difference from the reference player's perspective.
+- Transpositions: optional Zobrist-keyed `tt.TranspositionTable`; the same
+  edge set reached in a different move order is searched once. With
+  ``symmetric=True`` positions are keyed by their canonical form
+  (`symmetry`), so rotated and mirrored positions share entries too.
+- Symmetry: root moves that are mirror images of each other in a symmetric
+  position are searched once.
+- Book: positions of boards with a built solution table (`book`) are
+  answered by table lookup.
+- Endgame: once no safe move is left the position is solved exactly from
+  its chains and loops (`endgame.solve`) instead of being searched.
+- Instrumentation: pass a `stats.SearchStats` to `search` or `alphabeta`
+  for per-depth node, cutoff, TT and timing counters (JSON exportable).
 
 This implementation is optimized for small boards (3×3). It relies on the
 `GameState` engine to handle the "free extra move after completing a cell"
-rule by leaving the `player` unchanged when appropriate.
+rule by leaving the `player` unchanged when appropriate. The search tree
+itself is walked on the bitmask `engine.Board` with make/unmake, so no
+`GameState` is cloned per node.
 """
 
 from __future__ import annotations
 
-from typing import List, Optional, Tuple
+import threading
+import time
+from typing import List, NamedTuple, Optional, Tuple
 
-from game import GameState, Edge, DOTS, normalize_edge, cell_edges
+from game import GameState, Edge
+from engine import Board
+from endgame import solve as solve_endgame
+from book import get_book
+from symmetry import get_symmetry
+from tt import TranspositionTable, EXACT, LOWER, UPPER
+from stats import SearchStats
 
 
 
@@ -26,22 +50,9 @@ def all_moves(state: GameState) -> List[Edge]:
         state: Current game state.
 
     Returns:
-        List of canonical edges (may be up to 24 on 3×3).
+        List of canonical edges (up to 24 on 3×3), horizontal edges first.
     """
-    moves: List[Edge] = []
-    # horizontal
-    for r in range(DOTS):
-        for c in range(DOTS - 1):
-            e = normalize_edge((r, c), (r, c + 1))
-            if e not in state.edges:
-                moves.append(e)
-    # vertical
-    for r in range(DOTS - 1):
-        for c in range(DOTS):
-            e = normalize_edge((r, c), (r + 1, c))
-            if e not in state.edges:
-                moves.append(e)
-    return moves
+    return [e for e in state.layout.edges if e not in state.edges]
 
 
 def closes_cells_count(state: GameState, e: Edge) -> int:
@@ -54,40 +65,25 @@ def closes_cells_count(state: GameState, e: Edge) -> int:
     Returns:
         int: Number of cells that would be completed (0..2).
     """
-    (r1, c1), (r2, c2) = e
+    layout = state.layout
     cnt = 0
-    if r1 == r2:  # horizontal
-        r = r1
-        c = min(c1, c2)
-        candidates = []
-        if r > 0:
-            candidates.append((r - 1, c))
-        if r < DOTS - 1:
-            candidates.append((r, c))
-    else:  # vertical
-        c = c1
-        r = min(r1, r2)
-        candidates = []
-        if c > 0:
-            candidates.append((r, c - 1))
-        if c < DOTS - 1:
-            candidates.append((r, c))
-    for rr, cc in candidates:
-        top, right, bottom, left = cell_edges(rr, cc)
-        have = int(top in state.edges) + int(right in state.edges) + int(bottom in state.edges) + int(left in state.edges)
+    for cell in layout.edge_cells[layout.edge_index[e]]:
+        have = sum(1 for i in layout.cell_edges[cell] if layout.edges[i] in state.edges)
         if have == 3:
             cnt += 1
     return cnt
 
 
 def ordered_moves(state: GameState) -> List[Edge]:
-    """Return moves ordered by descending ``closes_cells_count``.
+    """Return moves in search order: captures, safe moves, sacrifices last.
 
-    This dramatically improves alpha–beta pruning on 3×3.
+    Safe moves (no cell gets its third side) before sacrifices gives far
+    better alpha–beta cutoffs than ordering by ``closes_cells_count`` alone.
+    The buckets come from `engine.Board`, which keeps them up to date on
+    every make/unmake.
     """
-    ms = all_moves(state)
-    ms.sort(key=lambda e: closes_cells_count(state, e), reverse=True)
-    return ms
+    board = Board.from_state(state)
+    return [state.layout.edges[i] for i in board.ordered_moves()]
 
 
 
@@ -96,7 +92,7 @@ def clone(state: GameState) -> GameState:
 
     All internal containers are copied so subsequent mutations are isolated.
     """
-    c = GameState()
+    c = GameState(state.rows, state.cols)
     c.edges = set(state.edges)
     c.edge_owner = dict(state.edge_owner)
     c.owner = dict(state.owner)
@@ -129,73 +125,394 @@ def evaluate(state: GameState, ref_player: int) -> int:
 
 
 
-def alphabeta(state: GameState, depth: int, alpha: int, beta: int, ref_player: int) -> Tuple[int, Optional[Edge]]:
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget is exhausted."""
+
+
+class SearchResult(NamedTuple):
+    """Outcome of `search`.
+
+    Attributes:
+        move: Selected move.
+        value: Score difference for the player to move at the searched depth.
+        depth: Deepest fully completed iteration (0 if none finished).
+        nodes: Number of nodes visited over all iterations.
+        elapsed_ms: Wall-clock time spent searching.
+    """
+
+    move: Edge
+    value: int
+    depth: int
+    nodes: int
+    elapsed_ms: float
+
+
+class Searcher:
+    """Negamax alpha–beta over a `Board` with an optional deadline.
+
+    Values are score differences from the point of view of the player to
+    move. A move that completes a cell keeps the turn, so the child value is
+    only negated when the player actually changes.
+
+    Moves are made and unmade in place. With a transposition table, stored
+    bounds may end the node early and the stored best move is tried first;
+    since iterative deepening stores every iteration's principal variation
+    in the table, the next iteration searches that line first.
+
+    Attributes:
+        tt: Transposition table or None.
+        deadline: `time.perf_counter()` value after which `SearchTimeout` is
+            raised, or None for no limit.
+        stop: Event that, once set, also raises `SearchTimeout` (used to
+            interrupt a search running in another thread, see `ponder`).
+        endgame: Solve loony endgames exactly with `endgame.solve` instead
+            of searching them.
+        symmetric: Key the transposition table by canonical positions
+            (`symmetry.Symmetry.canonical`); stored moves are kept in the
+            canonical frame and mapped back on probe.
+        stats: Optional collector; the searcher reports beta cutoffs to it.
+        nodes: Nodes visited so far.
+    """
+
+    # The clock and the stop event are checked once every CHECK_EVERY + 1 nodes.
+    CHECK_EVERY = 1023
+    # Canonicalizing costs about as much as a node, so with `symmetric` it
+    # is only done for nodes with at least this much depth left; shallower
+    # nodes use plain keys (the two key spaces do not collide in practice).
+    SYMMETRY_MIN_DEPTH = 2
+
+    def __init__(self, tt: Optional[TranspositionTable] = None, deadline: Optional[float] = None,
+                 endgame: bool = True, symmetric: bool = False,
+                 stats: Optional[SearchStats] = None, stop: Optional[threading.Event] = None) -> None:
+        self.tt = tt
+        self.deadline = deadline
+        self.stop = stop
+        self.endgame = endgame
+        self.symmetric = symmetric
+        self.stats = stats
+        self.nodes = 0
+
+    def tt_key(self, board: Board, depth: int) -> Tuple[int, int]:
+        """Transposition key of `board` and the transform into its frame.
+
+        Returns:
+            Tuple[key, t]: ``t`` is the `symmetry` transform applied to the
+            position (0 = identity); moves stored under ``key`` are in that
+            frame.
+        """
+        if self.symmetric and depth >= self.SYMMETRY_MIN_DEPTH:
+            sym = get_symmetry(board.layout)
+            canon, t = sym.canonical(board.edges)
+            return board.key_with(sym.mask_hash(canon)), t
+        return board.key(), 0
+
+    def negamax(self, board: Board, depth: int, alpha: int, beta: int, first: int = -1) -> Tuple[int, int]:
+        """Search `board` to `depth`; returns (value, edge index or -1).
+
+        Args:
+            board: Position, modified during the search and restored after.
+            depth: Remaining depth in plies.
+            alpha: Lower bound of the window (player to move).
+            beta: Upper bound of the window (player to move).
+            first: Edge index to try first (e.g. previous best root move).
+        """
+        self.nodes += 1
+        if not (self.nodes & self.CHECK_EVERY):
+            if self.deadline is not None and time.perf_counter() >= self.deadline:
+                raise SearchTimeout
+            if self.stop is not None and self.stop.is_set():
+                raise SearchTimeout
+
+        player = board.player
+        if board.edges == board.full:
+            return board.scores[player] - board.scores[1 - player], -1
+        if self.endgame and board.loose == 0 and board.capturable == 0:
+            return solve_endgame(board)
+        if depth == 0:
+            return board.scores[player] - board.scores[1 - player], -1
+
+        tt = self.tt
+        alpha0 = alpha
+        tt_move = first
+        if tt is not None:
+            key, t = self.tt_key(board, depth)
+            entry = tt.probe(key)
+            if entry is not None:
+                _, e_depth, flag, e_value, e_move, _ = entry
+                if t and e_move >= 0:
+                    e_move = get_symmetry(board.layout).unmap_edge(e_move, t)
+                if e_depth >= depth:
+                    if flag == EXACT:
+                        tt.cutoffs += 1
+                        return e_value, e_move
+                    if flag == LOWER and e_value > alpha:
+                        alpha = e_value
+                    elif flag == UPPER and e_value < beta:
+                        beta = e_value
+                    if alpha >= beta:
+                        tt.cutoffs += 1
+                        return e_value, e_move
+                if tt_move < 0:
+                    tt_move = e_move
+
+        moves = board.ordered_moves()
+        if tt_move >= 0:
+            moves.remove(tt_move)
+            moves.insert(0, tt_move)
+
+        value = -10**9
+        best = -1
+        for m in moves:
+            board.make(m)
+            try:
+                if board.player == player:
+                    score, _ = self.negamax(board, depth - 1, alpha, beta)
+                else:
+                    score, _ = self.negamax(board, depth - 1, -beta, -alpha)
+                    score = -score
+            finally:
+                board.unmake()
+            if score > value:
+                value = score
+                best = m
+            if value > alpha:
+                alpha = value
+            if alpha >= beta:
+                if self.stats is not None:
+                    self.stats.cutoff(m == moves[0])
+                break
+
+        if tt is not None:
+            if value <= alpha0:
+                flag = UPPER
+            elif value >= beta:
+                flag = LOWER
+            else:
+                flag = EXACT
+            if t and best >= 0:
+                tt.store(key, depth, flag, value, get_symmetry(board.layout).map_edge(best, t))
+            else:
+                tt.store(key, depth, flag, value, best)
+        return value, best
+
+
+def alphabeta(state: GameState, depth: int, alpha: int, beta: int, ref_player: int,
+              tt: Optional[TranspositionTable] = None,
+              stats: Optional[SearchStats] = None) -> Tuple[int, Optional[Edge]]:
     """Depth-limited alpha–beta minimax.
 
     Important: When a move completes a cell, `GameState.play` keeps the
     current player to move. This naturally yields consecutive MAX or MIN
     layers without special handling.
 
+    The search itself runs on a bitmask `engine.Board` built from `state`;
+    `state` is not modified.
+
     Args:
         state: Current position.
         depth: Remaining depth (plies). Decrements by 1 for each edge drawn.
         alpha: Best value guaranteed for MAX so far.
         beta: Best value guaranteed for MIN so far.
         ref_player: The maximizing player id (root player).
+        tt: Optional transposition table shared between searches.
+        stats: Optional collector; receives one iteration for `depth`.
 
     Returns:
         Tuple[value, best_move]: evaluation and a best move at this node.
     """
-    if depth == 0 or state.is_terminal():
-        return evaluate(state, ref_player), None
+    board = Board.from_state(state)
+    searcher = Searcher(tt, stats=stats)
+    if stats is not None:
+        stats.begin(depth, searcher)
+    if board.player == ref_player:
+        value, m = searcher.negamax(board, depth, alpha, beta)
+    else:
+        value, m = searcher.negamax(board, depth, -beta, -alpha)
+        value = -value
+    if stats is not None:
+        stats.end(searcher)
+    return value, (board.layout.edges[m] if m >= 0 else None)
 
-    best_move: Optional[Edge] = None
-    moves = ordered_moves(state)
 
-    if state.player == ref_player:
-        value = -10**9
-        for m in moves:
-            child = apply_move(state, m)
-            score, _ = alphabeta(child, depth - 1, alpha, beta, ref_player)
-            if score > value:
-                value = score
-                best_move = m
-            alpha = max(alpha, value)
-            if alpha >= beta:
-                break
-        return value, best_move
-    else:
-        value = 10**9
-        for m in moves:
-            child = apply_move(state, m)
-            score, _ = alphabeta(child, depth - 1, alpha, beta, ref_player)
-            if score < value:
-                value = score
-                best_move = m
-            beta = min(beta, value)
-            if alpha >= beta:
-                break
-        return value, best_move
+class _PartialRoot(Exception):
+    """Timeout at the root; carries the best move proven before it hit."""
+
+    def __init__(self, value: int, move: int) -> None:
+        super().__init__()
+        self.value = value
+        self.move = move
 
 
-def best_move(state: GameState, depth: int = 7) -> Edge:
+def _root(searcher: Searcher, board: Board, depth: int, first: int, moves: List[int]) -> Tuple[int, int]:
+    """Root of one iteration: like `Searcher.negamax`, but survives timeouts.
+
+    Only `moves` are searched (the root moves left after symmetry dedupe),
+    the previous best move `first` first. If time runs out after at least
+    one root move has been fully searched, the best of those is reported
+    through `_PartialRoot` (a move better than the previous best with a
+    full window is a proven improvement).
+    """
+    player = board.player
+    moves = list(moves)
+    moves.remove(first)
+    moves.insert(0, first)
+    alpha, beta = -10**9, 10**9
+    value, best = -10**9, -1
+    for m in moves:
+        board.make(m)
+        try:
+            if board.player == player:
+                score, _ = searcher.negamax(board, depth - 1, alpha, beta)
+            else:
+                score, _ = searcher.negamax(board, depth - 1, -beta, -alpha)
+                score = -score
+        except SearchTimeout:
+            raise _PartialRoot(value, best)
+        finally:
+            board.unmake()
+        if score > value:
+            value, best = score, m
+        if value > alpha:
+            alpha = value
+    if searcher.tt is not None:
+        key, t = searcher.tt_key(board, depth)
+        move = get_symmetry(board.layout).map_edge(best, t) if t else best
+        searcher.tt.store(key, depth, EXACT, value, move)
+    return value, best
+
+
+def search(state: GameState, depth: Optional[int] = 7, time_ms: Optional[float] = None,
+           tt: Optional[TranspositionTable] = None, endgame: bool = True, book: bool = True,
+           symmetric: bool = True, stats: Optional[SearchStats] = None,
+           stop: Optional[threading.Event] = None) -> SearchResult:
+    """Iterative-deepening search for the player to move in `state`.
+
+    Depths 1, 2, ... are searched in turn, each one starting from the
+    previous iteration's best move. When `time_ms` runs out the iteration in
+    progress is abandoned and the best move found so far is returned: the
+    last completed iteration's move, or a better one already proven in the
+    interrupted iteration.
+
+    Positions covered by a solution table (`book.get_book`) are answered
+    from it without searching. Loony endgames (no safe move left, see
+    `endgame`) are solved exactly: at the root this returns at once, deeper
+    in the tree it replaces the search of that subtree.
+
+    Root moves that a symmetry of the position maps onto an earlier root
+    move have the same value and are skipped; this does not change the
+    result.
+
+    Args:
+        state: Current position (whose `player` is to move).
+        depth: Maximum depth in plies; None searches until the time budget
+            runs out, `stop` is set or the game tree is exhausted.
+        time_ms: Wall-clock budget in milliseconds, or None for no limit.
+        tt: Transposition table to use; a fresh one is created if omitted.
+        endgame: Use the exact endgame solver.
+        book: Use the solution table of this board size if one is built.
+        symmetric: Share transposition entries between symmetric positions
+            (see `Searcher`).
+        stats: Optional collector; receives one entry per iteration, the
+            interrupted one included (marked not completed).
+        stop: Event that ends the search like an exhausted time budget
+            when set from another thread.
+
+    Returns:
+        SearchResult: move, value, completed depth and node count. A solved
+        position (book or endgame) reports the number of remaining edges as
+        its depth.
+
+    Raises:
+        RuntimeError: If the position has no legal moves.
+        ValueError: If none of `depth`, `time_ms` and `stop` is given.
+    """
+    if depth is None and time_ms is None and stop is None:
+        raise ValueError("Podaj głębokość lub limit czasu.")
+    start = time.perf_counter()
+    board = Board.from_state(state)
+    moves = board.moves()
+    if not moves:
+        raise RuntimeError("No legal moves available")
+    if book:
+        table = get_book(board.layout)
+        hit = table.best_move(board) if table is not None else None
+        if hit is not None:
+            if stats is not None:
+                stats.source = "book"
+            elapsed = (time.perf_counter() - start) * 1000.0
+            return SearchResult(board.layout.edges[hit[1]], hit[0], len(moves), 0, elapsed)
+    if endgame and board.is_loony():
+        value, m = solve_endgame(board)
+        if stats is not None:
+            stats.source = "endgame"
+        elapsed = (time.perf_counter() - start) * 1000.0
+        return SearchResult(board.layout.edges[m], value, len(moves), 1, elapsed)
+    if tt is None:
+        tt = TranspositionTable()
+    tt.new_search()
+
+    deadline = None if time_ms is None else start + time_ms / 1000.0
+    searcher = Searcher(tt, deadline, endgame, symmetric, stats, stop)
+    max_depth = len(moves) if depth is None else min(depth, len(moves))
+
+    moves = get_symmetry(board.layout).unique_moves(board.edges, board.ordered_moves())
+    best, value, done = moves[0], 0, 0
+    for d in range(1, max_depth + 1):
+        if stats is not None:
+            stats.begin(d, searcher)
+        try:
+            value, best = _root(searcher, board, d, best, moves)
+        except _PartialRoot as partial:
+            if stats is not None:
+                stats.end(searcher, completed=False)
+            if partial.move >= 0:
+                value, best = partial.value, partial.move
+            break
+        if stats is not None:
+            stats.end(searcher)
+        done = d
+
+    elapsed = (time.perf_counter() - start) * 1000.0
+    return SearchResult(board.layout.edges[best], value, done, searcher.nodes, elapsed)
+
+
+def best_move(state: GameState, depth: Optional[int] = 7, tt: Optional[TranspositionTable] = None,
+              time_ms: Optional[float] = None, workers: Optional[int] = None, endgame: bool = True,
+              book: bool = True, symmetric: bool = True) -> Edge:
     """Choose the best move for the current player in `state`.
 
     Args:
         state: Current position (whose `player` is to move).
-        depth: Search depth in plies; 6–8 is sufficient for 3×3.
+        depth: Search depth in plies; 6–8 is sufficient for 3×3. With
+            `time_ms` it only caps the depth (None = no cap).
+        tt: Transposition table to use (and keep filling). A fresh table is
+            created when omitted; pass one in to reuse it between moves.
+        time_ms: Optional time budget in milliseconds, e.g. ``200`` for
+            "best move within 200 ms" (see `search`).
+        workers: With more than one worker, split the search over that
+            many processes on a shared long-lived pool
+            (`parallel.get_searcher`). The parallel search is fixed-depth
+            and deterministic, and its workers keep their own tables, so it
+            takes neither `time_ms` nor `tt`.
+        endgame: Switch to the exact solver in loony endgames (`endgame`).
+        book: Answer from the board size's solution table when available.
+        symmetric: Share transposition entries between symmetric positions.
 
     Returns:
         Edge: Selected move.
 
-    Notes:
-        If `depth` is 0 or the position is terminal, a fallback legal move
-        (if any) is returned.
+    Raises:
+        RuntimeError: If the position has no legal moves.
+        ValueError: If `workers` is combined with `time_ms`, `tt` or no
+            `depth`.
     """
-    value, mv = alphabeta(state, depth, -10**9, 10**9, ref_player=state.player)
-    if mv is None:
-        ms = all_moves(state)
-        if not ms:
-            raise RuntimeError("No legal moves available")
-        return ms[0]
-    return mv
\ No newline at end of file
+    if workers is not None and workers > 1:
+        if time_ms is not None or depth is None:
+            raise ValueError("Wyszukiwanie równoległe wymaga stałej głębokości.")
+        if tt is not None:
+            raise ValueError("Wyszukiwanie równoległe nie korzysta z przekazanej tablicy transpozycji.")
+        from parallel import get_searcher
+        return get_searcher(workers).search(state, depth=depth, endgame=endgame, book=book,
+                                            symmetric=symmetric).move
+    return search(state, depth=depth, time_ms=time_ms, tt=tt, endgame=endgame, book=book,
+                  symmetric=symmetric).move
@@ -0,0 +1,152 @@
+"""Batch analysis of recorded games: evaluation loss of every move.
+
+Records (`records`) are streamed from a file, replayed on the bitmask
+`engine.Board`, and every move is compared with the best move at a fixed
+depth, using the same negamax search as `ai.alphabeta`:
+
+    loss = value(best move) - value(played move)
+
+both from the mover's point of view (0 = the move was as good as the
+search's choice). Games are analyzed in a `ProcessPoolExecutor`; at most
+`max_in_flight` games are submitted at a time and results are written in
+input order as soon as they are ready, so memory use does not grow with
+the size of the corpus.
+
+Example::
+
+    python analyze.py games.dbr --depth 6 --workers 4 --out annotated.jsonl
+
+The output has one JSON line per game (the moves with their losses), and
+a summary with average loss per player and blunder counts is printed.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
+
+from game import get_layout
+from engine import Board
+from ai import Searcher
+from records import GameRecord, read_records
+from tt import TranspositionTable
+
+
+_INF = 10**9
+
+# A move losing at least this much counts as a blunder in the summary.
+BLUNDER: int = 2
+
+
+def _value_for(searcher: Searcher, board: Board, depth: int, player: int) -> int:
+    """Depth-limited value of `board` for `player` (like `ai.alphabeta`)."""
+    value, _ = searcher.negamax(board, depth, -_INF, _INF)
+    return value if board.player == player else -value
+
+
+def analyze_game(record: GameRecord, depth: int = 5) -> dict:
+    """Annotate every move of `record` with its evaluation loss.
+
+    Returns:
+        dict: ``rows``, ``cols``, ``started``, the ``moves`` (edge, player,
+        t_ms, best, played, loss) and the ``scores`` at the end.
+    """
+    board = Board(get_layout(record.rows, record.cols))
+    searcher = Searcher(TranspositionTable(1 << 16))
+    moves = []
+    for m in record.moves:
+        if board.player != m.player:
+            raise ValueError(f"Ruch {m.edge}: oczekiwano gracza {board.player}, jest {m.player}")
+        if board.edges >> m.edge & 1:
+            raise ValueError(f"Krawędź {m.edge} jest już narysowana")
+        player = board.player
+        best = _value_for(searcher, board, depth, player)
+        board.make(m.edge)
+        played = _value_for(searcher, board, max(depth - 1, 0), player)
+        moves.append({"edge": m.edge, "player": player, "t_ms": m.t_ms,
+                      "best": best, "played": played, "loss": max(0, best - played)})
+    return {"rows": record.rows, "cols": record.cols, "started": record.started,
+            "moves": moves, "scores": list(board.scores)}
+
+
+def analyze_stream(records: Iterable[GameRecord], depth: int = 5, workers: Optional[int] = None,
+                   max_in_flight: Optional[int] = None) -> Iterator[dict]:
+    """Analyze `records` in parallel, yielding `analyze_game` results in order.
+
+    Args:
+        records: Any iterable of records; it is consumed lazily.
+        depth: Search depth per move.
+        workers: Worker processes (default: CPU count).
+        max_in_flight: Games submitted but not yet yielded (default: 4 per
+            worker); this bounds memory use.
+    """
+    workers = workers or os.cpu_count() or 1
+    limit = max_in_flight or 4 * workers
+    pending: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        for record in records:
+            pending.append(pool.submit(analyze_game, record, depth))
+            if len(pending) >= limit:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+class Summary:
+    """Running totals over annotated games (constant memory)."""
+
+    def __init__(self) -> None:
+        self.games = 0
+        self.moves = [0, 0]
+        self.loss = [0, 0]
+        self.blunders = [0, 0]
+
+    def add(self, game: dict) -> None:
+        self.games += 1
+        for m in game["moves"]:
+            p = m["player"]
+            self.moves[p] += 1
+            self.loss[p] += m["loss"]
+            if m["loss"] >= BLUNDER:
+                self.blunders[p] += 1
+
+    def to_dict(self) -> Dict[str, object]:
+        return {
+            "games": self.games,
+            "moves": self.moves,
+            "avg_loss": [self.loss[p] / self.moves[p] if self.moves[p] else 0.0 for p in (0, 1)],
+            "blunders": self.blunders,
+        }
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Annotate recorded Dots & Boxes games with evaluation loss")
+    parser.add_argument("input", help="Record file (.jsonl or binary)")
+    parser.add_argument("--depth", type=int, default=5, help="Search depth per move")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--in-flight", type=int, default=None, help="Max games in flight")
+    parser.add_argument("--limit", type=int, default=None, help="Analyze only the first N games")
+    parser.add_argument("--out", default=None, help="Annotated JSONL output (default: none)")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    summary = Summary()
+    out = open(args.out, "w", encoding="utf-8") if args.out else None
+    try:
+        for game in analyze_stream(read_records(args.input, args.limit), args.depth, args.workers,
+                                   args.in_flight):
+            summary.add(game)
+            if out is not None:
+                out.write(json.dumps(game) + "\n")
+    finally:
+        if out is not None:
+            out.close()
+    json.dump(summary.to_dict(), sys.stdout, indent=2)
+    print()
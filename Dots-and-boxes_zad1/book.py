@@ -0,0 +1,319 @@
+"""Complete solution database ("book") for small Dots & Boxes boards.
+
+The value of a position only depends on its drawn edges: the boxes already
+won do not change how the rest should be played. A board with E edges
+therefore has at most 2**E positions, which for 3×3 (24 edges) is small
+enough to solve them all.
+
+On-disk format
+--------------
+``<name>.bin`` is a flat byte array of length ``2**E`` indexed by edge
+bitmask and opened with `mmap`. Only canonical masks (see `symmetry`) are
+filled in; byte ``0`` means "not solved yet", any other byte ``b`` stores
+``b - 128`` = the net number of boxes the player to move will still gain
+(own minus opponent's) with perfect play from that position. A JSON
+sidecar ``<name>.json`` records the board size and the build progress.
+
+Building
+--------
+Positions are solved layer by layer, from all edges drawn down to the
+empty board, each layer only reading the one above it. A layer is split
+into tasks by the pattern of its highest edge bits; tasks run in a
+`ProcessPoolExecutor` and write straight into the shared memory map.
+Finished layers (and, every few seconds, finished tasks) are recorded in
+the sidecar, so an interrupted build resumes where it stopped::
+
+    python book.py --rows 3 --cols 3 --workers 8
+
+Lookup
+------
+`SolutionBook.best_move` evaluates every move of a position from the
+table, which takes tens of microseconds. `ai.search` consults the book of
+the board size automatically when the file exists (`get_book`).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import mmap
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from game import Layout, get_layout
+from engine import Board
+from symmetry import get_symmetry
+
+
+FORMAT_VERSION: int = 1
+# 2**26 bytes = 64 MiB; larger boards are out of reach for a full table.
+MAX_EDGES: int = 26
+# Tasks per layer = 2**PREFIX_BITS.
+PREFIX_BITS: int = 6
+# Minimum seconds between progress checkpoints inside a layer.
+CHECKPOINT_EVERY: float = 5.0
+
+BOOK_DIR: str = os.path.join(os.path.dirname(os.path.abspath(__file__)), "books")
+
+
+def book_path(layout: Layout) -> str:
+    """Default table path for a board size, e.g. ``books/3x3.bin``."""
+    return os.path.join(BOOK_DIR, f"{layout.rows}x{layout.cols}.bin")
+
+
+def _same_popcount(k: int, width: int) -> Iterator[int]:
+    """All `width`-bit integers with exactly `k` bits set, increasing."""
+    if k == 0:
+        yield 0
+        return
+    m = (1 << k) - 1
+    limit = 1 << width
+    while m < limit:
+        yield m
+        c = m & -m
+        r = m + c
+        m = (((r ^ m) >> 2) // c) | r
+
+
+def _cell_masks(layout: Layout) -> List[int]:
+    """Edge mask of every cell's four sides."""
+    return [sum(1 << e for e in edges) for edges in layout.cell_edges]
+
+
+class SolutionBook:
+    """Read access to a solution table.
+
+    Attributes:
+        layout: Board size of the table.
+        path: Path of the ``.bin`` file.
+    """
+
+    def __init__(self, path: str, layout: Layout) -> None:
+        self.layout = layout
+        self.path = path
+        self._sym = get_symmetry(layout)
+        self._cell_masks = _cell_masks(layout)
+        with open(path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._mm) != 1 << layout.num_edges:
+            raise ValueError(f"{path}: zły rozmiar tablicy dla planszy {layout.rows}x{layout.cols}")
+
+    def close(self) -> None:
+        """Release the memory map."""
+        self._mm.close()
+
+    def value(self, edges: int) -> Optional[int]:
+        """Net boxes still to be gained by the player to move, or None if unknown."""
+        b = self._mm[self._sym.canonical(edges)[0]]
+        return b - 128 if b else None
+
+    def best_move(self, board: Board) -> Optional[Tuple[int, int]]:
+        """Perfect move for `board` from the table.
+
+        Moves are tried in `Board.ordered_moves` order, skipping symmetric
+        duplicates; the first best one wins.
+
+        Returns:
+            Tuple[value, edge index] with the final score difference for the
+            player to move, or None if the table does not cover the position.
+        """
+        edges = board.edges
+        edge_cells, cell_masks = self.layout.edge_cells, self._cell_masks
+        best, move = -10**9, -1
+        for e in self._sym.unique_moves(edges, board.ordered_moves()):
+            child = edges | (1 << e)
+            v = self.value(child)
+            if v is None:
+                return None
+            k = 0
+            for c in edge_cells[e]:
+                if child & cell_masks[c] == cell_masks[c]:
+                    k += 1
+            v = k + v if k else -v
+            if v > best:
+                best, move = v, e
+        if move < 0:
+            return None
+        p = board.player
+        return board.scores[p] - board.scores[1 - p] + best, move
+
+
+_BOOKS: Dict[Tuple[int, int], SolutionBook] = {}
+
+
+def get_book(layout: Layout) -> Optional[SolutionBook]:
+    """Book at the default path for this board size, or None if there is none.
+
+    Only found books are cached, so a book built later in the same process
+    (e.g. by `build`) is picked up by the next call.
+    """
+    key = (layout.rows, layout.cols)
+    book = _BOOKS.get(key)
+    if book is None:
+        path = book_path(layout)
+        if not os.path.exists(path):
+            return None
+        book = _BOOKS[key] = SolutionBook(path, layout)
+    return book
+
+
+# --------------------------------------------------------------------------
+# Builder
+# --------------------------------------------------------------------------
+
+# Per-worker state, set by `_init_builder`.
+_mm: Optional[mmap.mmap] = None
+_layout: Optional[Layout] = None
+
+
+def _init_builder(path: str, rows: int, cols: int) -> None:
+    """Pool initializer: map the table read-write once per worker."""
+    global _mm, _layout
+    _layout = get_layout(rows, cols)
+    f = open(path, "r+b")
+    _mm = mmap.mmap(f.fileno(), 0)
+
+
+def _solve_task(layer: int, prefix: int) -> int:
+    """Solve all canonical positions of one layer sharing the top-bit `prefix`.
+
+    Returns:
+        int: Number of positions solved.
+    """
+    layout = _layout
+    mm = _mm
+    sym = get_symmetry(layout)
+    canonical = sym.canonical
+    edge_cells, cell_masks = layout.edge_cells, _cell_masks(layout)
+    full = layout.full_mask
+    low_bits = layout.num_edges - min(PREFIX_BITS, layout.num_edges)
+    k = layer - bin(prefix).count("1")
+    if k < 0 or k > low_bits:
+        return 0
+
+    solved = 0
+    high = prefix << low_bits
+    for low in _same_popcount(k, low_bits):
+        m = high | low
+        if canonical(m)[0] != m:
+            continue
+        if m == full:
+            mm[m] = 128
+            solved += 1
+            continue
+        best = -10**9
+        free = full & ~m
+        while free:
+            bit = free & -free
+            free ^= bit
+            e = bit.bit_length() - 1
+            child = m | bit
+            stored = mm[canonical(child)[0]]
+            if not stored:
+                raise RuntimeError(f"Brak wartości dla {child:#x}; poprzednia warstwa niekompletna.")
+            boxes = 0
+            for c in edge_cells[e]:
+                if child & cell_masks[c] == cell_masks[c]:
+                    boxes += 1
+            v = boxes + stored - 128 if boxes else 128 - stored
+            if v > best:
+                best = v
+        mm[m] = best + 128
+        solved += 1
+    mm.flush()
+    return solved
+
+
+def _load_progress(meta_path: str, layout: Layout) -> dict:
+    """Read the build sidecar, or start a fresh one."""
+    if os.path.exists(meta_path):
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if (meta["rows"], meta["cols"], meta["format"]) != (layout.rows, layout.cols, FORMAT_VERSION):
+            raise ValueError(f"{meta_path}: plik dotyczy innej planszy lub formatu")
+        return meta
+    return {"rows": layout.rows, "cols": layout.cols, "format": FORMAT_VERSION,
+            "complete": False, "layer": layout.num_edges, "done": []}
+
+
+def _save_progress(meta_path: str, meta: dict) -> None:
+    """Atomically replace the build sidecar."""
+    tmp = meta_path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(meta, f)
+    os.replace(tmp, meta_path)
+
+
+def build(rows: int = 3, cols: Optional[int] = None, path: Optional[str] = None,
+          workers: Optional[int] = None, verbose: bool = True) -> str:
+    """Build (or resume building) the solution table of a board size.
+
+    Args:
+        rows: Cell rows.
+        cols: Cell columns (square if None).
+        path: Output ``.bin`` path; defaults to `book_path`.
+        workers: Worker processes (default: CPU count).
+        verbose: Print one line per finished layer.
+
+    Returns:
+        str: Path of the table.
+
+    Raises:
+        ValueError: If the board has more than `MAX_EDGES` edges.
+    """
+    layout = get_layout(rows, cols)
+    if layout.num_edges > MAX_EDGES:
+        raise ValueError(f"Plansza {layout.rows}x{layout.cols} ma za dużo krawędzi ({layout.num_edges}).")
+    path = path or book_path(layout)
+    meta_path = os.path.splitext(path)[0] + ".json"
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+
+    meta = _load_progress(meta_path, layout)
+    if meta["complete"]:
+        return path
+    if not os.path.exists(path):
+        with open(path, "wb") as f:
+            f.truncate(1 << layout.num_edges)
+
+    prefixes = range(1 << min(PREFIX_BITS, layout.num_edges))
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_builder,
+                             initargs=(path, layout.rows, layout.cols)) as pool:
+        for layer in range(meta["layer"], -1, -1):
+            start = time.perf_counter()
+            done = set(meta["done"]) if layer == meta["layer"] else set()
+            futures = {pool.submit(_solve_task, layer, p): p for p in prefixes if p not in done}
+            solved = 0
+            last_save = start
+            for fut in as_completed(futures):
+                solved += fut.result()
+                done.add(futures[fut])
+                if time.perf_counter() - last_save >= CHECKPOINT_EVERY:
+                    meta["layer"], meta["done"] = layer, sorted(done)
+                    _save_progress(meta_path, meta)
+                    last_save = time.perf_counter()
+            meta["layer"], meta["done"] = layer - 1, []
+            _save_progress(meta_path, meta)
+            if verbose:
+                print(f"warstwa {layer:2d}: {solved} pozycji, {time.perf_counter() - start:.1f} s")
+
+    meta["complete"] = True
+    meta["layer"] = -1
+    _save_progress(meta_path, meta)
+    return path
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Build the Dots & Boxes solution table")
+    parser.add_argument("--rows", type=int, default=3, help="Cell rows")
+    parser.add_argument("--cols", type=int, default=None, help="Cell columns (default: rows)")
+    parser.add_argument("--out", default=None, help="Output .bin path (default: books/RxC.bin)")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    out = build(args.rows, args.cols, args.out, args.workers)
+    print(f"Gotowe: {out}")
@@ -0,0 +1,156 @@
+"""Exact solver for loony Dots & Boxes endgames.
+
+Once every unfinished cell has exactly two sides drawn (`Board.is_loony`),
+there are no safe moves left: the undrawn edges split the remaining cells
+into independent *chains* (paths whose two ends touch the border) and
+*loops* (cycles). The player to move must open one of them, and the
+opponent then either
+
+- takes every box and has to open the next component, or
+- declines the last 2 boxes of a chain (4 of a loop) with a double-cross,
+  keeping control: the opener gets those boxes but must open again.
+
+Chains of one or two boxes leave no such choice (a 2-chain is opened in the
+middle). This gives the classic recursion over the multiset of component
+lengths, memoized in `net_value`:
+
+    chain c <= 2:  -(c + f(rest))
+    chain c >= 3:  -max(c + f(rest), c - 4 - f(rest))
+    loop  l:       -max(l + f(rest), l - 8 - f(rest))
+
+where ``f`` is the best net score for the player to move. `solve` turns a
+board into that multiset and also returns the move to play.
+"""
+
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import List, NamedTuple, Tuple
+
+from engine import Board
+
+
+class Component(NamedTuple):
+    """One chain or loop of a loony endgame.
+
+    Attributes:
+        loop: True for a loop, False for a chain.
+        cells: Cell indices of the component.
+        edges: Undrawn edge indices of the component, in increasing order.
+    """
+
+    loop: bool
+    cells: Tuple[int, ...]
+    edges: Tuple[int, ...]
+
+
+def components(board: Board) -> List[Component]:
+    """Split the undrawn edges of a loony board into chains and loops.
+
+    Components are listed in order of their smallest edge index.
+    """
+    layout = board.layout
+    edge_cells, cell_edges = layout.edge_cells, layout.cell_edges
+    free = board.full & ~board.edges
+    seen = 0
+    out: List[Component] = []
+    rest = free
+    while rest:
+        low = rest & -rest
+        rest ^= low
+        if seen & low:
+            continue
+        cells: List[int] = []
+        edges: List[int] = []
+        stack = [low.bit_length() - 1]
+        seen |= low
+        while stack:
+            e = stack.pop()
+            edges.append(e)
+            for cell in edge_cells[e]:
+                if cell in cells:
+                    continue
+                cells.append(cell)
+                for e2 in cell_edges[cell]:
+                    bit = 1 << e2
+                    if free & bit and not seen & bit:
+                        seen |= bit
+                        stack.append(e2)
+        edges.sort()
+        out.append(Component(len(edges) == len(cells), tuple(cells), tuple(edges)))
+    return out
+
+
+@lru_cache(maxsize=None)
+def net_value(chains: Tuple[int, ...], loops: Tuple[int, ...]) -> int:
+    """Best net score for the player who must open one of the components.
+
+    Args:
+        chains: Sorted chain lengths.
+        loops: Sorted loop lengths.
+    """
+    if not chains and not loops:
+        return 0
+    best = -10**9
+    for i, c in enumerate(chains):
+        if i and chains[i - 1] == c:
+            continue
+        r = net_value(chains[:i] + chains[i + 1:], loops)
+        v = -(c + r) if c <= 2 else -max(c + r, c - 4 - r)
+        if v > best:
+            best = v
+    for i, n in enumerate(loops):
+        if i and loops[i - 1] == n:
+            continue
+        r = net_value(chains, loops[:i] + loops[i + 1:])
+        v = -max(n + r, n - 8 - r)
+        if v > best:
+            best = v
+    return best
+
+
+def _opening_edge(board: Board, comp: Component) -> int:
+    """Edge that opens `comp`: middle of a 2-chain, a border end of longer chains."""
+    edge_cells = board.layout.edge_cells
+    if comp.loop or len(comp.cells) == 1:
+        return comp.edges[0]
+    if len(comp.cells) == 2:
+        # The only edge shared by both cells: a hard-hearted handout.
+        return next(e for e in comp.edges if len(edge_cells[e]) == 2)
+    return next(e for e in comp.edges if len(edge_cells[e]) == 1)
+
+
+def solve(board: Board) -> Tuple[int, int]:
+    """Exact value and best move of a loony endgame.
+
+    Args:
+        board: Position with `board.is_loony()` true.
+
+    Returns:
+        Tuple[value, edge index]: final score difference for the player to
+        move (boxes already won included) and the edge to draw.
+    """
+    comps = components(board)
+    chains = tuple(sorted(len(c.cells) for c in comps if not c.loop))
+    loops = tuple(sorted(len(c.cells) for c in comps if c.loop))
+
+    best, move = -10**9, -1
+    tried = set()
+    for comp in comps:
+        n = len(comp.cells)
+        if (comp.loop, n) in tried:
+            continue
+        tried.add((comp.loop, n))
+        if comp.loop:
+            i = loops.index(n)
+            r = net_value(chains, loops[:i] + loops[i + 1:])
+            v = -max(n + r, n - 8 - r)
+        else:
+            i = chains.index(n)
+            r = net_value(chains[:i] + chains[i + 1:], loops)
+            v = -(n + r) if n <= 2 else -max(n + r, n - 4 - r)
+        if v > best:
+            best, move = v, _opening_edge(board, comp)
+
+    p = board.player
+    return board.scores[p] - board.scores[1 - p] + best, move
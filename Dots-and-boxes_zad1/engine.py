@@ -0,0 +1,320 @@
+"""Bitboard search engine for Dots & Boxes.
+
+`GameState` is convenient for the CLI (edges are point tuples, owners are kept
+for rendering), but it is too heavy for a search tree: every node needs a copy
+of four containers and every rule check builds tuples. `Board` is the compact
+counterpart used by the AI.
+
+Representation
+--------------
+- Every edge has the integer index of `game.Layout`. Horizontal edges come
+  first in row-major order, then vertical edges, i.e. the same order in which
+  `ai.all_moves` lists them.
+- Drawn edges are a single integer bitmask (bit ``i`` set = edge ``i`` drawn).
+- ``sides[cell]`` counts drawn sides of every cell, ``cell = r * cols + c``.
+- The board size comes from the shared `Layout`; a board only keeps
+  references to its tables.
+- Scores and the player to move follow the `GameState` rules exactly: completing
+  one or more cells scores them and keeps the turn.
+
+Moves are applied with `Board.make` and taken back with `Board.unmake`, both
+O(1); the undo information lives on an internal trail, so a search never
+copies a board.
+
+Undrawn edges are also kept in three incrementally updated bitmasks, so
+move ordering costs nothing per node:
+
+- ``capture``: completes a box (an adjacent cell already has three sides),
+- ``safe``: gives nothing away (adjacent cells have at most one side),
+- ``sacrifice``: hands a box to the opponent (third side of a cell).
+
+Every board also carries an incrementally updated Zobrist hash of its drawn
+edges and player to move; `Board.key` folds in the score difference, giving
+the transposition-table key used by the AI.
+"""
+
+from __future__ import annotations
+
+import random
+from typing import Dict, List, Sequence, Tuple
+
+from game import GameState, Edge, Layout, get_layout, normalize_edge
+
+DEFAULT_LAYOUT: Layout = get_layout()
+
+
+_ZOBRIST: Dict[Tuple[int, int], Tuple[List[int], int, List[int]]] = {}
+
+
+def zobrist_keys(layout: Layout) -> Tuple[List[int], int, List[int]]:
+    """Zobrist keys of a board size: (per edge, player 1 to move, per score diff).
+
+    The score-difference keys are indexed by ``scores[0] - scores[1] + num_cells``.
+    Keys use a fixed seed per size, so hashes are stable between runs and
+    processes.
+    """
+    key = (layout.rows, layout.cols)
+    keys = _ZOBRIST.get(key)
+    if keys is None:
+        rng = random.Random(0x5EED_D075 ^ (layout.rows << 16) ^ layout.cols)
+        keys = (
+            [rng.getrandbits(64) for _ in range(layout.num_edges)],
+            rng.getrandbits(64),
+            [rng.getrandbits(64) for _ in range(2 * layout.num_cells + 1)],
+        )
+        _ZOBRIST[key] = keys
+    return keys
+
+
+# Bucket of an undrawn edge by the most sides drawn on an adjacent cell.
+SAFE, SACRIFICE, CAPTURE, DRAWN = 0, 1, 2, 3
+_BUCKET_BY_SIDES = (SAFE, SAFE, SACRIFICE, CAPTURE)
+
+
+def edge_index(e: Edge, layout: Layout = DEFAULT_LAYOUT) -> int:
+    """Index of an edge given as two endpoints (any order)."""
+    a, b = e
+    return layout.edge_index[normalize_edge(a, b)]
+
+
+def index_edge(i: int, layout: Layout = DEFAULT_LAYOUT) -> Edge:
+    """Canonical edge for an edge index."""
+    return layout.edges[i]
+
+
+class Board:
+    """Bitmask position used by the search.
+
+    Attributes:
+        edges: Bitmask of drawn edges.
+        sides: Number of drawn sides for every cell.
+        scores: Two-element list with scores for P0 and P1 respectively.
+        player: Id of the player to move next (0 or 1).
+        hash: Zobrist hash of `edges` and `player`.
+        layout: Geometry tables of the board size.
+        full: Bitmask with every edge drawn (``layout.full_mask``).
+        loose: Number of cells with fewer than two sides drawn.
+        capturable: Number of cells with exactly three sides drawn.
+    """
+
+    __slots__ = ("edges", "sides", "scores", "player", "hash", "layout", "full",
+                 "loose", "capturable", "_bucket", "_kind",
+                 "_cells", "_cell_edges", "_z_edge", "_z_player", "_z_diff", "_trail")
+
+    def __init__(self, layout: Layout = DEFAULT_LAYOUT) -> None:
+        self.layout = layout
+        self.full: int = layout.full_mask
+        self._cells = layout.edge_cells
+        self._cell_edges = layout.cell_edges
+        self._z_edge, self._z_player, self._z_diff = zobrist_keys(layout)
+        self.edges: int = 0
+        self.sides: List[int] = [0] * layout.num_cells
+        self.scores: List[int] = [0, 0]
+        self.player: int = 0
+        self.hash: int = 0
+        self.loose: int = layout.num_cells
+        self.capturable: int = 0
+        # Edge masks per bucket (SAFE, SACRIFICE, CAPTURE, DRAWN) and bucket per edge.
+        self._bucket: List[int] = [layout.full_mask, 0, 0, 0]
+        self._kind: List[int] = [SAFE] * layout.num_edges
+        self._trail: List[Tuple[int, int, int]] = []
+
+    @classmethod
+    def from_state(cls, state: GameState) -> "Board":
+        """Build a board equivalent to `state` (edges, scores, player)."""
+        layout = state.layout
+        mask = 0
+        for e in state.edges:
+            mask |= 1 << layout.edge_index[e]
+        return cls.from_mask(mask, state.scores, state.player, layout)
+
+    @classmethod
+    def from_mask(cls, edges: int, scores: Sequence[int] = (0, 0), player: int = 0,
+                  layout: Layout = DEFAULT_LAYOUT) -> "Board":
+        """Build a board from an edge bitmask, scores and the player to move.
+
+        Together with ``(layout.rows, layout.cols)`` this is the picklable
+        form of a position, used to hand positions to worker processes.
+        """
+        b = cls(layout)
+        b.edges = edges
+        cells = b._cells
+        z_edge = b._z_edge
+        sides = b.sides
+        free = edges
+        while free:
+            low = free & -free
+            i = low.bit_length() - 1
+            free ^= low
+            b.hash ^= z_edge[i]
+            for cell in cells[i]:
+                sides[cell] += 1
+        b.loose = sum(1 for x in sides if x < 2)
+        b.capturable = sum(1 for x in sides if x == 3)
+        b._bucket = [0, 0, 0, edges]
+        b._kind = [DRAWN if (edges >> i) & 1 else SAFE for i in range(layout.num_edges)]
+        b._bucket[SAFE] = layout.full_mask & ~edges
+        for cell in range(layout.num_cells):
+            if sides[cell] >= 2:
+                b._reclassify(cell)
+        b.scores = [scores[0], scores[1]]
+        b.player = player
+        if player:
+            b.hash ^= b._z_player
+        return b
+
+    def key(self) -> int:
+        """Transposition key: drawn edges, player to move and score difference."""
+        return self.hash ^ self._z_diff[self.scores[0] - self.scores[1] + len(self.sides)]
+
+    def key_with(self, edge_hash: int) -> int:
+        """Like `key`, but with the edges hashed as `edge_hash`.
+
+        Used for symmetric transposition keys: pass the hash of the
+        canonical edge mask (`symmetry.Symmetry.mask_hash`).
+        """
+        h = edge_hash ^ self._z_diff[self.scores[0] - self.scores[1] + len(self.sides)]
+        return h ^ self._z_player if self.player else h
+
+    def is_terminal(self) -> bool:
+        """Return True when all edges are drawn."""
+        return self.edges == self.full
+
+    def is_loony(self) -> bool:
+        """True when every unfinished cell has exactly two sides drawn.
+
+        In such a position every move opens a chain or a loop for the
+        opponent and nothing can be captured first; `endgame` solves it
+        exactly.
+        """
+        return self.loose == 0 and self.capturable == 0 and self.edges != self.full
+
+    @property
+    def capture(self) -> int:
+        """Mask of undrawn edges that complete at least one box."""
+        return self._bucket[CAPTURE]
+
+    @property
+    def safe(self) -> int:
+        """Mask of undrawn edges that do not give a box away."""
+        return self._bucket[SAFE]
+
+    @property
+    def sacrifice(self) -> int:
+        """Mask of undrawn edges that draw the third side of a cell."""
+        return self._bucket[SACRIFICE]
+
+    def ordered_moves(self) -> List[int]:
+        """Undrawn edges: captures first, then safe moves, sacrifices last."""
+        out: List[int] = []
+        bucket = self._bucket
+        for free in (bucket[CAPTURE], bucket[SAFE], bucket[SACRIFICE]):
+            while free:
+                low = free & -free
+                out.append(low.bit_length() - 1)
+                free ^= low
+        return out
+
+    def _reclassify(self, cell: int) -> None:
+        """Re-bucket the undrawn edges of `cell` after its side count changed."""
+        sides, cells, kind, bucket = self.sides, self._cells, self._kind, self._bucket
+        drawn = self.edges
+        for e in self._cell_edges[cell]:
+            if (drawn >> e) & 1:
+                continue
+            m = 0
+            for c in cells[e]:
+                if sides[c] > m:
+                    m = sides[c]
+            new = _BUCKET_BY_SIDES[m]
+            old = kind[e]
+            if new != old:
+                bit = 1 << e
+                bucket[old] ^= bit
+                bucket[new] ^= bit
+                kind[e] = new
+
+    def is_drawn(self, i: int) -> bool:
+        """Whether edge `i` is already drawn."""
+        return (self.edges >> i) & 1 == 1
+
+    def moves(self) -> List[int]:
+        """Indices of all undrawn edges in increasing order."""
+        free = self.full & ~self.edges
+        out: List[int] = []
+        while free:
+            low = free & -free
+            out.append(low.bit_length() - 1)
+            free ^= low
+        return out
+
+    def completes(self, i: int) -> int:
+        """How many cells drawing edge `i` would complete (0..2)."""
+        sides = self.sides
+        return sum(1 for cell in self._cells[i] if sides[cell] == 3)
+
+    def make(self, i: int) -> int:
+        """Draw edge `i` (must be undrawn) and return the number of completed cells.
+
+        Mirrors `GameState.play`: completed cells are scored for the mover,
+        who keeps the turn; otherwise the turn passes to the opponent.
+        """
+        bit = 1 << i
+        self.edges |= bit
+        self.hash ^= self._z_edge[i]
+        kind, bucket = self._kind, self._bucket
+        bucket[kind[i]] ^= bit
+        bucket[DRAWN] ^= bit
+        kind[i] = DRAWN
+        sides = self.sides
+        done = 0
+        for cell in self._cells[i]:
+            s = sides[cell] + 1
+            sides[cell] = s
+            if s == 1:
+                continue  # buckets only depend on cells with 2+ sides
+            if s == 2:
+                self.loose -= 1
+            elif s == 3:
+                self.capturable += 1
+            else:
+                self.capturable -= 1
+                done += 1
+            self._reclassify(cell)
+        player = self.player
+        self._trail.append((i, player, done))
+        if done:
+            self.scores[player] += done
+        else:
+            self.player = 1 - player
+            self.hash ^= self._z_player
+        return done
+
+    def unmake(self) -> None:
+        """Take back the last move applied with `make`."""
+        i, player, done = self._trail.pop()
+        bit = 1 << i
+        self.edges &= ~bit
+        self.hash ^= self._z_edge[i]
+        kind, bucket = self._kind, self._bucket
+        bucket[DRAWN] ^= bit
+        bucket[SAFE] ^= bit
+        kind[i] = SAFE
+        sides = self.sides
+        for cell in self._cells[i]:
+            s = sides[cell]
+            sides[cell] = s - 1
+            if s == 2:
+                self.loose += 1
+            elif s == 3:
+                self.capturable -= 1
+            elif s == 4:
+                self.capturable += 1
+        for cell in self._cells[i]:
+            if sides[cell] >= 1:
+                self._reclassify(cell)
+        if done:
+            self.scores[player] -= done
+        else:
+            self.hash ^= self._z_player
+        self.player = player
@@ -1,8 +1,8 @@
-"""Dots & Boxes core game model (3x3 by default).
+"""Dots & Boxes core game model (3x3 by default, any rows x cols board).
 
-This module defines the immutable board constants, lightweight typing aliases,
-and the `GameState` engine for validating and applying moves, computing scoring,
-and rendering an ANSI-colored ASCII view.
+This module defines the default board constants, lightweight typing aliases,
+the per-size `Layout` tables, and the `GameState` engine for validating and
+applying moves, computing scoring, and rendering an ANSI-colored ASCII view.
 
 Design notes
 ------------
@@ -10,6 +10,9 @@ Design notes
 - A move is an edge between two *orthogonally adjacent* dots.
 - When a move completes one or more cells (boxes), the same player moves again.
 - Terminal condition is reached when **all edges** on the board are drawn.
+- Board size is chosen per game (``GameState(rows, cols)``). Geometry tables
+  (edge indices, cell adjacency) live in a `Layout`, built once per size by
+  `get_layout` and shared by every state of that size.
 
 The engine is intentionally simple and side-effect free beyond mutating the
 `GameState` instance. All rule checks go through `is_edge_valid` and `play`.
@@ -17,9 +20,10 @@ The engine is intentionally simple and side-effect free beyond mutating the
 
 from __future__ import annotations
 
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 
+# Default board size (cells per side) used when a game does not choose one.
 BOARD_SIZE: int = 3
 DOTS: int = BOARD_SIZE + 1
 
@@ -65,8 +69,8 @@ def cell_edges(r: int, c: int) -> tuple[Edge, Edge, Edge, Edge]:
     """Edges surrounding the cell (r, c) in order: top, right, bottom, left.
 
     Args:
-        r: Cell row (0..BOARD_SIZE-1).
-        c: Cell column (0..BOARD_SIZE-1).
+        r: Cell row (0..rows-1).
+        c: Cell column (0..cols-1).
 
     Returns:
         Tuple of four canonical edges: (top, right, bottom, left).
@@ -78,6 +82,98 @@ def cell_edges(r: int, c: int) -> tuple[Edge, Edge, Edge, Edge]:
     return top, right, bottom, left
 
 
+class Layout:
+    """Precomputed geometry of a ``rows x cols`` board (cells).
+
+    Do not build directly; use `get_layout` so that all states of one size
+    share the same tables.
+
+    Edges are indexed with horizontal edges first (row-major), then vertical
+    edges (row-major); cells are indexed ``r * cols + c``.
+
+    Attributes:
+        rows: Number of cell rows.
+        cols: Number of cell columns.
+        dot_rows: Number of dot rows (``rows + 1``).
+        dot_cols: Number of dot columns (``cols + 1``).
+        edges: Canonical edge for every edge index.
+        edge_index: Mapping from canonical edge to its index.
+        edge_cells: Cell indices adjacent to every edge (one or two).
+        cell_edges: Edge indices of every cell: (top, right, bottom, left).
+        num_edges: Total number of edges.
+        num_cells: Total number of cells.
+        full_mask: Bitmask with one bit set for every edge.
+    """
+
+    def __init__(self, rows: int, cols: int) -> None:
+        if rows < 1 or cols < 1:
+            raise ValueError("Plansza musi mieć co najmniej jedno pole.")
+        self.rows = rows
+        self.cols = cols
+        self.dot_rows = rows + 1
+        self.dot_cols = cols + 1
+
+        edges: List[Edge] = []
+        edge_cells: List[Tuple[int, ...]] = []
+        # horizontal
+        for r in range(self.dot_rows):
+            for c in range(cols):
+                edges.append(normalize_edge((r, c), (r, c + 1)))
+                adj = []
+                if r > 0:
+                    adj.append((r - 1) * cols + c)
+                if r < rows:
+                    adj.append(r * cols + c)
+                edge_cells.append(tuple(adj))
+        # vertical
+        for r in range(rows):
+            for c in range(self.dot_cols):
+                edges.append(normalize_edge((r, c), (r + 1, c)))
+                adj = []
+                if c > 0:
+                    adj.append(r * cols + c - 1)
+                if c < cols:
+                    adj.append(r * cols + c)
+                edge_cells.append(tuple(adj))
+
+        self.edges: Tuple[Edge, ...] = tuple(edges)
+        self.edge_index: Dict[Edge, int] = {e: i for i, e in enumerate(edges)}
+        self.edge_cells: Tuple[Tuple[int, ...], ...] = tuple(edge_cells)
+        self.cell_edges: Tuple[Tuple[int, int, int, int], ...] = tuple(
+            tuple(self.edge_index[e] for e in cell_edges(r, c))
+            for r in range(rows) for c in range(cols)
+        )
+        self.num_edges: int = len(edges)
+        self.num_cells: int = rows * cols
+        self.full_mask: int = (1 << self.num_edges) - 1
+
+    def __repr__(self) -> str:
+        return f"Layout({self.rows}, {self.cols})"
+
+    def is_inside(self, a: Point) -> bool:
+        """Check if a point lies within the dot grid."""
+        r, c = a
+        return 0 <= r < self.dot_rows and 0 <= c < self.dot_cols
+
+    def cell(self, i: int) -> tuple[int, int]:
+        """(r, c) coordinates of cell index `i`."""
+        return divmod(i, self.cols)
+
+
+_LAYOUTS: Dict[Tuple[int, int], Layout] = {}
+
+
+def get_layout(rows: int = BOARD_SIZE, cols: Optional[int] = None) -> Layout:
+    """Shared `Layout` for a ``rows x cols`` board (square if `cols` is None)."""
+    if cols is None:
+        cols = rows
+    key = (rows, cols)
+    layout = _LAYOUTS.get(key)
+    if layout is None:
+        layout = _LAYOUTS[key] = Layout(rows, cols)
+    return layout
+
+
 class IllegalMove(ValueError):
     """Raised when attempting to apply an invalid move."""
     pass
@@ -92,21 +188,34 @@ class GameState:
         owner: Mapping from completed cell (r, c) to its owner player id.
         scores: Two-element list with scores for P0 and P1 respectively.
         player: Id of the player to move next (0 or 1).
+        layout: Shared geometry tables of this board size.
     """
 
-    def __init__(self) -> None:
-
+    def __init__(self, rows: int = BOARD_SIZE, cols: Optional[int] = None) -> None:
+        """Create an empty ``rows x cols`` board (square if `cols` is None)."""
+        self.layout: Layout = get_layout(rows, cols)
         self.edges: set[Edge] = set()
         self.edge_owner: Dict[Edge, int] = {}
         self.owner: Dict[tuple[int, int], int] = {}
         self.scores: List[int] = [0, 0]
         self.player: int = 0
+        # color flag -> render.BoardRenderer, created by board_ascii
+        self._renderers: Dict[bool, object] = {}
+
 
+    @property
+    def rows(self) -> int:
+        """Number of cell rows."""
+        return self.layout.rows
+
+    @property
+    def cols(self) -> int:
+        """Number of cell columns."""
+        return self.layout.cols
 
     def is_inside(self, a: Point) -> bool:
-        """Check if a point lies within the DOTS x DOTS grid."""
-        r, c = a
-        return 0 <= r < DOTS and 0 <= c < DOTS
+        """Check if a point lies within the dot grid of this board."""
+        return self.layout.is_inside(a)
 
     def is_edge_valid(self, a: Point, b: Point) -> bool:
         """Validate whether the edge (a, b) is a legal move.
@@ -145,35 +254,24 @@ class GameState:
             List of cell coordinates (r, c) completed by adding `e` (length 0..2).
         """
         completed: List[tuple[int, int]] = []
-        (r1, c1), (r2, c2) = e
-        if r1 == r2:  # horizontal edge
-            r = r1
-            c = min(c1, c2)
-            cand = []
-            if r > 0:
-                cand.append((r - 1, c))
-            if r < BOARD_SIZE:
-                cand.append((r, c))
-        else:  # vertical edge
-            c = c1
-            r = min(r1, r2)
-            cand = []
-            if c > 0:
-                cand.append((r, c - 1))
-            if c < BOARD_SIZE:
-                cand.append((r, c))
-        for (rr, cc) in cand:
-            top, right, bottom, left = cell_edges(rr, cc)
-            have = (
-                int(top in self.edges)
-                + int(right in self.edges)
-                + int(bottom in self.edges)
-                + int(left in self.edges)
-            )
+        layout = self.layout
+        for cell in layout.edge_cells[layout.edge_index[e]]:
+            have = sum(1 for i in layout.cell_edges[cell] if layout.edges[i] in self.edges)
             if have == 3:
-                completed.append((rr, cc))
+                completed.append(layout.cell(cell))
         return completed
 
+    def completes_box(self, e: Edge) -> bool:
+        """Whether drawing the undrawn edge `e` would complete a cell.
+
+        Args:
+            e: Candidate edge (canonical, e.g. from `ai.all_moves`).
+
+        Returns:
+            bool: True if the move scores and keeps the turn.
+        """
+        return bool(self._cells_completed_by_adding(e))
+
     def play(self, a: Point, b: Point) -> None:
         """Apply a legal move (draw an edge) and update game state.
 
@@ -208,16 +306,15 @@ class GameState:
     def is_terminal(self) -> bool:
         """Return True when all possible edges on the board are drawn.
 
-        For an N×N cells board (DOTS=N+1), the number of edges equals:
-            E = 2 * DOTS * (DOTS - 1)
+        For an R×C cells board the number of edges equals:
+            E = (R + 1) * C + R * (C + 1)
 
         Returns:
             bool: ``True`` if the match is over.
         """
-        total_edges = 2 * DOTS * (DOTS - 1)
-        return len(self.edges) == total_edges
+        return len(self.edges) == self.layout.num_edges
 
-    def board_ascii(self) -> str:
+    def board_ascii(self, color: bool = True) -> str:
         """Render the board as ANSI-colored ASCII art.
 
         - Columns and rows are annotated with indices.
@@ -225,61 +322,18 @@ class GameState:
         - Completed cells display ``P0``/``P1`` in the owner's color.
         - Footer prints current scores and the player to move.
 
+        The picture is kept by a `render.BoardRenderer` attached to this
+        state, which only redraws what changed since the previous call; the
+        static rows are shared by all games of the same board size.
+
+        Args:
+            color: ``False`` for the same picture without ANSI codes.
+
         Returns:
             str: Multiline string representation suitable for printing.
         """
-        rows: List[str] = []
-
-
-        header = ["   "]
-        for c in range(DOTS):
-            header.append(str(c))
-            if c < DOTS - 1:
-                header.append("  ")
-        rows.append("".join(header))
-
-        def h_edge_str(e: Edge) -> str:
-            owner = self.edge_owner.get(e)
-            return f"{pcolor(owner)}──{Style.RESET_ALL}" if owner is not None else "──"
-
-        def v_edge_str(e: Edge) -> str:
-            owner = self.edge_owner.get(e)
-            return f"{pcolor(owner)}│{Style.RESET_ALL}" if owner is not None else "│"
-
-        def cell_repr(r: int, c: int) -> str:
-            top, right, bottom, left = cell_edges(r, c)
-            have = int(top in self.edges) + int(right in self.edges) + int(bottom in self.edges) + int(left in self.edges)
-            if have == 4:
-                owner = self.owner.get((r, c))
-                if owner is not None:
-                    return f"{pcolor(owner)}P{owner}{Style.RESET_ALL}"
-                return "[]"
-            return "  "
-
-        for r in range(DOTS):
-
-            dot_row: List[str] = [f"{r}  "]
-            for c in range(DOTS):
-                dot_row.append("·")
-                if c < DOTS - 1:
-                    e = normalize_edge((r, c), (r, c + 1))
-                    dot_row.append(h_edge_str(e) if e in self.edges else "  ")
-            rows.append("".join(dot_row))
-
-
-            if r < DOTS - 1:
-                vert_row: List[str] = ["   "]
-                for c in range(DOTS):
-                    e = normalize_edge((r, c), (r + 1, c))
-                    vert_row.append(v_edge_str(e) if e in self.edges else " ")
-                    if c < DOTS - 1:
-                        vert_row.append(cell_repr(r, c))
-                rows.append("".join(vert_row))
-
-        who = self.player
-        rows.append(
-            f"\nPunkty  {Fore.CYAN}P0:{self.scores[0]}{Style.RESET_ALL}  "
-            f"{Fore.MAGENTA}P1:{self.scores[1]}{Style.RESET_ALL}   |   "
-            f"Ruch: {pcolor(who)}P{who}{Style.RESET_ALL}"
-        )
-        return "\n".join(rows)
\ No newline at end of file
+        renderer = self._renderers.get(color)
+        if renderer is None:
+            from render import BoardRenderer
+            renderer = self._renderers[color] = BoardRenderer(self.layout, color)
+        return renderer.render(self)
\ No newline at end of file
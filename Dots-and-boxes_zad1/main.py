@@ -1,4 +1,4 @@
-"""Command-line interface for the Dots & Boxes (3×3) game.
+"""Command-line interface for the Dots & Boxes game (3×3 by default).
 
 This program allows the user to play either against another human
 or against a simple AI opponent using minimax with alpha–beta pruning.
@@ -7,6 +7,12 @@ Game modes:
     1. Human vs Human
     2. Human vs AI
 
+The board size is asked for at start: "3" for 3×3 cells, "4x6" for a
+rectangular board with 4 rows and 6 columns of cells. Against the AI,
+pondering can be switched on: the AI then searches the likely replies while
+the human is thinking (`ponder.Ponderer`). Finished (or abandoned) games
+can be appended to a record file (`records`, ``.jsonl`` or binary).
+
 Move input formats (any of the following):
     - Orientation form:
         "h r c" → draws a horizontal edge from (r, c) to (r, c+1)
@@ -28,8 +34,11 @@ from colorama import init as colorama_init, Fore, Style
 
 colorama_init(autoreset=True)
 
-from game import GameState, IllegalMove, DOTS, normalize_edge
-from ai import best_move
+from game import GameState, IllegalMove, BOARD_SIZE, normalize_edge
+from ai import best_move, search
+from ponder import Ponderer
+from records import GameRecorder, append_record
+from tt import TranspositionTable
 
 
 
@@ -93,8 +102,10 @@ def ask_human_move(state: GameState) -> Tuple[Tuple[int, int], Tuple[int, int]]:
 
         r1, c1 = a
         r2, c2 = b
-        if not (0 <= r1 < DOTS and 0 <= c1 < DOTS and 0 <= r2 < DOTS and 0 <= c2 < DOTS):
-            print(Fore.RED + f"Punkt poza planszą (0..{DOTS - 1})." + Style.RESET_ALL);
+        layout = state.layout
+        if not (layout.is_inside(a) and layout.is_inside(b)):
+            print(Fore.RED + f"Punkt poza planszą (wiersze 0..{layout.dot_rows - 1}, "
+                             f"kolumny 0..{layout.dot_cols - 1})." + Style.RESET_ALL);
             continue
         if a == b:
             print(Fore.RED + "Punkty nie mogą być identyczne." + Style.RESET_ALL);
@@ -117,60 +128,122 @@ def ask_human_move(state: GameState) -> Tuple[Tuple[int, int], Tuple[int, int]]:
 
 
 
-def play_human_vs_human() -> None:
-    """Play Human vs Human until terminal state; prints board after each move."""
-    state = GameState()
-    print("Dots & Boxes (3x3) — Człowiek (P0) vs Człowiek (P1)\n")
+def play_human_vs_human(rows: int = BOARD_SIZE, cols: Optional[int] = None,
+                        record_path: Optional[str] = None) -> None:
+    """Play Human vs Human until terminal state; prints board after each move.
+
+    With `record_path` the game is appended to that record file at the end.
+    """
+    state = GameState(rows, cols)
+    recorder = GameRecorder(state)
+    print(f"Dots & Boxes ({state.rows}x{state.cols}) — Człowiek (P0) vs Człowiek (P1)\n")
     print(state.board_ascii())
 
     while not state.is_terminal():
         try:
             a, b = ask_human_move(state)
+            player = state.player
             state.play(a, b)
+            recorder.record((a, b), player)
         except IllegalMove as e:
             print("Błąd:", e);
             continue
         except SystemExit:
+            _save_record(recorder, record_path)
             print("Do zobaczenia!");
             return
         print(state.board_ascii())
 
+    _save_record(recorder, record_path)
     _print_result(state)
 
 
-def play_human_vs_ai(ai_player: int = 1, depth: int = 7) -> None:
-    """Play Human vs AI. `ai_player` is 0 or 1 indicating AI's side."""
-    state = GameState()
-    print(f"Dots & Boxes (3x3) — Człowiek (P{1 - ai_player}) vs AI (P{ai_player})\n")
+def play_human_vs_ai(ai_player: int = 1, depth: Optional[int] = 7, time_ms: Optional[float] = None,
+                     rows: int = BOARD_SIZE, cols: Optional[int] = None, ponder: bool = False,
+                     record_path: Optional[str] = None) -> None:
+    """Play Human vs AI. `ai_player` is 0 or 1 indicating AI's side.
+
+    With `time_ms` the AI uses iterative deepening and answers within that
+    many milliseconds; `depth` then only caps the search (None = no cap).
+    `rows` x `cols` is the board size in cells (square if `cols` is None).
+    With `ponder` the AI keeps searching in the background while the human
+    is choosing a move. With `record_path` the game is appended to that
+    record file at the end.
+    """
+    state = GameState(rows, cols)
+    recorder = GameRecorder(state)
+    tt = TranspositionTable()
+    ponderer = Ponderer(tt, depth) if ponder else None
+    print(f"Dots & Boxes ({state.rows}x{state.cols}) — Człowiek (P{1 - ai_player}) vs AI (P{ai_player})\n")
     print(state.board_ascii())
 
 
-    _maybe_ai_turn(state, ai_player, depth)
+    _maybe_ai_turn(state, ai_player, depth, time_ms, tt, ponderer, recorder)
 
     while not state.is_terminal():
         if state.player != ai_player:
             try:
                 a, b = ask_human_move(state)
+                if ponderer is not None:
+                    ponderer.stop()
+                player = state.player
                 state.play(a, b)
+                recorder.record((a, b), player)
             except IllegalMove as e:
                 print("Błąd:", e);
                 continue
             except SystemExit:
+                if ponderer is not None:
+                    ponderer.stop()
+                _save_record(recorder, record_path)
                 print("Do zobaczenia!");
                 return
             print(state.board_ascii())
-        _maybe_ai_turn(state, ai_player, depth)
+        _maybe_ai_turn(state, ai_player, depth, time_ms, tt, ponderer, recorder)
 
+    _save_record(recorder, record_path)
     _print_result(state)
 
 
-def _maybe_ai_turn(state: GameState, ai_player: int, depth: int) -> None:
-    """While it's AI's turn, keep moving (extra moves after boxes continue)."""
+def _maybe_ai_turn(state: GameState, ai_player: int, depth: Optional[int],
+                   time_ms: Optional[float] = None, tt: Optional[TranspositionTable] = None,
+                   ponderer: Optional[Ponderer] = None,
+                   recorder: Optional[GameRecorder] = None) -> None:
+    """While it's AI's turn, keep moving (extra moves after boxes continue).
+
+    With a `ponderer`, a fixed-depth AI answers straight from a pondered
+    result that is deep enough; a timed AI searches anyway (its table is
+    already warm) and keeps the pondered move if that one went deeper.
+    Pondering restarts once the human is to move.
+    """
     while not state.is_terminal() and state.player == ai_player:
-        mv = best_move(state, depth=depth)
+        if ponderer is None:
+            mv = best_move(state, depth=depth, tt=tt, time_ms=time_ms)
+        elif time_ms is None:
+            hit = ponderer.lookup(state, depth)
+            mv = hit.move if hit is not None else best_move(state, depth=depth, tt=tt)
+        else:
+            hit = ponderer.lookup(state)
+            result = search(state, depth=depth, time_ms=time_ms, tt=tt)
+            mv = hit.move if hit is not None and hit.depth > result.depth else result.move
         print(f"\nRuch AI: {mv}")
         state.play(*mv)
+        if recorder is not None:
+            recorder.record(mv, ai_player)
         print(state.board_ascii())
+    if ponderer is not None:
+        ponderer.start(state)
+
+
+def _save_record(recorder: GameRecorder, path: Optional[str]) -> None:
+    """Append the recorded game to `path` (nothing if `path` is None)."""
+    if path is None or not recorder.moves:
+        return
+    try:
+        append_record(path, recorder.finish())
+        print(f"Zapisano partię do {path}.")
+    except OSError as e:
+        print(Fore.RED + f"Nie udało się zapisać partii: {e}" + Style.RESET_ALL)
 
 
 def _print_result(state: GameState) -> None:
@@ -186,6 +259,23 @@ def _print_result(state: GameState) -> None:
 
 
 
+def parse_size(text: str) -> Optional[Tuple[int, int]]:
+    """Parse a board size: "5" -> (5, 5), "4x6" / "4 6" -> (4, 6).
+
+    Returns None on failure or for non-positive sizes.
+    """
+    parts = text.strip().lower().replace("x", " ").replace("×", " ").split()
+    try:
+        nums = [int(p) for p in parts]
+    except ValueError:
+        return None
+    if len(nums) == 1:
+        nums = nums * 2
+    if len(nums) != 2 or min(nums) < 1:
+        return None
+    return nums[0], nums[1]
+
+
 def main() -> None:
     """Ask for opponent type and start the selected mode."""
     print("Wybierz tryb:")
@@ -193,8 +283,13 @@ def main() -> None:
     print("  2) Człowiek vs AI")
     choice = input("Twój wybór [1/2]: ").strip()
 
+    size_in = input(f"Rozmiar planszy (np. 5 lub 4x6) [{BOARD_SIZE}]: ").strip()
+    rows, cols = parse_size(size_in) or (BOARD_SIZE, BOARD_SIZE)
+
+    record_path = input("Plik zapisu partii (.jsonl lub binarny) [brak]: ").strip() or None
+
     if choice == "1":
-        play_human_vs_human()
+        play_human_vs_human(rows, cols, record_path)
         return
 
 
@@ -204,13 +299,27 @@ def main() -> None:
     except ValueError:
         ai_player = 1
 
+    time_in = input("Limit czasu na ruch AI w ms [brak = stała głębokość]: ").strip()
+    try:
+        time_ms = float(time_in) if time_in else None
+    except ValueError:
+        time_ms = None
+
+    ponder = input("Czy AI ma myśleć w czasie ruchu człowieka? (t / n) [n]: ").strip().lower() in {"t", "tak", "y"}
+
+    if time_ms is not None:
+        play_human_vs_ai(ai_player=ai_player, depth=None, time_ms=time_ms, rows=rows, cols=cols,
+                         ponder=ponder, record_path=record_path)
+        return
+
     depth_in = input("Głębokość przeszukiwania AI [7]: ").strip()
     try:
         depth = int(depth_in) if depth_in else 7
     except ValueError:
         depth = 7
 
-    play_human_vs_ai(ai_player=ai_player, depth=depth)
+    play_human_vs_ai(ai_player=ai_player, depth=depth, rows=rows, cols=cols, ponder=ponder,
+                     record_path=record_path)
 
 
 if __name__ == "__main__":
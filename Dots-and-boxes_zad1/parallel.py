@@ -0,0 +1,336 @@
+"""Parallel two-ply split search for the Dots & Boxes AI.
+
+Splitting only at the root does not scale: after symmetry dedupe the empty
+board has a handful of distinct first moves, and one of them has to be
+searched before the others to get a bound. This module splits one ply
+deeper, into (root move, reply) pairs, following Young-Brothers-Wait at
+both levels:
+
+1.  A shallow serial iterative-deepening pass (`ai.search` to
+    ``depth - SEED_PLIES``) orders the root moves (its best move first) and
+    gives every child and grandchild position a first move to try.
+2.  The eldest root move is searched first: its eldest reply alone, then
+    all its other replies in parallel. Its exact value is the root bound.
+3.  Every other root move then has its eldest reply searched against that
+    bound; only moves the eldest reply does not refute get their younger
+    replies searched, again in parallel.
+
+Tasks are handed to the `ProcessPoolExecutor` only when a worker is free,
+so each one starts with the tightest window known at that moment. A task
+searches its grandchild position straight to the remaining depth, trying
+the seeding pass's move first. Each worker keeps one transposition table for all tasks of a search
+(cleared between searches). A position is always reached at the same ply
+in Dots & Boxes, so entries from other tasks of the same search have exactly
+the depth a task needs.
+
+Values inside a task's window are exact minimax values whatever the window
+was. A root move is dropped once it is proven no better than the best move
+before it in the fixed order of step 1 (or worse than a best move after
+it), and the root picks the first move with the highest exact value, so
+the result depends on the position and depth alone and not on worker
+timing. Any board size works:
+workers rebuild positions from ``(rows, cols)`` and an edge bitmask.
+"""
+
+from __future__ import annotations
+
+import atexit
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, wait
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from game import GameState, get_layout
+from engine import Board
+from ai import Searcher, SearchResult, search as serial_search
+from book import get_book
+from endgame import solve as solve_endgame
+from symmetry import get_symmetry
+from tt import TranspositionTable
+
+
+_INF = 10**9
+
+# Plies the serial seeding pass stays below the requested depth.
+SEED_PLIES = 3
+
+# Per-worker table, reused by all tasks of one search (`_worker_search`).
+_worker_tt: Optional[TranspositionTable] = None
+_worker_search = -1
+
+
+def _search_reply(size: Tuple[int, int], edges: int, scores: Sequence[int], player: int, move: int,
+                  reply: int, depth: int, lo: int, hi: int, first: int, search_id: int,
+                  endgame: bool, symmetric: bool) -> Tuple[int, int]:
+    """Worker task: value of root move `move` followed by `reply`, for the root player.
+
+    The position is passed in picklable form: board size ``(rows, cols)``,
+    edge bitmask, scores and root player. The grandchild is searched to
+    `depth`, trying `first` first.
+
+    Returns:
+        Tuple[value, nodes]: the value is exact when ``lo < value < hi``,
+        otherwise a bound on the side of the window it fell out of.
+    """
+    global _worker_tt, _worker_search
+    if _worker_tt is None:
+        _worker_tt = TranspositionTable()
+    if search_id != _worker_search:
+        _worker_tt.clear()
+        _worker_search = search_id
+    board = Board.from_mask(edges, scores, player, get_layout(*size))
+    board.make(move)
+    board.make(reply)
+    searcher = Searcher(_worker_tt, endgame=endgame, symmetric=symmetric)
+    same = board.player == player
+    alpha, beta = (lo, hi) if same else (-hi, -lo)
+    value, _ = searcher.negamax(board, depth, alpha, beta, first)
+    return (value if same else -value), searcher.nodes
+
+
+def _hint(searcher: Searcher, board: Board, depth: int) -> int:
+    """Best move stored by the seeding pass for `board`, or -1."""
+    if depth <= 0:
+        return -1
+    key, t = searcher.tt_key(board, depth)
+    entry = searcher.tt.probe(key)
+    if entry is None or entry[4] < 0:
+        return -1
+    return get_symmetry(board.layout).unmap_edge(entry[4], t) if t else entry[4]
+
+
+def _leaf_value(board: Board, depth: int, endgame: bool) -> Optional[int]:
+    """Value of `board` for its player to move when `Searcher.negamax` would
+    not search its children; None otherwise."""
+    player = board.player
+    if board.edges == board.full:
+        return board.scores[player] - board.scores[1 - player]
+    if endgame and board.loose == 0 and board.capturable == 0:
+        return solve_endgame(board)[0]
+    if depth == 0:
+        return board.scores[player] - board.scores[1 - player]
+    return None
+
+
+class _RootMove:
+    """Bookkeeping of one root move during `ParallelSearcher.search`.
+
+    `maximize` is True when the root player also moves after this move (it
+    completed a box). `value` is the best (maximize) or worst reply value
+    found so far; after `done` it is the exact value of the move, or None
+    if the move was proven worse than the best one.
+    """
+
+    __slots__ = ("move", "maximize", "replies", "next", "running", "eldest_done", "value", "done")
+
+    def __init__(self, move: int, maximize: bool, replies: List[Tuple[int, int]]) -> None:
+        self.move = move
+        self.maximize = maximize
+        self.replies = replies          # (reply, first move to try in the task)
+        self.next = 0                   # replies[:next] have been submitted
+        self.running = 0
+        self.eldest_done = False
+        self.value: Optional[int] = None
+        self.done = False
+
+    def ready(self) -> bool:
+        """Whether a reply can be submitted now (eldest first, then the rest)."""
+        if self.done or self.next >= len(self.replies):
+            return False
+        return self.next == 0 or self.eldest_done
+
+    def window(self, lower: int) -> Tuple[int, int]:
+        """Root-player window for the next reply, given the root bound `lower`."""
+        if self.maximize:
+            return (lower if self.value is None else max(lower, self.value)), _INF
+        return lower, (_INF if self.value is None else self.value)
+
+    def result(self, value: int, lo: int, hi: int) -> None:
+        """Merge a reply value searched with window (`lo`, `hi`)."""
+        self.running -= 1
+        self.eldest_done = True
+        if self.done:
+            return  # already refuted; a late reply changes nothing
+        if self.maximize:
+            if value > lo:
+                self.value = value if self.value is None else max(self.value, value)
+        elif value <= lo:
+            # One reply holds the move to `lo` or less: it cannot be the best.
+            self.value, self.done = None, True
+        elif value < hi:
+            self.value = value if self.value is None else min(self.value, value)
+
+    def finish(self, lower: int) -> None:
+        """Close the move once all its replies are back."""
+        if self.done or self.running or self.next < len(self.replies):
+            return
+        self.done = True
+        if self.maximize and (self.value is None or self.value <= lower):
+            self.value = None
+
+
+class ParallelSearcher:
+    """Process pool that splits fixed-depth searches over (move, reply) pairs.
+
+    Keep one instance around for many searches (see `get_searcher`):
+    starting the pool costs far more than a shallow search. Searches on one
+    instance must not overlap.
+
+    Example:
+        with ParallelSearcher(workers=8) as ps:
+            result = ps.search(state, depth=8)
+    """
+
+    def __init__(self, workers: Optional[int] = None) -> None:
+        """Start a pool with `workers` processes (default: CPU count)."""
+        self.workers = workers or os.cpu_count() or 1
+        self._pool = ProcessPoolExecutor(max_workers=self.workers)
+        self._searches = 0
+
+    def close(self) -> None:
+        """Shut the pool down."""
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    def __enter__(self) -> "ParallelSearcher":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def search(self, state: GameState, depth: int = 7, endgame: bool = True, book: bool = True,
+               symmetric: bool = True) -> SearchResult:
+        """Fixed-depth search of `state`, split over the pool two plies deep.
+
+        Args:
+            state: Current position (whose `player` is to move).
+            depth: Search depth in plies.
+            endgame: Use the exact endgame solver (as in `ai.search`).
+            book: Answer from the board size's solution table when available.
+            symmetric: Share transposition entries between symmetric positions.
+
+        Returns:
+            SearchResult: same fields as `ai.search`; `nodes` sums the
+            seeding pass and all workers.
+
+        Raises:
+            RuntimeError: If the position has no legal moves.
+        """
+        start = time.perf_counter()
+        board = Board.from_state(state)
+        moves = board.moves()
+        if not moves:
+            raise RuntimeError("No legal moves available")
+        depth = min(depth, len(moves))
+        if depth <= 2 or (book and get_book(board.layout) is not None) or (endgame and board.is_loony()):
+            # Nothing worth splitting, or answered without a search.
+            return serial_search(state, depth=depth, endgame=endgame, book=book, symmetric=symmetric)
+
+        # 1. Shallow serial pass: root order and first moves for the tasks.
+        seed_depth = max(1, depth - SEED_PLIES)
+        seed_tt = TranspositionTable()
+        seed = serial_search(state, depth=seed_depth, tt=seed_tt, endgame=endgame, book=False,
+                             symmetric=symmetric)
+        hints = Searcher(seed_tt, symmetric=symmetric)
+        nodes = seed.nodes
+
+        player = board.player
+        layout = board.layout
+        pv = layout.edge_index[seed.move]
+        order = get_symmetry(layout).unique_moves(board.edges, board.ordered_moves())
+        if pv in order:
+            order.remove(pv)
+            order.insert(0, pv)
+        roots: List[_RootMove] = []
+        for m in order:
+            board.make(m)
+            rm = _RootMove(m, board.player == player, [])
+            leaf = _leaf_value(board, depth - 1, endgame)
+            if leaf is not None:
+                rm.value, rm.done = (leaf if rm.maximize else -leaf), True
+            else:
+                first = _hint(hints, board, seed_depth - 1)
+                replies = board.ordered_moves()
+                if first >= 0:
+                    replies.remove(first)
+                    replies.insert(0, first)
+                for r in replies:
+                    board.make(r)
+                    rm.replies.append((r, _hint(hints, board, seed_depth - 2)))
+                    board.unmake()
+            board.unmake()
+            roots.append(rm)
+
+        # 2-3. Young-Brothers-Wait at the root and at the replies.
+        self._searches += 1
+        size, edges, scores = (state.rows, state.cols), board.edges, tuple(board.scores)
+        best: Optional[int] = None
+        best_at = 0
+        running: Dict[Future, Tuple[_RootMove, int, int]] = {}
+
+        def lower(i: int) -> int:
+            # Ties go to the earlier move, as in the serial root loop.
+            if best is None:
+                return -_INF
+            return best if best_at < i else best - 1
+
+        while True:
+            for i, rm in enumerate(roots):
+                rm.finish(lower(i))
+                if rm.done and rm.value is not None and (
+                        best is None or rm.value > best or (rm.value == best and i < best_at)):
+                    best, best_at = rm.value, i
+            if all(rm.done for rm in roots):
+                break
+            # The younger root moves wait for the eldest one.
+            active = roots if roots[0].done else roots[:1]
+            while len(running) < self.workers:
+                i = next((i for i, rm in enumerate(active) if rm.ready()), None)
+                if i is None:
+                    break
+                rm = active[i]
+                reply, first = rm.replies[rm.next]
+                rm.next += 1
+                rm.running += 1
+                lo, hi = rm.window(lower(i))
+                fut = self._pool.submit(_search_reply, size, edges, scores, player, rm.move, reply,
+                                        depth - 2, lo, hi, first, self._searches, endgame, symmetric)
+                running[fut] = (rm, lo, hi)
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for fut in finished:
+                rm, lo, hi = running.pop(fut)
+                value, n = fut.result()
+                nodes += n
+                rm.result(value, lo, hi)
+
+        chosen = max((rm for rm in roots if rm.value is not None), key=lambda rm: rm.value)
+        elapsed = (time.perf_counter() - start) * 1000.0
+        return SearchResult(layout.edges[chosen.move], chosen.value, depth, nodes, elapsed)
+
+
+_SEARCHERS: Dict[int, ParallelSearcher] = {}
+
+
+def get_searcher(workers: Optional[int] = None) -> ParallelSearcher:
+    """Long-lived shared `ParallelSearcher` with `workers` processes.
+
+    The pool is started on first use and shut down at interpreter exit.
+    """
+    workers = workers or os.cpu_count() or 1
+    ps = _SEARCHERS.get(workers)
+    if ps is None:
+        if not _SEARCHERS:
+            atexit.register(_close_searchers)
+        ps = _SEARCHERS[workers] = ParallelSearcher(workers)
+    return ps
+
+
+def _close_searchers() -> None:
+    for ps in _SEARCHERS.values():
+        ps.close()
+    _SEARCHERS.clear()
+
+
+def parallel_search(state: GameState, depth: int = 7, workers: Optional[int] = None, endgame: bool = True,
+                    book: bool = True, symmetric: bool = True) -> SearchResult:
+    """Parallel search on the shared pool of `get_searcher` (see `ParallelSearcher.search`)."""
+    return get_searcher(workers).search(state, depth, endgame=endgame, book=book, symmetric=symmetric)
@@ -0,0 +1,135 @@
+"""Pondering: let the AI think while the human is choosing a move.
+
+After the AI has moved, `Ponderer.start` launches a background thread
+that searches the positions after each likely human reply (the human's
+moves in search order, symmetric duplicates removed) with the AI's own
+transposition table. Depths are deepened round-robin, so every reply gets
+a shallow answer before any gets a deep one. Results are kept in a cache
+keyed by the canonical position (`symmetry.canonicalize`), so a reply
+that is a mirror image of a pondered one is found too.
+
+When the human's move arrives, `Ponderer.stop` ends the thread within a
+few milliseconds (the search checks a stop event, see `ai.Searcher`), and
+`Ponderer.lookup` returns the precomputed result if there is one. Even on
+a miss the search starts from a table full of pondered positions.
+
+The search runs in a thread of the same process; while the main thread
+waits on `input()` it holds no lock, so the ponder thread gets the CPU.
+"""
+
+from __future__ import annotations
+
+import threading
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from game import GameState
+from engine import Board
+from ai import SearchResult, clone, search
+from symmetry import canonicalize, get_symmetry
+from tt import TranspositionTable
+
+
+def _remaining(state: GameState) -> int:
+    """Number of undrawn edges."""
+    return state.layout.num_edges - len(state.edges)
+
+
+class Ponderer:
+    """Background searcher for the positions after the opponent's replies.
+
+    Attributes:
+        tt: Transposition table shared with the AI's own searches.
+        depth: Deepest iteration to ponder (None = until stopped).
+        max_replies: Replies to ponder, most likely first (None = all).
+        hits: Lookups answered from the cache.
+        misses: Lookups that found nothing.
+    """
+
+    def __init__(self, tt: TranspositionTable, depth: Optional[int] = None, endgame: bool = True,
+                 book: bool = True, max_replies: Optional[int] = None) -> None:
+        self.tt = tt
+        self.depth = depth
+        self.endgame = endgame
+        self.book = book
+        self.max_replies = max_replies
+        self.hits = self.misses = 0
+        # canonical key -> (result with the move as canonical edge index, depth)
+        self._cache: Dict[Hashable, Tuple[SearchResult, int]] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _key(state: GameState) -> Tuple[Hashable, int]:
+        mask, t = canonicalize(state)
+        return (state.rows, state.cols, mask, tuple(state.scores), state.player), t
+
+    def replies(self, state: GameState) -> List[GameState]:
+        """Positions after the most likely replies of the player to move.
+
+        Replies that complete a box keep the turn with the opponent and
+        are skipped; the AI is never to move after them.
+        """
+        board = Board.from_state(state)
+        moves = get_symmetry(board.layout).unique_moves(board.edges, board.ordered_moves())
+        out: List[GameState] = []
+        for i in moves:
+            if board.completes(i):
+                continue
+            nxt = clone(state)
+            nxt.play(*state.layout.edges[i])
+            out.append(nxt)
+            if self.max_replies is not None and len(out) >= self.max_replies:
+                break
+        return out
+
+    def start(self, state: GameState) -> None:
+        """Start pondering `state`, in which the opponent is to move."""
+        self.stop()
+        self._cache.clear()
+        if state.is_terminal():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, args=(clone(state),), daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop pondering and wait for the thread to finish."""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+
+    def _run(self, state: GameState) -> None:
+        positions = [(p, self._key(p)) for p in self.replies(state) if not p.is_terminal()]
+        if not positions:
+            return
+        cap = self.depth if self.depth is not None else state.layout.num_edges
+        for d in range(1, cap + 1):
+            for pos, (key, t) in positions:
+                target = min(d, _remaining(pos))
+                known = self._cache.get(key)
+                if known is not None and known[1] >= target:
+                    continue
+                result = search(pos, depth=target, tt=self.tt, endgame=self.endgame, book=self.book,
+                                stop=self._stop)
+                if result.depth > (known[1] if known is not None else 0):
+                    layout = pos.layout
+                    move = get_symmetry(layout).map_edge(layout.edge_index[result.move], t)
+                    self._cache[key] = (result._replace(move=move), result.depth)
+                if self._stop.is_set():
+                    return
+
+    def lookup(self, state: GameState, depth: Optional[int] = None) -> Optional[SearchResult]:
+        """Pondered result for `state`, if it was searched at least to `depth`.
+
+        Call after `stop`. With `depth` None any pondered result is returned.
+        """
+        key, t = self._key(state)
+        known = self._cache.get(key)
+        if known is None or (depth is not None and known[1] < min(depth, _remaining(state))):
+            self.misses += 1
+            return None
+        self.hits += 1
+        result = known[0]
+        layout = state.layout
+        return result._replace(move=layout.edges[get_symmetry(layout).unmap_edge(result.move, t)])
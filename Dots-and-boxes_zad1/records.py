@@ -0,0 +1,186 @@
+"""Game records: what was played, by whom and when.
+
+A `GameRecord` stores the board size, the start time and, per move, the
+edge index (`game.Layout.edges` order), the player who drew it and the
+milliseconds since the start of the game. Two file formats hold a stream
+of records and can be appended to:
+
+- JSON Lines (``*.jsonl``): one game per line, readable and easy to
+  process with other tools::
+
+      {"rows": 3, "cols": 3, "started": 1700000000.0, "moves": [[5, 0, 1830], ...]}
+
+- Binary (any other extension, e.g. ``*.dbr``): the header ``DBR1``, then
+  per game ``<BBdH`` (rows, cols, start time, move count) followed by one
+  ``<HI`` per move: the edge index with the player in the top bit, and the
+  timestamp. A full 3×3 game takes 156 bytes.
+
+`read_records` streams either format one game at a time, so a file of any
+size is read with constant memory. `GameRecorder` builds a record while a
+game is being played (see `main.py`).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import struct
+import time
+from typing import IO, Iterator, List, NamedTuple, Optional
+
+from game import Edge, GameState
+
+
+MAGIC: bytes = b"DBR1"
+_GAME = struct.Struct("<BBdH")
+_MOVE = struct.Struct("<HI")
+_PLAYER_BIT = 0x8000
+
+
+class MoveRecord(NamedTuple):
+    """One drawn edge.
+
+    Attributes:
+        edge: Edge index in `game.Layout.edges`.
+        player: Player (0/1) who drew it.
+        t_ms: Milliseconds since the start of the game.
+    """
+
+    edge: int
+    player: int
+    t_ms: int
+
+
+class GameRecord(NamedTuple):
+    """A complete or partial game.
+
+    Attributes:
+        rows: Cell rows.
+        cols: Cell columns.
+        started: Start time (seconds since the epoch).
+        moves: Moves in the order they were played.
+    """
+
+    rows: int
+    cols: int
+    started: float
+    moves: List[MoveRecord]
+
+    def replay(self) -> GameState:
+        """Final position of the game, replayed with `GameState.play`."""
+        state = GameState(self.rows, self.cols)
+        for m in self.moves:
+            state.play(*state.layout.edges[m.edge])
+        return state
+
+
+class GameRecorder:
+    """Collects the moves of a game as they are played."""
+
+    def __init__(self, state: GameState) -> None:
+        self.rows, self.cols = state.rows, state.cols
+        self.layout = state.layout
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.moves: List[MoveRecord] = []
+
+    def record(self, edge: Edge, player: int) -> None:
+        """Note that `player` drew `edge` just now."""
+        t_ms = int((time.perf_counter() - self._t0) * 1000.0)
+        self.moves.append(MoveRecord(self.layout.edge_index[edge], player, t_ms))
+
+    def finish(self) -> GameRecord:
+        return GameRecord(self.rows, self.cols, self.started, list(self.moves))
+
+
+def _is_jsonl(path: str) -> bool:
+    return path.endswith(".jsonl")
+
+
+class RecordWriter:
+    """Appends records to a file; the format follows the extension.
+
+    Example:
+        with RecordWriter("games.dbr") as w:
+            w.write(record)
+    """
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self.jsonl = _is_jsonl(path)
+        if self.jsonl:
+            self._f: IO = open(path, "a", encoding="utf-8")
+        else:
+            fresh = not os.path.exists(path) or os.path.getsize(path) == 0
+            self._f = open(path, "ab")
+            if fresh:
+                self._f.write(MAGIC)
+
+    def write(self, record: GameRecord) -> None:
+        if self.jsonl:
+            self._f.write(json.dumps({
+                "rows": record.rows, "cols": record.cols, "started": record.started,
+                "moves": [list(m) for m in record.moves],
+            }) + "\n")
+            return
+        parts = [_GAME.pack(record.rows, record.cols, record.started, len(record.moves))]
+        for m in record.moves:
+            parts.append(_MOVE.pack(m.edge | (_PLAYER_BIT if m.player else 0), m.t_ms))
+        self._f.write(b"".join(parts))
+
+    def close(self) -> None:
+        self._f.close()
+
+    def __enter__(self) -> "RecordWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def append_record(path: str, record: GameRecord) -> None:
+    """Append one record to `path` (created if missing)."""
+    with RecordWriter(path) as w:
+        w.write(record)
+
+
+def read_records(path: str, limit: Optional[int] = None) -> Iterator[GameRecord]:
+    """Stream the records of `path`, at most `limit` of them.
+
+    Raises:
+        ValueError: If a binary file has a wrong header or is truncated.
+    """
+    count = 0
+    if _is_jsonl(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                if limit is not None and count >= limit:
+                    return
+                line = line.strip()
+                if not line:
+                    continue
+                d = json.loads(line)
+                yield GameRecord(d["rows"], d["cols"], d["started"],
+                                 [MoveRecord(*m) for m in d["moves"]])
+                count += 1
+        return
+
+    with open(path, "rb") as f:
+        if f.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path}: to nie jest plik zapisu partii")
+        while limit is None or count < limit:
+            head = f.read(_GAME.size)
+            if not head:
+                return
+            if len(head) < _GAME.size:
+                raise ValueError(f"{path}: obcięty zapis partii")
+            rows, cols, started, n = _GAME.unpack(head)
+            body = f.read(n * _MOVE.size)
+            if len(body) < n * _MOVE.size:
+                raise ValueError(f"{path}: obcięty zapis partii")
+            moves = [
+                MoveRecord(e & ~_PLAYER_BIT, 1 if e & _PLAYER_BIT else 0, t)
+                for e, t in _MOVE.iter_unpack(body)
+            ]
+            yield GameRecord(rows, cols, started, moves)
+            count += 1
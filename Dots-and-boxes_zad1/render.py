@@ -0,0 +1,169 @@
+"""Incremental ASCII renderer for `GameState.board_ascii`.
+
+Rebuilding the whole picture after every move costs a scan over every
+edge and cell plus a string concatenation per drawn edge. `BoardRenderer`
+keeps the picture as a list of text rows, each a list of tokens (dots,
+edges, cell labels), copied from a `RowTemplate` that is built once per
+board size and shared by every game of that size (`get_template`).
+Rendering a position only looks at the edges drawn since the previous
+call, replaces the tokens of those edges and of the cells next to them,
+and re-joins just the rows they are in. The output is exactly what the
+full rebuild produced.
+
+``color=False`` gives the same picture without ANSI escape codes, e.g.
+for log files.
+
+A renderer follows one game: positions passed to `render` are expected to
+only gain edges. When a position has fewer edges than the previous one
+(a new game) the renderer starts over by itself; call `reset` for any
+other jump.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Set, Tuple
+
+from colorama import Fore, Style
+
+from game import GameState, Layout, pcolor
+
+
+class RowTemplate:
+    """Static part of the picture of one board size, shared by its renderers.
+
+    Attributes:
+        rows: Token rows of the empty board (header, dot and vertical rows).
+        lines: The same rows joined into text.
+        edge_pos: (text row, token index) of each edge index.
+        cell_pos: (text row, token index) of each cell index.
+        cell_masks: Edge bitmask of each cell index.
+    """
+
+    __slots__ = ("rows", "lines", "edge_pos", "cell_pos", "cell_masks")
+
+    def __init__(self, layout: Layout) -> None:
+        dot_rows, dot_cols = layout.dot_rows, layout.dot_cols
+
+        # Where each edge / cell lives: (text row, token index).
+        edge_pos: List[Tuple[int, int]] = []
+        for (r1, c1), (r2, c2) in layout.edges:
+            if r1 == r2:
+                edge_pos.append((1 + 2 * r1, 2 + 2 * c1))
+            else:
+                edge_pos.append((2 + 2 * r1, 1 + 2 * c1))
+        self.edge_pos: Tuple[Tuple[int, int], ...] = tuple(edge_pos)
+        self.cell_pos: Tuple[Tuple[int, int], ...] = tuple(
+            (2 + 2 * r, 2 + 2 * c) for r, c in map(layout.cell, range(layout.num_cells))
+        )
+        self.cell_masks: Tuple[int, ...] = tuple(sum(1 << e for e in edges) for edges in layout.cell_edges)
+
+        header = ["   "]
+        for c in range(dot_cols):
+            header.append(str(c))
+            if c < dot_cols - 1:
+                header.append(" " * (3 - len(str(c))))
+        template: List[Tuple[str, ...]] = [tuple(header)]
+        for r in range(dot_rows):
+            dot_row = [f"{r:<3}"]
+            for c in range(dot_cols):
+                dot_row.append("·")
+                if c < dot_cols - 1:
+                    dot_row.append("  ")
+            template.append(tuple(dot_row))
+            if r < dot_rows - 1:
+                vert_row = ["   "]
+                for c in range(dot_cols):
+                    vert_row.append(" ")
+                    if c < dot_cols - 1:
+                        vert_row.append("  ")
+                template.append(tuple(vert_row))
+        self.rows: Tuple[Tuple[str, ...], ...] = tuple(template)
+        self.lines: Tuple[str, ...] = tuple("".join(row) for row in template)
+
+
+_TEMPLATES: Dict[Tuple[int, int], RowTemplate] = {}
+
+
+def get_template(layout: Layout) -> RowTemplate:
+    """Shared `RowTemplate` for the board size of `layout` (like `game.get_layout`).
+
+    The template has no colored tokens, so colored and plain renderers of
+    one size share it.
+    """
+    key = (layout.rows, layout.cols)
+    template = _TEMPLATES.get(key)
+    if template is None:
+        template = _TEMPLATES[key] = RowTemplate(layout)
+    return template
+
+
+class BoardRenderer:
+    """Text picture of one game; only the tokens and lines are per instance.
+
+    Attributes:
+        layout: Board geometry.
+        color: Emit ANSI colors (as `GameState.board_ascii` always did).
+        template: Shared static rows and positions of this board size.
+    """
+
+    def __init__(self, layout: Layout, color: bool = True) -> None:
+        self.layout = layout
+        self.color = color
+        self.template = get_template(layout)
+        self.reset()
+
+    def reset(self) -> None:
+        """Forget the previous position (back to an empty board)."""
+        self._tokens: List[List[str]] = [list(row) for row in self.template.rows]
+        self._lines: List[str] = list(self.template.lines)
+        self._drawn: Set = set()
+        self._mask = 0
+
+    def _paint(self, text: str, player: int) -> str:
+        if not self.color:
+            return text
+        return f"{pcolor(player)}{text}{Style.RESET_ALL}"
+
+    def update(self, state: GameState) -> None:
+        """Patch the picture with the edges drawn in `state` since last time."""
+        if len(state.edges) < len(self._drawn):
+            self.reset()
+        if len(state.edges) == len(self._drawn):
+            return
+        layout = self.layout
+        edge_index, edge_cells = layout.edge_index, layout.edge_cells
+        edge_pos, cell_pos, cell_masks = self.template.edge_pos, self.template.cell_pos, self.template.cell_masks
+        tokens = self._tokens
+        dirty = set()
+        for e in state.edges - self._drawn:
+            i = edge_index[e]
+            self._mask |= 1 << i
+            row, col = edge_pos[i]
+            glyph = "──" if row & 1 else "│"
+            tokens[row][col] = self._paint(glyph, state.edge_owner[e])
+            dirty.add(row)
+            for cell in edge_cells[i]:
+                if self._mask & cell_masks[cell] == cell_masks[cell]:
+                    owner = state.owner.get(layout.cell(cell))
+                    crow, ccol = cell_pos[cell]
+                    tokens[crow][ccol] = "[]" if owner is None else self._paint(f"P{owner}", owner)
+                    dirty.add(crow)
+        self._drawn = set(state.edges)
+        for row in dirty:
+            self._lines[row] = "".join(tokens[row])
+
+    def footer(self, state: GameState) -> str:
+        """Score line shown under the board."""
+        who = state.player
+        if not self.color:
+            return f"\nPunkty  P0:{state.scores[0]}  P1:{state.scores[1]}   |   Ruch: P{who}"
+        return (
+            f"\nPunkty  {Fore.CYAN}P0:{state.scores[0]}{Style.RESET_ALL}  "
+            f"{Fore.MAGENTA}P1:{state.scores[1]}{Style.RESET_ALL}   |   "
+            f"Ruch: {pcolor(who)}P{who}{Style.RESET_ALL}"
+        )
+
+    def render(self, state: GameState) -> str:
+        """Picture of `state` (see `GameState.board_ascii`)."""
+        self.update(state)
+        return "\n".join(self._lines) + "\n" + self.footer(state)
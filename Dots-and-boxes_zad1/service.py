@@ -0,0 +1,305 @@
+"""Asynchronous AI move service for many simultaneous games.
+
+`MoveService` lets asyncio code await AI moves without blocking the event
+loop: ``move = await service.request_move(state, time_ms=200)``. The
+searches themselves (`ai.search`) run in a bounded
+`ProcessPoolExecutor`.
+
+- Time budgets are per request and count from submission, so time spent
+  waiting for a free worker is taken from the search, not added to it.
+- Identical requests (same position, scores, player to move and limits)
+  that are in flight at the same time are coalesced into one search whose
+  result every caller receives.
+- Cancelling the awaiting task (e.g. because the game was abandoned)
+  withdraws the request; when no caller is left, a search that has not
+  started yet is dropped from the queue and a running one is told to stop
+  through a flag in shared memory (checked by `ai.Searcher` like its
+  clock). The slot is held until the worker has actually stopped.
+- At most `max_pending` searches are queued or running; further requests
+  wait for a free slot.
+
+Running ``python service.py`` starts a local stand-in client that plays
+many AI-vs-random games concurrently against the service and reports
+throughput and latency, for load tests.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Hashable, List, Optional, Tuple
+
+from game import GameState, Edge, BOARD_SIZE
+from ai import all_moves, clone, search
+from tt import TranspositionTable
+from tournament import percentile
+
+
+# Each worker keeps one table for all its searches (values are stored for
+# the player to move, so entries stay valid between games).
+_worker_tt: Optional[TranspositionTable] = None
+# Stop flags shared with the service, one per slot (set by `_init_worker`).
+_worker_flags = None
+
+# Smallest search budget granted when a request has already used up its
+# time waiting in the queue.
+MIN_BUDGET_MS: float = 5.0
+
+
+class _StopFlag:
+    """`threading.Event`-like view of one slot of the shared stop flags."""
+
+    __slots__ = ("flags", "index")
+
+    def __init__(self, flags, index: int) -> None:
+        self.flags = flags
+        self.index = index
+
+    def is_set(self) -> bool:
+        return bool(self.flags[self.index])
+
+
+def _init_worker(flags) -> None:
+    global _worker_flags
+    _worker_flags = flags
+
+
+def _compute_move(state: GameState, depth: Optional[int], time_ms: Optional[float],
+                  deadline: Optional[float], slot: int) -> Edge:
+    """Worker task: `ai.search` for `state`, within the wall-clock `deadline`.
+
+    The search also ends (with the best move found so far) once the
+    service sets stop flag `slot`.
+    """
+    global _worker_tt
+    if _worker_tt is None:
+        _worker_tt = TranspositionTable()
+    if deadline is not None:
+        time_ms = max(MIN_BUDGET_MS, (deadline - time.time()) * 1000.0)
+    return search(state, depth=depth, time_ms=time_ms, tt=_worker_tt,
+                  stop=_StopFlag(_worker_flags, slot)).move
+
+
+def position_key(state: GameState, depth: Optional[int], time_ms: Optional[float]) -> Hashable:
+    """Coalescing key: requests with equal keys get the same answer."""
+    return (state.rows, state.cols, frozenset(state.edges), tuple(state.scores), state.player,
+            depth, time_ms)
+
+
+class _Job:
+    """One search in flight and the number of callers waiting for it."""
+
+    __slots__ = ("future", "waiters")
+
+    def __init__(self, future: asyncio.Future) -> None:
+        self.future = future
+        self.waiters = 0
+
+
+class MoveService:
+    """Non-blocking front end to `ai.search` backed by a process pool.
+
+    Use as an async context manager, or call `close` when done:
+
+        async with MoveService(workers=4) as service:
+            move = await service.request_move(state, time_ms=200)
+
+    Attributes:
+        workers: Pool size.
+        depth: Default depth cap (used alone when no time budget is given).
+        time_ms: Default per-request time budget in milliseconds.
+        requests: Requests received.
+        coalesced: Requests answered by a search started for another caller.
+        cancelled: Requests withdrawn by their caller.
+    """
+
+    def __init__(self, workers: Optional[int] = None, depth: Optional[int] = 7,
+                 time_ms: Optional[float] = None, max_pending: Optional[int] = None) -> None:
+        """Start the pool.
+
+        Args:
+            workers: Worker processes (default: CPU count).
+            depth: Default depth cap.
+            time_ms: Default time budget per request.
+            max_pending: Searches queued or running at once (default: 4 per worker).
+        """
+        self.workers = workers or os.cpu_count() or 1
+        max_pending = max_pending or 4 * self.workers
+        # One stop flag per slot; a slot's flag is reused only after its
+        # search has finished.
+        self._flags = multiprocessing.Array("b", max_pending, lock=False)
+        self._free = list(range(max_pending))
+        self._pool = ProcessPoolExecutor(max_workers=self.workers, initializer=_init_worker,
+                                         initargs=(self._flags,))
+        self.depth = depth
+        self.time_ms = time_ms
+        self._slots = asyncio.Semaphore(max_pending)
+        self._jobs: Dict[Hashable, _Job] = {}
+        self.requests = self.coalesced = self.cancelled = 0
+
+    async def __aenter__(self) -> "MoveService":
+        return self
+
+    async def __aexit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut the pool down, dropping searches that have not started and
+        stopping the running ones."""
+        for i in range(len(self._flags)):
+            self._flags[i] = 1
+        self._pool.shutdown(wait=True, cancel_futures=True)
+
+    async def request_move(self, state: GameState, time_ms: Optional[float] = None,
+                           depth: Optional[int] = None) -> Edge:
+        """Await the AI move for the player to move in `state`.
+
+        Args:
+            state: Position; it is copied when submitted, so the caller may
+                keep playing on it.
+            time_ms: Budget for this request, counted from the call
+                (default: the service's `time_ms`).
+            depth: Depth cap (default: the service's `depth`).
+
+        Raises:
+            RuntimeError: If the position has no legal moves.
+            asyncio.CancelledError: If the awaiting task is cancelled.
+        """
+        time_ms = self.time_ms if time_ms is None else time_ms
+        depth = self.depth if depth is None else depth
+        self.requests += 1
+        key = position_key(state, depth, time_ms)
+        job = self._jobs.get(key)
+        if job is None:
+            deadline = None if time_ms is None else time.time() + time_ms / 1000.0
+            job = _Job(asyncio.ensure_future(self._run(key, clone(state), depth, time_ms, deadline)))
+            self._jobs[key] = job
+        else:
+            self.coalesced += 1
+        job.waiters += 1
+        try:
+            return await asyncio.shield(job.future)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        finally:
+            job.waiters -= 1
+            if job.waiters == 0 and not job.future.done():
+                # Nobody is left to receive the result: later identical
+                # requests must start a new search.
+                if self._jobs.get(key) is job:
+                    del self._jobs[key]
+                job.future.cancel()
+
+    async def _run(self, key: Hashable, state: GameState, depth: Optional[int],
+                   time_ms: Optional[float], deadline: Optional[float]) -> Edge:
+        """Wait for a slot, then run the search in the pool.
+
+        When cancelled, the search is stopped and the slot is released only
+        after the worker has returned, so abandoned searches never pile up
+        in the pool.
+        """
+        try:
+            async with self._slots:
+                slot = self._free.pop()
+                self._flags[slot] = 0
+                future = self._pool.submit(_compute_move, state, depth, time_ms, deadline, slot)
+                result = asyncio.wrap_future(future)
+                try:
+                    return await asyncio.shield(result)
+                except asyncio.CancelledError:
+                    self._flags[slot] = 1
+                    if not future.cancel():
+                        await asyncio.wait([result])
+                    raise
+                finally:
+                    self._free.append(slot)
+        finally:
+            job = self._jobs.get(key)
+            if job is not None and job.future is asyncio.current_task():
+                del self._jobs[key]
+
+
+# --------------------------------------------------------------------------
+# Stand-in client for load tests
+# --------------------------------------------------------------------------
+
+async def _client_game(service: MoveService, rows: int, cols: int, seed: int,
+                       latencies: List[float]) -> Tuple[int, int]:
+    """One AI vs random mover game driven through `service`.
+
+    The AI plays P0 in even-seeded games, so those all open with the same
+    request and exercise coalescing.
+    """
+    rng = random.Random(seed)
+    ai_player = seed % 2
+    state = GameState(rows, cols)
+    while not state.is_terminal():
+        if state.player != ai_player:
+            move = rng.choice(all_moves(state))
+            await asyncio.sleep(0)
+        else:
+            start = time.perf_counter()
+            move = await service.request_move(state)
+            latencies.append((time.perf_counter() - start) * 1000.0)
+        state.play(*move)
+    return state.scores[1 - ai_player], state.scores[ai_player]
+
+
+async def load_test(games: int = 32, workers: Optional[int] = None, rows: int = BOARD_SIZE,
+                    cols: Optional[int] = None, depth: Optional[int] = 5,
+                    time_ms: Optional[float] = None, seed: int = 0) -> dict:
+    """Play `games` concurrent games against a fresh service; returns a summary.
+
+    The summary holds the service counters, AI wins, moves per second and
+    AI move latency percentiles as seen by the client.
+    """
+    cols = rows if cols is None else cols
+    latencies: List[float] = []
+    start = time.perf_counter()
+    async with MoveService(workers, depth=depth, time_ms=time_ms) as service:
+        results = await asyncio.gather(*(
+            _client_game(service, rows, cols, seed + i, latencies) for i in range(games)
+        ))
+        counters = {"requests": service.requests, "coalesced": service.coalesced,
+                    "cancelled": service.cancelled}
+    elapsed = time.perf_counter() - start
+    lat = sorted(latencies)
+    return dict(
+        counters,
+        games=games,
+        ai_wins=sum(1 for s0, s1 in results if s1 > s0),
+        elapsed_s=elapsed,
+        moves_per_sec=len(lat) / elapsed if elapsed > 0 else 0.0,
+        latency_ms={"p50": percentile(lat, 50), "p90": percentile(lat, 90),
+                    "p99": percentile(lat, 99), "max": lat[-1] if lat else 0.0},
+    )
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Load test of the async AI move service")
+    parser.add_argument("--games", type=int, default=32, help="Concurrent games")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--rows", type=int, default=BOARD_SIZE, help="Cell rows")
+    parser.add_argument("--cols", type=int, default=None, help="Cell columns (default: rows)")
+    parser.add_argument("--depth", type=int, default=5, help="AI depth cap")
+    parser.add_argument("--time-ms", type=float, default=None, help="AI time budget per move")
+    parser.add_argument("--seed", type=int, default=0, help="Seed of the random movers")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    summary = asyncio.run(load_test(args.games, args.workers, args.rows, args.cols, args.depth,
+                                    args.time_ms, args.seed))
+    lat = summary["latency_ms"]
+    print(f"gry: {summary['games']}, wygrane AI: {summary['ai_wins']}, "
+          f"zapytania: {summary['requests']} (scalone: {summary['coalesced']})")
+    print(f"ruchy/s: {summary['moves_per_sec']:.1f}, czas: {summary['elapsed_s']:.2f} s")
+    print(f"opóźnienie ms: p50 {lat['p50']:.1f}, p90 {lat['p90']:.1f}, "
+          f"p99 {lat['p99']:.1f}, max {lat['max']:.1f}")
@@ -0,0 +1,183 @@
+"""Optional search statistics for the Dots & Boxes AI.
+
+Pass a `SearchStats` to `ai.search` or `ai.alphabeta` to find out where a
+search spent its effort. Per iteration (= per depth of the iterative
+deepening; `alphabeta` records a single one) it keeps
+
+- nodes visited and the effective branching factor,
+- beta cutoffs, and how many of them the first move produced (a high
+  first-move rate means good move ordering),
+- transposition-table probes, hits and table cutoffs,
+- wall-clock time.
+
+Almost everything is taken from counters the search keeps anyway
+(`Searcher.nodes`, the table's counters) as a snapshot at the start and
+end of every iteration. The only hook inside the tree is on the cutoff
+branch, behind an ``is not None`` check, so a search without a collector
+pays nothing measurable.
+
+`SearchStats.to_json` exports the record so search efficiency can be
+compared across versions.
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from typing import List, Optional
+
+
+class DepthStats:
+    """Counters of one completed (or interrupted) iteration.
+
+    Attributes:
+        depth: Nominal search depth of the iteration.
+        completed: False if the iteration was cut short by the time budget.
+        nodes: Nodes visited.
+        cutoffs: Beta cutoffs in the tree.
+        first_move_cutoffs: Cutoffs produced by the first move tried.
+        tt_probes: Transposition-table lookups.
+        tt_hits: Lookups that found the position.
+        tt_cutoffs: Lookups whose stored result ended the node.
+        elapsed_ms: Wall-clock time of the iteration.
+    """
+
+    __slots__ = ("depth", "completed", "nodes", "cutoffs", "first_move_cutoffs",
+                 "tt_probes", "tt_hits", "tt_cutoffs", "elapsed_ms")
+
+    def __init__(self, depth: int) -> None:
+        self.depth = depth
+        self.completed = False
+        self.nodes = self.cutoffs = self.first_move_cutoffs = 0
+        self.tt_probes = self.tt_hits = self.tt_cutoffs = 0
+        self.elapsed_ms = 0.0
+
+    @property
+    def first_move_cutoff_rate(self) -> float:
+        return self.first_move_cutoffs / self.cutoffs if self.cutoffs else 0.0
+
+    @property
+    def tt_hit_rate(self) -> float:
+        return self.tt_hits / self.tt_probes if self.tt_probes else 0.0
+
+    @property
+    def nodes_per_sec(self) -> float:
+        return self.nodes / (self.elapsed_ms / 1000.0) if self.elapsed_ms > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        return {
+            "depth": self.depth,
+            "completed": self.completed,
+            "nodes": self.nodes,
+            "cutoffs": self.cutoffs,
+            "first_move_cutoffs": self.first_move_cutoffs,
+            "first_move_cutoff_rate": self.first_move_cutoff_rate,
+            "tt_probes": self.tt_probes,
+            "tt_hits": self.tt_hits,
+            "tt_hit_rate": self.tt_hit_rate,
+            "tt_cutoffs": self.tt_cutoffs,
+            "elapsed_ms": self.elapsed_ms,
+            "nodes_per_sec": self.nodes_per_sec,
+        }
+
+
+class SearchStats:
+    """Statistics collector for one search.
+
+    Attributes:
+        iterations: One `DepthStats` per iteration, in search order.
+        source: How the root was answered: ``"search"``, ``"book"`` or
+            ``"endgame"``.
+        cutoffs: Running count of beta cutoffs (updated by `Searcher`).
+        first_move_cutoffs: Running count of first-move cutoffs.
+    """
+
+    def __init__(self) -> None:
+        self.iterations: List[DepthStats] = []
+        self.source = "search"
+        self.cutoffs = 0
+        self.first_move_cutoffs = 0
+        self._current: Optional[DepthStats] = None
+        self._start = 0.0
+        self._snapshot = (0, 0, 0, 0, 0, 0)
+
+    def cutoff(self, first: bool) -> None:
+        """Record a beta cutoff; `first` if the first move tried caused it."""
+        self.cutoffs += 1
+        if first:
+            self.first_move_cutoffs += 1
+
+    def _counters(self, searcher) -> tuple:
+        tt = searcher.tt
+        if tt is None:
+            return searcher.nodes, self.cutoffs, self.first_move_cutoffs, 0, 0, 0
+        return (searcher.nodes, self.cutoffs, self.first_move_cutoffs,
+                tt.hits + tt.misses, tt.hits, tt.cutoffs)
+
+    def begin(self, depth: int, searcher) -> None:
+        """Start recording an iteration of `searcher` (an `ai.Searcher`)."""
+        self._current = DepthStats(depth)
+        self._snapshot = self._counters(searcher)
+        self._start = time.perf_counter()
+
+    def end(self, searcher, completed: bool = True) -> None:
+        """Finish the iteration started by `begin`."""
+        it = self._current
+        if it is None:
+            return
+        it.elapsed_ms = (time.perf_counter() - self._start) * 1000.0
+        now = self._counters(searcher)
+        (it.nodes, it.cutoffs, it.first_move_cutoffs,
+         it.tt_probes, it.tt_hits, it.tt_cutoffs) = (a - b for a, b in zip(now, self._snapshot))
+        it.completed = completed
+        self.iterations.append(it)
+        self._current = None
+
+    @property
+    def nodes(self) -> int:
+        return sum(it.nodes for it in self.iterations)
+
+    @property
+    def elapsed_ms(self) -> float:
+        return sum(it.elapsed_ms for it in self.iterations)
+
+    def branching_factors(self) -> List[float]:
+        """Effective branching factor per iteration: nodes(d) / nodes(d-1).
+
+        The first iteration has no predecessor and reports its own node
+        count.
+        """
+        out: List[float] = []
+        prev = 0
+        for it in self.iterations:
+            out.append(it.nodes / prev if prev else float(it.nodes))
+            prev = it.nodes
+        return out
+
+    def to_dict(self) -> dict:
+        cutoffs = sum(it.cutoffs for it in self.iterations)
+        first = sum(it.first_move_cutoffs for it in self.iterations)
+        probes = sum(it.tt_probes for it in self.iterations)
+        hits = sum(it.tt_hits for it in self.iterations)
+        elapsed = self.elapsed_ms
+        return {
+            "source": self.source,
+            "nodes": self.nodes,
+            "elapsed_ms": elapsed,
+            "nodes_per_sec": self.nodes / (elapsed / 1000.0) if elapsed > 0 else 0.0,
+            "cutoffs": cutoffs,
+            "first_move_cutoff_rate": first / cutoffs if cutoffs else 0.0,
+            "tt_hit_rate": hits / probes if probes else 0.0,
+            "iterations": [
+                dict(it.to_dict(), branching_factor=bf)
+                for it, bf in zip(self.iterations, self.branching_factors())
+            ],
+        }
+
+    def to_json(self, path: Optional[str] = None, indent: Optional[int] = 2) -> str:
+        """Serialize `to_dict` as JSON; also write it to `path` if given."""
+        text = json.dumps(self.to_dict(), indent=indent)
+        if path is not None:
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+        return text
@@ -0,0 +1,201 @@
+"""Board symmetries of Dots & Boxes positions.
+
+A square board has 8 symmetries (4 rotations, each optionally mirrored), a
+rectangular one has 4 (identity, half turn and the two mirrors). Each
+symmetry permutes edge indices, and so maps one edge bitmask to another
+position with exactly the same game value.
+
+`Symmetry` precomputes, per board size, the edge permutation of every
+transform and byte-wise lookup tables, so that permuting a mask costs one
+table lookup per 8 edges. The *canonical* form of a mask is the smallest
+of its images.
+
+On top of that this module is the canonicalization layer used by the AI:
+
+- `canonicalize` maps a `GameState` to its canonical edge mask and the
+  transform that reaches it; `Symmetry.map_edge`/`unmap_edge` carry moves
+  into and back out of the canonical frame.
+- `Symmetry.mask_hash` hashes an edge mask with the engine's Zobrist keys,
+  so canonical positions get transposition keys (`Board.key_with`).
+- `Symmetry.unique_moves` keeps one move per class of moves that are
+  equivalent in a symmetric position, e.g. 4 instead of 24 on an empty
+  3×3 board.
+"""
+
+from __future__ import annotations
+
+from typing import Callable, Dict, List, Tuple
+
+from game import GameState, Layout, Point, normalize_edge
+from engine import zobrist_keys
+
+
+def _point_maps(rows: int, cols: int) -> List[Callable[[Point], Point]]:
+    """Dot-coordinate maps of the board symmetries (identity first)."""
+    R, C = rows, cols
+    maps: List[Callable[[Point], Point]] = [
+        lambda p: p,
+        lambda p: (R - p[0], C - p[1]),  # half turn
+        lambda p: (p[0], C - p[1]),      # mirror left-right
+        lambda p: (R - p[0], p[1]),      # mirror top-bottom
+    ]
+    if rows == cols:
+        N = rows
+        maps += [
+            lambda p: (p[1], N - p[0]),      # quarter turn
+            lambda p: (N - p[1], p[0]),      # three-quarter turn
+            lambda p: (p[1], p[0]),          # main diagonal
+            lambda p: (N - p[1], N - p[0]),  # anti-diagonal
+        ]
+    return maps
+
+
+class Symmetry:
+    """Symmetry tables of one board size; use `get_symmetry`.
+
+    Attributes:
+        layout: Board geometry.
+        perms: ``perms[t][i]`` is the image of edge ``i`` under transform ``t``.
+        inverse: ``inverse[t]`` is the index of the transform undoing ``t``.
+    """
+
+    def __init__(self, layout: Layout) -> None:
+        self.layout = layout
+        perms: List[Tuple[int, ...]] = []
+        for f in _point_maps(layout.rows, layout.cols):
+            perms.append(tuple(
+                layout.edge_index[normalize_edge(f(a), f(b))] for a, b in layout.edges
+            ))
+        self.perms: Tuple[Tuple[int, ...], ...] = tuple(perms)
+        self.inverse: Tuple[int, ...] = tuple(
+            next(u for u, q in enumerate(perms) if all(q[p[i]] == i for i in range(layout.num_edges)))
+            for p in perms
+        )
+        # _tables[t][k][byte]: image of the k-th byte of a mask under transform t.
+        nbytes = (layout.num_edges + 7) // 8
+        self._nbytes = nbytes
+        self._tables: List[List[List[int]]] = []
+        for perm in perms:
+            per_byte = []
+            for k in range(nbytes):
+                table = [0] * 256
+                for byte in range(256):
+                    out = 0
+                    for j in range(8):
+                        i = 8 * k + j
+                        if byte >> j & 1 and i < layout.num_edges:
+                            out |= 1 << perm[i]
+                    table[byte] = out
+                per_byte.append(table)
+            self._tables.append(per_byte)
+        # _zobrist[k][byte]: XOR of the edge keys of the k-th byte of a mask.
+        z_edge = zobrist_keys(layout)[0]
+        self._zobrist: List[List[int]] = []
+        for k in range(nbytes):
+            table = [0] * 256
+            for byte in range(256):
+                h = 0
+                for j in range(8):
+                    i = 8 * k + j
+                    if byte >> j & 1 and i < layout.num_edges:
+                        h ^= z_edge[i]
+                table[byte] = h
+            self._zobrist.append(table)
+
+    def __len__(self) -> int:
+        return len(self.perms)
+
+    def permute(self, mask: int, t: int) -> int:
+        """Image of edge mask `mask` under transform `t`."""
+        out = 0
+        k = 0
+        for table in self._tables[t]:
+            out |= table[(mask >> k) & 0xFF]
+            k += 8
+        return out
+
+    def canonical(self, mask: int) -> Tuple[int, int]:
+        """Canonical representative of `mask` and the transform reaching it.
+
+        Returns:
+            Tuple[canonical mask, t]: smallest image and the transform ``t``
+            with ``permute(mask, t) == canonical``.
+        """
+        best, best_t = mask, 0
+        nbytes = self._nbytes
+        for t in range(1, len(self._tables)):
+            tables = self._tables[t]
+            out = 0
+            for k in range(nbytes):
+                out |= tables[k][(mask >> (8 * k)) & 0xFF]
+            if out < best:
+                best, best_t = out, t
+        return best, best_t
+
+    def map_edge(self, i: int, t: int) -> int:
+        """Image of edge `i` under transform `t` (into the canonical frame)."""
+        return self.perms[t][i]
+
+    def unmap_edge(self, i: int, t: int) -> int:
+        """Pre-image of edge `i` under transform `t` (back from the canonical frame)."""
+        return self.perms[self.inverse[t]][i]
+
+    def mask_hash(self, mask: int) -> int:
+        """Zobrist hash of the edges in `mask` (same keys as `Board.hash`)."""
+        h = 0
+        k = 0
+        for table in self._zobrist:
+            h ^= table[(mask >> k) & 0xFF]
+            k += 8
+        return h
+
+    def stabilizer(self, mask: int) -> List[int]:
+        """Transforms that leave `mask` unchanged (always includes identity 0)."""
+        return [t for t in range(len(self.perms)) if self.permute(mask, t) == mask]
+
+    def unique_moves(self, mask: int, moves: List[int]) -> List[int]:
+        """Drop moves that are symmetric images of an earlier move in `moves`.
+
+        Two moves are equivalent when a symmetry of the current position
+        maps one onto the other; they then lead to positions of equal
+        value. Order of the kept moves is preserved.
+        """
+        stab = self.stabilizer(mask)
+        if len(stab) == 1:
+            return moves
+        perms = self.perms
+        seen = set()
+        out: List[int] = []
+        for m in moves:
+            if m in seen:
+                continue
+            out.append(m)
+            for t in stab:
+                seen.add(perms[t][m])
+        return out
+
+
+def canonicalize(state: GameState) -> Tuple[int, int]:
+    """Canonical edge mask of `state` and the transform mapping it there.
+
+    A move ``e`` (edge index) of `state` corresponds to
+    ``get_symmetry(state.layout).map_edge(e, t)`` in the canonical
+    position, and a canonical move ``c`` to ``unmap_edge(c, t)``.
+    """
+    layout = state.layout
+    mask = 0
+    for e in state.edges:
+        mask |= 1 << layout.edge_index[e]
+    return get_symmetry(layout).canonical(mask)
+
+
+_SYMMETRIES: Dict[Tuple[int, int], Symmetry] = {}
+
+
+def get_symmetry(layout: Layout) -> Symmetry:
+    """Shared `Symmetry` tables for the size of `layout`."""
+    key = (layout.rows, layout.cols)
+    sym = _SYMMETRIES.get(key)
+    if sym is None:
+        sym = _SYMMETRIES[key] = Symmetry(layout)
+    return sym
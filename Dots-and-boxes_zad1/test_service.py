@@ -0,0 +1,28 @@
+"""Tests of `service.MoveService` cancellation."""
+
+import asyncio
+
+from game import GameState
+from ai import all_moves
+from service import MoveService
+
+
+def test_cancelled_depth_only_request_stops_worker():
+    async def abandon_then_ask(service):
+        # Depth-only search of a 5x5 board: without a stop signal it would
+        # keep the only worker busy far longer than the timeout below.
+        abandoned = asyncio.ensure_future(service.request_move(GameState(5, 5), depth=60))
+        await asyncio.sleep(0.5)
+        abandoned.cancel()
+        move = await asyncio.wait_for(service.request_move(GameState(2, 2), depth=1), timeout=10.0)
+        assert abandoned.cancelled()
+        return move
+
+    async def scenario():
+        # One worker and one slot: a follow-up request can only be served
+        # once the abandoned search has really stopped.
+        async with MoveService(workers=1, depth=None, time_ms=None, max_pending=1) as service:
+            return [await abandon_then_ask(service) for _ in range(2)]
+
+    for move in asyncio.run(scenario()):
+        assert move in all_moves(GameState(2, 2))
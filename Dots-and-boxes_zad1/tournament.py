@@ -0,0 +1,279 @@
+"""Headless self-play tournament between AI configurations.
+
+Two configurations play N games against each other without any terminal
+interaction. Every game starts from a random opening drawn from its own
+seed, and each opening is played twice with the sides swapped, so neither
+configuration profits from a lucky opening or from moving first. Games run
+in a `ProcessPoolExecutor`; results are deterministic for fixed depths and
+only depend on the seed.
+
+A configuration is written as comma-separated ``key=value`` pairs:
+
+    depth=7                     fixed depth
+    time=200                    200 ms per move (depth then only caps it)
+    endgame=off, book=off       switch off the exact evaluators
+    symmetric=off               plain transposition keys
+    name=baseline               label used in the report
+
+Example::
+
+    python tournament.py --a "depth=7" --b "time=100,endgame=off" --games 40 --workers 4
+
+The report lists wins/draws/losses, score rate, average nodes per move,
+nodes per second and per-move latency percentiles for both sides. With
+``--record`` every game is also appended to a record file (`records`),
+e.g. as a corpus for `analyze.py`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from game import GameState, BOARD_SIZE
+from ai import all_moves, search
+from records import GameRecord, GameRecorder, RecordWriter
+from tt import TranspositionTable
+
+
+class AIConfig(NamedTuple):
+    """Settings of one tournament participant (see `ai.search`).
+
+    Attributes:
+        name: Label in the report.
+        depth: Maximum depth in plies (None = only the time budget).
+        time_ms: Budget per move in milliseconds, or None for fixed depth.
+        endgame: Use the exact endgame solver.
+        book: Use the solution table of the board size if one is built.
+        symmetric: Canonical (symmetry-aware) transposition keys.
+    """
+
+    name: str
+    depth: Optional[int] = 7
+    time_ms: Optional[float] = None
+    endgame: bool = True
+    book: bool = True
+    symmetric: bool = True
+
+
+_FLAGS = {"on": True, "1": True, "true": True, "off": False, "0": False, "false": False}
+
+
+def parse_config(text: str, default_name: str) -> AIConfig:
+    """Parse ``"depth=7,time=200,endgame=off,name=x"`` into an `AIConfig`.
+
+    Raises:
+        ValueError: On an unknown key or a malformed value.
+    """
+    fields: Dict[str, object] = {"name": default_name}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        key, sep, value = part.partition("=")
+        key, value = key.strip().lower(), value.strip().lower()
+        if not sep:
+            raise ValueError(f"Oczekiwano klucz=wartość: {part!r}")
+        if key == "name":
+            fields["name"] = part.partition("=")[2].strip()
+        elif key == "depth":
+            fields["depth"] = None if value in {"", "none"} else int(value)
+        elif key in {"time", "time_ms"}:
+            fields["time_ms"] = None if value in {"", "none"} else float(value)
+        elif key in {"endgame", "book", "symmetric"}:
+            if value not in _FLAGS:
+                raise ValueError(f"Nieznana wartość {key}: {value!r}")
+            fields[key] = _FLAGS[value]
+        else:
+            raise ValueError(f"Nieznany klucz konfiguracji: {key!r}")
+    config = AIConfig(**fields)
+    if config.depth is None and config.time_ms is None:
+        raise ValueError(f"{config.name}: podaj depth lub time.")
+    return config
+
+
+class GameResult(NamedTuple):
+    """Outcome of one tournament game.
+
+    Attributes:
+        seed: Opening seed.
+        first: Index (0/1) of the configuration playing P0.
+        scores: Boxes won by configuration 0 and configuration 1.
+        latencies: Per configuration, wall-clock milliseconds of every search.
+        nodes: Per configuration, nodes visited by every search.
+        record: The game, opening included.
+    """
+
+    seed: int
+    first: int
+    scores: Tuple[int, int]
+    latencies: Tuple[List[float], List[float]]
+    nodes: Tuple[List[int], List[int]]
+    record: GameRecord
+
+
+def random_opening(rows: int, cols: int, plies: int, seed: int,
+                   recorder: Optional[GameRecorder] = None) -> GameState:
+    """Position after `plies` random moves chosen with `random.Random(seed)`.
+
+    Moves that would complete a box are avoided, so the opening leaves the
+    score at 0:0 whenever the board allows it. The moves are also passed
+    to `recorder` if one is given.
+    """
+    rng = random.Random(seed)
+    state = GameState(rows, cols)
+    for _ in range(plies):
+        moves = all_moves(state)
+        quiet = [m for m in moves if not state.completes_box(m)]
+        if not quiet:
+            break
+        move = rng.choice(quiet)
+        if recorder is not None:
+            recorder.record(move, state.player)
+        state.play(*move)
+    return state
+
+
+def play_game(configs: Tuple[AIConfig, AIConfig], rows: int, cols: int, plies: int, seed: int,
+              first: int) -> GameResult:
+    """Play one game from the opening of `seed`; configuration `first` is P0.
+
+    Each side keeps its own transposition table for the whole game, as in
+    `main.play_human_vs_ai`.
+    """
+    recorder = GameRecorder(GameState(rows, cols))
+    state = random_opening(rows, cols, plies, seed, recorder)
+    side = {0: first, 1: 1 - first}  # player id -> configuration index
+    tables = (TranspositionTable(), TranspositionTable())
+    latencies: Tuple[List[float], List[float]] = ([], [])
+    nodes: Tuple[List[int], List[int]] = ([], [])
+    while not state.is_terminal():
+        k = side[state.player]
+        cfg = configs[k]
+        result = search(state, depth=cfg.depth, time_ms=cfg.time_ms, tt=tables[k],
+                        endgame=cfg.endgame, book=cfg.book, symmetric=cfg.symmetric)
+        latencies[k].append(result.elapsed_ms)
+        nodes[k].append(result.nodes)
+        recorder.record(result.move, state.player)
+        state.play(*result.move)
+    scores = (state.scores[0], state.scores[1]) if first == 0 else (state.scores[1], state.scores[0])
+    return GameResult(seed, first, scores, latencies, nodes, recorder.finish())
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Nearest-rank percentile `q` (0..100) of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, min(len(sorted_values), math.ceil(q / 100.0 * len(sorted_values))))
+    return sorted_values[rank - 1]
+
+
+def summarize(configs: Tuple[AIConfig, AIConfig], results: List[GameResult]) -> List[dict]:
+    """Per-configuration statistics over all `results`."""
+    out = []
+    for k, cfg in enumerate(configs):
+        wins = sum(1 for r in results if r.scores[k] > r.scores[1 - k])
+        losses = sum(1 for r in results if r.scores[k] < r.scores[1 - k])
+        draws = len(results) - wins - losses
+        lat = sorted(ms for r in results for ms in r.latencies[k])
+        nodes = [n for r in results for n in r.nodes[k]]
+        total_ms = sum(lat)
+        out.append({
+            "name": cfg.name,
+            "config": cfg._asdict(),
+            "games": len(results),
+            "wins": wins,
+            "draws": draws,
+            "losses": losses,
+            "score_rate": (wins + 0.5 * draws) / len(results) if results else 0.0,
+            "moves": len(lat),
+            "avg_nodes": sum(nodes) / len(nodes) if nodes else 0.0,
+            "nodes_per_sec": sum(nodes) / (total_ms / 1000.0) if total_ms > 0 else 0.0,
+            "latency_ms": {
+                "mean": total_ms / len(lat) if lat else 0.0,
+                "p50": percentile(lat, 50),
+                "p90": percentile(lat, 90),
+                "p99": percentile(lat, 99),
+                "max": lat[-1] if lat else 0.0,
+            },
+        })
+    return out
+
+
+def run_tournament(configs: Tuple[AIConfig, AIConfig], games: int = 20, rows: int = BOARD_SIZE,
+                   cols: Optional[int] = None, plies: int = 4, seed: int = 0,
+                   workers: Optional[int] = None, record_path: Optional[str] = None) -> List[dict]:
+    """Play `games` games between `configs` and return `summarize` output.
+
+    Game ``i`` uses the opening of seed ``seed + i // 2``; odd games swap
+    the sides of the previous one.
+
+    Args:
+        configs: The two participants.
+        games: Number of games.
+        rows: Cell rows.
+        cols: Cell columns (square if None).
+        plies: Random opening moves before the engines take over.
+        seed: Base seed of the openings.
+        workers: Worker processes (default: CPU count).
+        record_path: Append every game to this record file.
+    """
+    cols = rows if cols is None else cols
+    results: List[GameResult] = []
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(play_game, configs, rows, cols, plies, seed + i // 2, i % 2)
+            for i in range(games)
+        ]
+        for fut in as_completed(futures):
+            results.append(fut.result())
+    results.sort(key=lambda r: (r.seed, r.first))
+    if record_path is not None:
+        with RecordWriter(record_path) as writer:
+            for r in results:
+                writer.write(r.record)
+    return summarize(configs, results)
+
+
+def format_report(summary: List[dict]) -> str:
+    """Human-readable table of `summarize` output."""
+    lines = [
+        f"{'konfiguracja':<16}{'W/R/P':>12}{'wynik':>8}{'węzły/ruch':>12}{'węzły/s':>11}"
+        f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    ]
+    for s in summary:
+        lat = s["latency_ms"]
+        wdl = f"{s['wins']}/{s['draws']}/{s['losses']}"
+        lines.append(
+            f"{s['name']:<16}{wdl:>12}{s['score_rate']:>8.1%}{s['avg_nodes']:>12.0f}"
+            f"{s['nodes_per_sec']:>11.0f}{lat['p50']:>9.1f}{lat['p90']:>9.1f}{lat['p99']:>9.1f}"
+            f"{lat['max']:>9.1f}"
+        )
+    return "\n".join(lines)
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Dots & Boxes AI self-play tournament")
+    parser.add_argument("--a", default="depth=7", help="First configuration, e.g. 'depth=7,book=off'")
+    parser.add_argument("--b", default="depth=5", help="Second configuration")
+    parser.add_argument("--games", type=int, default=20, help="Number of games (even = fair)")
+    parser.add_argument("--rows", type=int, default=BOARD_SIZE, help="Cell rows")
+    parser.add_argument("--cols", type=int, default=None, help="Cell columns (default: rows)")
+    parser.add_argument("--plies", type=int, default=4, help="Random opening moves")
+    parser.add_argument("--seed", type=int, default=0, help="Base opening seed")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--json", default=None, help="Also write the summary to this JSON file")
+    parser.add_argument("--record", default=None, help="Append the games to this record file")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    configs = (parse_config(args.a, "A"), parse_config(args.b, "B"))
+    summary = run_tournament(configs, args.games, args.rows, args.cols, args.plies, args.seed, args.workers,
+                             args.record)
+    print(format_report(summary))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2, ensure_ascii=False)
@@ -0,0 +1,135 @@
+"""Transposition table for the Dots & Boxes alpha–beta search.
+
+Positions are identified by the Zobrist key from `engine.Board.key` (drawn
+edges, player to move and score difference). Values are stored from the
+point of view of the player to move, so a table can be reused between
+searches and by either side.
+
+Layout and replacement
+----------------------
+The table is a fixed-size list of two-slot buckets, so memory use is capped
+up front. The first slot of a bucket is *depth-preferred*: it is only
+replaced by a deeper (or equally deep) result, or by any result once its
+entry is from an older search generation. The second slot is
+*always-replace* and catches everything else, so fresh shallow results are
+not lost.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Optional, Tuple
+
+
+EXACT: int = 0
+LOWER: int = 1  # fail-high: true value >= stored value
+UPPER: int = 2  # fail-low:  true value <= stored value
+
+# (key, depth, flag, value, move, generation)
+Entry = Tuple[int, int, int, int, int, int]
+
+# Rough size of one stored entry (tuple + small ints) on CPython, in bytes.
+ENTRY_BYTES: int = 120
+
+
+class TranspositionTable:
+    """Fixed-capacity cache of search results.
+
+    Attributes:
+        hits: Probes that found an entry for the key.
+        misses: Probes that found nothing.
+        cutoffs: Hits whose bound or exact value ended the node immediately.
+        stores: Number of `store` calls.
+        overwrites: Stores that evicted an entry of a different position.
+    """
+
+    def __init__(self, max_entries: int = 1 << 18) -> None:
+        """Create a table holding at most `max_entries` entries.
+
+        The capacity is rounded down to a power of two (minimum 2).
+        """
+        buckets = 1
+        while buckets * 4 <= max_entries:
+            buckets *= 2
+        self._mask: int = buckets - 1
+        self._slots: List[Optional[Entry]] = [None] * (2 * buckets)
+        self.generation: int = 0
+        self.hits = self.misses = self.cutoffs = 0
+        self.stores = self.overwrites = 0
+
+    @classmethod
+    def with_memory(cls, megabytes: float) -> "TranspositionTable":
+        """Create a table sized to roughly `megabytes` of memory."""
+        return cls(max(2, int(megabytes * 1024 * 1024) // ENTRY_BYTES))
+
+    @property
+    def capacity(self) -> int:
+        """Maximum number of entries."""
+        return len(self._slots)
+
+    def new_search(self) -> None:
+        """Start a new generation; older entries become preferred victims."""
+        self.generation += 1
+
+    def clear(self) -> None:
+        """Drop all entries and reset counters."""
+        self._slots = [None] * len(self._slots)
+        self.generation = 0
+        self.hits = self.misses = self.cutoffs = 0
+        self.stores = self.overwrites = 0
+
+    def probe(self, key: int) -> Optional[Entry]:
+        """Return the entry stored for `key`, or None."""
+        i = (key & self._mask) << 1
+        slots = self._slots
+        e = slots[i]
+        if e is not None and e[0] == key:
+            self.hits += 1
+            return e
+        e = slots[i + 1]
+        if e is not None and e[0] == key:
+            self.hits += 1
+            return e
+        self.misses += 1
+        return None
+
+    def store(self, key: int, depth: int, flag: int, value: int, move: int) -> None:
+        """Record a search result for `key`.
+
+        Args:
+            key: Position key (`Board.key`).
+            depth: Remaining depth the value was searched to.
+            flag: `EXACT`, `LOWER` or `UPPER`.
+            value: Value for the player to move.
+            move: Best edge index found (-1 if none).
+        """
+        self.stores += 1
+        i = (key & self._mask) << 1
+        slots = self._slots
+        entry = (key, depth, flag, value, move, self.generation)
+        old = slots[i]
+        if old is None or old[0] == key or old[5] != self.generation or depth >= old[1]:
+            if old is not None and old[0] != key:
+                # Keep the evicted depth-preferred entry in the second slot.
+                if slots[i + 1] is not None:
+                    self.overwrites += 1
+                slots[i + 1] = old
+            slots[i] = entry
+            return
+        if slots[i + 1] is not None and slots[i + 1][0] != key:
+            self.overwrites += 1
+        slots[i + 1] = entry
+
+    def stats(self) -> Dict[str, float]:
+        """Counters and derived rates as a plain dict."""
+        probes = self.hits + self.misses
+        return {
+            "probes": probes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "cutoffs": self.cutoffs,
+            "hit_rate": self.hits / probes if probes else 0.0,
+            "cutoff_rate": self.cutoffs / probes if probes else 0.0,
+            "stores": self.stores,
+            "overwrites": self.overwrites,
+            "capacity": self.capacity,
+        }
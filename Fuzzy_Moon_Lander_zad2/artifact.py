@@ -0,0 +1,91 @@
+"""
+====================================================================
+ARTEFAKT SKOMPILOWANEGO STEROWNIKA (.npz)
+====================================================================
+
+Autorzy: s27433, s28866
+Technologia: Python 3.11, NumPy
+
+--------------------------------------------------------------------
+OPIS:
+--------------------------------------------------------------------
+Zbudowanie zmiennych skfuzzy, 17 reguł i ich kompilacja przy każdym
+imporcie main.py (także w każdym procesie roboczym) wymaga importu
+skfuzzy (z networkx) i kosztuje ~150 ms. Tablice `CompiledController`
+zależą jednak tylko od definicji funkcji przynależności i reguł.
+
+Artefakt to plik .npz z tymi tablicami i metadanymi:
+
+-   ``format`` – wersja układu tablic (FORMAT); inna wersja = przebudowa,
+-   ``key``    – skrót SHA-256 specyfikacji sterownika (`spec_key`:
+    parametry funkcji przynależności, uniwersa i źródło reguł),
+-   etykiety wejść, wyjść i reguł.
+
+`load` zwraca sterownik tylko wtedy, gdy format i klucz się zgadzają;
+w przeciwnym razie main.py buduje sterownik z reguł i zapisuje nowy
+artefakt (`save`, atomowo – kilka procesów może to robić naraz).
+Wczytanie artefaktu potrzebuje tylko NumPy.
+"""
+
+import hashlib
+import json
+import os
+from typing import Optional
+
+import numpy as np
+
+from compiled import CompiledController
+
+
+FORMAT = 1
+
+# Keys of `CompiledController.arrays` that hold one array per variable.
+_LISTS = ("in_universes", "in_mfs", "out_universes", "out_mfs")
+_LABELS = ("inputs", "outputs", "rule_labels")
+
+
+def spec_key(*parts) -> str:
+    """SHA-256 of the JSON form of `parts` (anything JSON-serializable)."""
+    blob = json.dumps([FORMAT, *parts], sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def save(path: str, controller: CompiledController, key: str) -> None:
+    """Write `controller` to `path` under `key` (atomic replace)."""
+    arrays = controller.arrays()
+    data = {}
+    for name, value in arrays.items():
+        if name in _LISTS:
+            for i, a in enumerate(value):
+                data[f"{name}.{i}"] = a
+        elif name not in _LABELS:
+            data[name] = value
+    meta = {"format": FORMAT, "key": key, **{name: list(arrays[name]) for name in _LABELS},
+            "lists": {name: len(arrays[name]) for name in _LISTS}}
+    data["meta"] = np.array(json.dumps(meta))
+    tmp = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(tmp, **data)
+    os.replace(tmp, path)
+
+
+def load(path: str, key: Optional[str] = None) -> Optional[CompiledController]:
+    """Controller stored in `path`, or None if missing, stale or unreadable.
+
+    Args:
+        path: Artifact file.
+        key: Expected `spec_key`; None accepts any key.
+    """
+    try:
+        with np.load(path) as f:
+            meta = json.loads(str(f["meta"]))
+            if meta.get("format") != FORMAT or (key is not None and meta.get("key") != key):
+                return None
+            arrays = {name: meta[name] for name in _LABELS}
+            for name, count in meta["lists"].items():
+                arrays[name] = [f[f"{name}.{i}"] for i in range(count)]
+            for name in f.files:
+                if name != "meta" and "." not in name:
+                    arrays[name] = f[name]
+    except (OSError, KeyError, ValueError):
+        return None
+    return CompiledController(arrays)
@@ -0,0 +1,267 @@
+"""
+====================================================================
+BENCHMARK REGRESJI (DETERMINISTYCZNE LOTY)
+====================================================================
+
+Autorzy: s27433, s28866
+Technologia: Python 3.11, NumPy, Gymnasium (bez okna)
+
+--------------------------------------------------------------------
+OPIS:
+--------------------------------------------------------------------
+Blok ``__main__`` w main.py losuje seed i pokazuje jeden lot, więc nie
+da się nim porównać dwóch wersji sterownika. Ten moduł:
+
+1.  leci stały katalog seedów (CATALOGUE) każdym backendem
+    (BACKEND = "skfuzzy", "compiled", "lut", "sugeno") przez `fuzzy_action`,
+    bez okna (render_mode=None),
+2.  zapisuje wzorzec (``--record``): dla każdego backendu nagrody,
+    trajektorie (x, y i akcja w każdym kroku), przepustowość sterownika
+    (wnioskowania/s, pojedynczo i w partii) i lotów (loty/s),
+3.  porównuje bieżący stan ze wzorcem i kończy się kodem 1, gdy:
+    -   średnia nagroda spadła o więcej niż ``--reward-tol``,
+    -   trajektoria odeszła od wzorca o więcej niż ``--traj-tol``,
+    -   przepustowość spadła o więcej niż ``--speed-tol`` (ułamek),
+    -   skfuzzy nie dał wyniku dla większej liczby stanów niż we wzorcu,
+    -   tablica LUT lub następniki Sugeno pochodzą z innego sterownika
+        (klucz `main.controller_key`) – wtedy też nie da się nagrać wzorca.
+
+Przepustowość zależy od maszyny – wzorzec należy nagrać na tej samej
+maszynie, na której działa sprawdzanie (albo użyć ``--no-speed``).
+Backend "lut" jest pomijany, gdy nie ma tablicy LUT_PATH, a "sugeno",
+gdy nie ma dopasowanych następników SUGENO_PATH. Wzorzec leży obok
+main.py (REFERENCE_PATH), niezależnie od katalogu roboczego.
+
+Przykład:
+
+    python benchmark.py --record
+    python benchmark.py
+    python benchmark.py --backends compiled,lut --speed-tol 0.2
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+import main
+
+
+CATALOGUE = (0, 1, 2, 3, 5, 8, 13, 21, 42, 99, 123, 2024)
+BACKENDS = ("skfuzzy", "compiled", "lut", "sugeno")
+MAX_STEPS = 600
+REFERENCE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "benchmark_reference.json")
+
+# Inputs for the inference timings: states seen in the catalogue flights.
+INFERENCE_SAMPLES = 2000
+
+
+def available(backend: str) -> bool:
+    """Whether `backend` has its data file (the surrogates need one)."""
+    if backend == "lut":
+        return os.path.exists(main.LUT_PATH)
+    if backend == "sugeno":
+        return os.path.exists(main.SUGENO_PATH)
+    return backend in BACKENDS
+
+
+def stale(backend: str) -> Optional[str]:
+    """Why the data of `backend` does not match the current controller, or None.
+
+    Uses the key checks of `main._fast_controller` (LUT table, Sugeno
+    consequents).
+    """
+    if backend not in ("lut", "sugeno"):
+        return None
+    old = main.BACKEND
+    main.BACKEND = backend
+    try:
+        main._fast_controller()
+    except ValueError as e:
+        return str(e)
+    finally:
+        main.BACKEND = old
+    return None
+
+
+def fly(seed: int, max_steps: int = MAX_STEPS):
+    """One headless flight with `main.fuzzy_action` (current BACKEND).
+
+    Returns:
+        tuple: (total reward, trajectory (steps, 4): x, y, main, lateral,
+        observations (steps, 8)).
+    """
+    import gymnasium as gym
+    env = gym.make("LunarLanderContinuous-v3")
+    try:
+        obs, _ = env.reset(seed=seed)
+        main._prev_action = np.array([0.0, 0.0], dtype=np.float32)
+        total_reward = 0.0
+        traj, seen = [], []
+        for _ in range(max_steps):
+            action = main.fuzzy_action(obs)
+            seen.append(obs)
+            traj.append((obs[0], obs[1], action[0], action[1]))
+            obs, reward, terminated, truncated, _ = env.step(action)
+            total_reward += reward
+            if terminated or truncated:
+                break
+    finally:
+        env.close()
+    return total_reward, np.array(traj, dtype=np.float64), np.array(seen, dtype=np.float64)
+
+
+def _inputs(observations: np.ndarray) -> List[Dict[str, float]]:
+    x, y, vx, vy, th, dth = observations[:, :6].T
+    X = np.column_stack([np.clip(th, -1.8, 1.8), np.clip(dth, -3.5, 3.5), np.clip(vx, -3.5, 3.5),
+                         np.clip(vy, -7.0, 3.0), np.clip(x, -1.6, 1.6), np.clip(y, 0.0, 1.6)])
+    return [dict(zip(main.INPUTS, row)) for row in X.tolist()]
+
+
+def inference_rate(backend: str, observations: np.ndarray) -> Dict[str, float]:
+    """Inferences per second of `backend`, one call per state and batched."""
+    rows = _inputs(observations)
+    if backend == "skfuzzy":
+        from skfuzzy.control.exceptions import CrispValueCalculatorError
+        sim = main.sim
+        failures = 0
+        t0 = time.perf_counter()
+        for row in rows:
+            sim.reset()
+            for name, value in row.items():
+                sim.input[name] = value
+            try:
+                sim.compute()
+            except CrispValueCalculatorError:
+                failures += 1  # no output (fuzzy_action keeps the previous action)
+        return {"single_per_s": len(rows) / (time.perf_counter() - t0), "failures": failures}
+    ctl = main._fast_controller()
+    t0 = time.perf_counter()
+    for row in rows:
+        ctl.compute(row)
+    single = len(rows) / (time.perf_counter() - t0)
+    X = np.array([[row[name] for name in main.INPUTS] for row in rows])
+    t0 = time.perf_counter()
+    ctl.compute_batch(X)
+    return {"single_per_s": single, "batch_per_s": len(rows) / (time.perf_counter() - t0)}
+
+
+def run_backend(backend: str, seeds: Sequence[int] = CATALOGUE) -> Dict[str, object]:
+    """Fly the catalogue with `backend` and time its controller."""
+    old = main.BACKEND
+    main.BACKEND = backend
+    try:
+        rewards, trajectories, seen = [], [], []
+        steps = 0
+        t0 = time.perf_counter()
+        for seed in seeds:
+            reward, traj, obs = fly(seed)
+            rewards.append(reward)
+            trajectories.append(traj)
+            seen.append(obs)
+            steps += traj.shape[0]
+        wall = time.perf_counter() - t0
+        observations = np.concatenate(seen)
+        pick = np.linspace(0, observations.shape[0] - 1, min(INFERENCE_SAMPLES, observations.shape[0]))
+        rates = inference_rate(backend, observations[pick.astype(int)])
+    finally:
+        main.BACKEND = old
+    return {
+        "seeds": list(seeds),
+        "rewards": rewards,
+        "mean_reward": float(np.mean(rewards)),
+        "trajectories": [np.round(t, 6).tolist() for t in trajectories],
+        "episodes_per_s": len(seeds) / wall,
+        "steps_per_s": steps / wall,
+        **rates,
+    }
+
+
+def compare(backend: str, ref: Dict[str, object], cur: Dict[str, object], reward_tol: float,
+            traj_tol: float, speed_tol: Optional[float]) -> List[str]:
+    """Regressions of `cur` against `ref` (empty list = pass)."""
+    problems = []
+    if ref["seeds"] != cur["seeds"]:
+        return [f"{backend}: katalog seedów różni się od wzorca – nagraj wzorzec ponownie"]
+    if cur["mean_reward"] < ref["mean_reward"] - reward_tol:
+        problems.append(f"{backend}: średnia nagroda {cur['mean_reward']:.2f} < wzorzec {ref['mean_reward']:.2f}")
+    for seed, a, b in zip(cur["seeds"], ref["trajectories"], cur["trajectories"]):
+        a, b = np.array(a), np.array(b)
+        if a.shape != b.shape:
+            problems.append(f"{backend}: seed {seed}: {b.shape[0]} kroków zamiast {a.shape[0]}")
+        elif a.size and np.abs(a - b).max() > traj_tol:
+            problems.append(f"{backend}: seed {seed}: trajektoria odbiega o {np.abs(a - b).max():.2e}")
+    if cur.get("failures", 0) > ref.get("failures", 0):
+        problems.append(f"{backend}: {cur['failures']} nieudanych wnioskowań (wzorzec {ref.get('failures', 0)})")
+    if speed_tol is not None:
+        for key in ("single_per_s", "batch_per_s", "episodes_per_s"):
+            if key in ref and key in cur and cur[key] < ref[key] * (1.0 - speed_tol):
+                problems.append(f"{backend}: {key} {cur[key]:.0f} < {ref[key]:.0f} (-{100 * speed_tol:.0f}%)")
+    return problems
+
+
+def _line(backend: str, r: Dict[str, object]) -> str:
+    batch = f"{r['batch_per_s']:10.0f}" if "batch_per_s" in r else f"{'-':>10s}"
+    failures = f"  failures {r['failures']}" if "failures" in r else ""
+    return (f"{backend:9s} reward {r['mean_reward']:8.2f}  inf/s {r['single_per_s']:9.0f}  batch/s {batch}  "
+            f"episodes/s {r['episodes_per_s']:6.2f}{failures}")
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Deterministic regression benchmark of the lander controller")
+    parser.add_argument("--record", action="store_true", help="Write the reference instead of checking")
+    parser.add_argument("--reference", default=REFERENCE_PATH, help="Reference JSON")
+    parser.add_argument("--backends", default=",".join(BACKENDS), help="Comma separated backends")
+    parser.add_argument("--reward-tol", type=float, default=1.0, help="Allowed drop of the mean reward")
+    parser.add_argument("--traj-tol", type=float, default=1e-4, help="Allowed trajectory deviation")
+    parser.add_argument("--speed-tol", type=float, default=0.3, help="Allowed throughput drop (fraction)")
+    parser.add_argument("--no-speed", action="store_true", help="Do not check throughput")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    backends = [b for b in args.backends.split(",") if b]
+    for b in backends:
+        if b not in BACKENDS:
+            sys.exit(f"Nieznany backend: {b}")
+    results = {}
+    problems = []
+    for b in backends:
+        if not available(b):
+            print(f"{b:9s} skipped (no {main.LUT_PATH if b == 'lut' else main.SUGENO_PATH})")
+            continue
+        reason = stale(b)
+        if reason is not None:
+            print(f"{b:9s} stale: {reason}")
+            problems.append(f"{b}: {reason}")
+            continue
+        results[b] = run_backend(b)
+        print(_line(b, results[b]), flush=True)
+
+    if args.record:
+        if problems:
+            sys.exit("Reference not written: rebuild the stale surrogates first")
+        with open(args.reference, "w", encoding="utf-8") as f:
+            json.dump({"max_steps": MAX_STEPS, "backends": results}, f)
+        print(f"Reference written to {args.reference}")
+        sys.exit(0)
+
+    with open(args.reference, "r", encoding="utf-8") as f:
+        reference = json.load(f)["backends"]
+    for b, cur in results.items():
+        if b not in reference:
+            print(f"{b:9s} no reference, not checked")
+            continue
+        problems += compare(b, reference[b], cur, args.reward_tol, args.traj_tol,
+                            None if args.no_speed else args.speed_tol)
+    if problems:
+        print("\nREGRESSION:")
+        for p in problems:
+            print(f"  {p}")
+        sys.exit(1)
+    print("\nOK")
@@ -0,0 +1,393 @@
+"""
+====================================================================
+SKOMPILOWANY STEROWNIK ROZMYTY (NumPy)
+====================================================================
+
+Autorzy: s27433, s28866
+Technologia: Python 3.11, NumPy, scikit-fuzzy (tylko przy kompilacji)
+
+--------------------------------------------------------------------
+OPIS:
+--------------------------------------------------------------------
+`ctrl.ControlSystemSimulation.compute()` przechodzi graf reguł,
+interpoluje funkcje przynależności i liczy środek ciężkości w pętli
+Pythona – kilka milisekund na każdy krok symulacji.
+
+`CompiledController` przyjmuje tę samą listę `ctrl.Rule` i jednorazowo
+zamienia ją na tablice NumPy:
+
+1.  funkcje przynależności wejść i wyjść (wartości na uniwersach),
+2.  reguły w postaci DNF: każda reguła to alternatywa klauzul, każda
+    klauzula to koniunkcja literałów (termów lub ich negacji);
+    macierz indeksów literałów jest dopełniona kolumną jedynek,
+3.  pary (reguła → term wyjściowy, waga).
+
+Jedno wnioskowanie to kilka operacji wektorowych: interpolacja
+przynależności, min po klauzulach, max po regułach (fmax, jak w
+skfuzzy), a potem defuzyfikacja dokładnie jak w skfuzzy: uniwersum
+wyjścia jest uzupełniane o punkty przecięcia termów z poziomem odcięcia,
+termy są obcinane (min), sumowane (max), a środek ciężkości liczony
+wzorem na trapezy. Wyniki zgadzają się z skfuzzy z dokładnością do
+błędów zaokrągleń (~1e-12).
+
+Wszystkie metody przyjmują partie obserwacji (N wierszy), więc ten sam
+kod obsługuje pojedynczy krok i całe wektory środowisk. Gdy żadna
+reguła nie zadziała (pusta suma przynależności – skfuzzy zgłasza wtedy
+wyjątek), wynikiem jest NaN.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+
+_EPS = np.finfo(float).eps
+
+
+class CompiledController:
+    """Mamdani system (min/max, centroid) compiled to NumPy arrays.
+
+    Attributes:
+        inputs: Input labels, in column order of `compute_batch`.
+        outputs: Output labels, in column order of the result.
+        rule_labels: Labels of the rules, in order.
+        chunk_rows: Rows per chunk in `compute_batch`.
+    """
+
+    chunk_rows: int = 512
+
+    def __init__(self, arrays: Mapping[str, object]) -> None:
+        """Build from the arrays of `compile_rules` (see `from_rules`)."""
+        self.inputs: Tuple[str, ...] = tuple(arrays["inputs"])
+        self.outputs: Tuple[str, ...] = tuple(arrays["outputs"])
+        self.rule_labels: Tuple[str, ...] = tuple(arrays["rule_labels"])
+        self.in_universes: List[np.ndarray] = [np.asarray(u, float) for u in arrays["in_universes"]]
+        self.in_mfs: List[np.ndarray] = [np.asarray(m, float) for m in arrays["in_mfs"]]
+        self.neg_terms = np.asarray(arrays["neg_terms"], np.intp)
+        self.clause_lits = np.asarray(arrays["clause_lits"], np.intp)
+        self.rule_starts = np.asarray(arrays["rule_starts"], np.intp)
+        self.pair_rule = np.asarray(arrays["pair_rule"], np.intp)
+        self.pair_weight = np.asarray(arrays["pair_weight"], float)
+        self.term_pairs = np.asarray(arrays["term_pairs"], np.intp)
+        self.out_universes: List[np.ndarray] = [np.asarray(u, float) for u in arrays["out_universes"]]
+        self.out_mfs: List[np.ndarray] = [np.asarray(m, float) for m in arrays["out_mfs"]]
+        self.out_term_offsets = np.asarray(arrays["out_term_offsets"], np.intp)
+        self._prepare_inputs()
+        self._prepare_outputs()
+
+    @classmethod
+    def from_rules(cls, rules: Sequence, inputs: Optional[Sequence[str]] = None,
+                   outputs: Optional[Sequence[str]] = None) -> "CompiledController":
+        """Compile a list of `skfuzzy.control.Rule` objects."""
+        return cls(compile_rules(rules, inputs, outputs))
+
+    def arrays(self) -> Dict[str, object]:
+        """The arrays this controller was built from (inverse of the constructor)."""
+        return {
+            "inputs": list(self.inputs), "outputs": list(self.outputs),
+            "rule_labels": list(self.rule_labels),
+            "in_universes": self.in_universes, "in_mfs": self.in_mfs,
+            "neg_terms": self.neg_terms, "clause_lits": self.clause_lits,
+            "rule_starts": self.rule_starts, "pair_rule": self.pair_rule,
+            "pair_weight": self.pair_weight, "term_pairs": self.term_pairs,
+            "out_universes": self.out_universes, "out_mfs": self.out_mfs,
+            "out_term_offsets": self.out_term_offsets,
+        }
+
+    def freeze(self) -> "CompiledController":
+        """Mark every array read-only (for a controller shared between threads)."""
+        for value in vars(self).values():
+            for a in value if isinstance(value, list) else [value]:
+                if isinstance(a, np.ndarray):
+                    a.setflags(write=False)
+        return self
+
+    def _prepare_inputs(self) -> None:
+        """Input universes and term tables stacked into padded 2-D arrays."""
+        width = max(u.shape[0] for u in self.in_universes)
+        n_in = len(self.in_universes)
+        self._in_grid = np.full((n_in, width), np.inf)
+        self._in_first = np.array([u[0] for u in self.in_universes])
+        self._in_last = np.array([u[-1] for u in self.in_universes])
+        self._in_top = np.array([u.shape[0] - 2 for u in self.in_universes])
+        term_input, base, slope, end = [], [], [], []
+        for i, (u, mfs) in enumerate(zip(self.in_universes, self.in_mfs)):
+            self._in_grid[i, :u.shape[0]] = u
+            pad = width - u.shape[0]
+            for mf in mfs:
+                term_input.append(i)
+                base.append(np.pad(mf, (0, pad)))
+                slope.append(np.pad((mf[1:] - mf[:-1]) / (u[1:] - u[:-1]), (0, pad + 1)))
+                end.append(mf[-1])
+        self._term_input = np.array(term_input, np.intp)
+        self._term_row = np.arange(len(term_input)) * width
+        self._term_base = np.array(base).ravel()
+        self._term_slope = np.array(slope).ravel()
+        self._term_end = np.array(end)
+
+    def _prepare_outputs(self) -> None:
+        """Output segments of all outputs side by side, terms padded to one count.
+
+        Column s of every table is one segment [x0, x0 + dx] of some output
+        universe; row t is the t-th term of that output (padding terms have
+        zero membership and a zero cut).
+        """
+        n_terms = int(np.diff(self.out_term_offsets).max())
+        zero_cut = int(self.out_term_offsets[-1])
+        x0, dx, m0, m1, cut = [], [], [], [], []
+        starts = [0]
+        for o, (u, mfs) in enumerate(zip(self.out_universes, self.out_mfs)):
+            n = u.shape[0] - 1
+            pad = ((0, n_terms - mfs.shape[0]), (0, 0))
+            x0.append(u[:-1])
+            dx.append(u[1:] - u[:-1])
+            m0.append(np.pad(mfs[:, :-1], pad))
+            m1.append(np.pad(mfs[:, 1:], pad))
+            idx = np.full(n_terms, zero_cut, np.intp)
+            idx[:mfs.shape[0]] = np.arange(self.out_term_offsets[o], self.out_term_offsets[o + 1])
+            cut.append(np.repeat(idx[:, None], n, axis=1))
+            starts.append(starts[-1] + n)
+        self._seg_x0 = np.concatenate(x0)
+        self._seg_dx = np.concatenate(dx)
+        self._seg_m0 = np.concatenate(m0, axis=1)
+        self._seg_m1 = np.concatenate(m1, axis=1)
+        dmf = self._seg_m1 - self._seg_m0
+        self._seg_dmf = np.where(dmf == 0.0, 1.0, dmf)
+        self._seg_slope = dmf / self._seg_dx
+        self._seg_cut = np.concatenate(cut, axis=1)
+        self._seg_starts = np.array(starts[:-1], np.intp)
+
+    # ----------------------------------------------------------------
+    # Inference steps
+    # ----------------------------------------------------------------
+
+    def fuzzify(self, X: np.ndarray) -> np.ndarray:
+        """Literal memberships (N, L + 1); the last column is all ones.
+
+        Term memberships are `np.interp` of the term on its universe (zero
+        outside it), for all inputs and terms at once.
+        """
+        X = np.atleast_2d(np.asarray(X, float))
+        j = (X[:, :, None] >= self._in_grid).sum(axis=2) - 1
+        j = np.clip(j, 0, self._in_top)
+        x0 = np.take_along_axis(self._in_grid, j.T, axis=1).T
+        v = X[:, self._term_input]
+        k = self._term_row + j[:, self._term_input]
+        mu = self._term_slope[k] * (v - x0[:, self._term_input]) + self._term_base[k]
+        at_end = v == self._in_last[self._term_input]
+        if at_end.any():
+            mu = np.where(at_end, self._term_end, mu)
+        outside = (v < self._in_first[self._term_input]) | (v > self._in_last[self._term_input])
+        mu[outside] = 0.0
+        parts = [mu]
+        if self.neg_terms.size:
+            parts.append(1.0 - mu[:, self.neg_terms])
+        parts.append(np.ones((mu.shape[0], 1)))
+        return np.concatenate(parts, axis=1)
+
+    def rule_strengths(self, X: np.ndarray) -> np.ndarray:
+        """Firing strength of every rule: (N, R)."""
+        mu = self.fuzzify(X)
+        clauses = mu[:, self.clause_lits].min(axis=2)
+        return np.maximum.reduceat(clauses, self.rule_starts, axis=1)
+
+    def cuts(self, strengths: np.ndarray) -> np.ndarray:
+        """Accumulated activation of every output term: (N, K)."""
+        act = strengths[:, self.pair_rule] * self.pair_weight
+        act = np.concatenate([act, np.zeros((act.shape[0], 1))], axis=1)
+        return act[:, self.term_pairs].max(axis=2)
+
+    def defuzzify(self, cuts: np.ndarray) -> np.ndarray:
+        """Centroid of every output: (N, n_outputs), NaN where the area is empty.
+
+        Follows skfuzzy: the points where a term crosses its cut are added
+        to the universe, every term is clipped at its cut, the clipped terms
+        are combined with max and the centroid is summed over trapezoids.
+        Here each universe segment gets its two ends plus one candidate
+        crossing per term (the left end when the term does not cross), so
+        all outputs are handled in one fixed-shape pass.
+        """
+        n = cuts.shape[0]
+        c = np.concatenate([cuts, np.zeros((n, 1))], axis=1)[:, self._seg_cut]   # (N, T, S)
+        m0, m1 = self._seg_m0, self._seg_m1
+        x0 = self._seg_x0
+        above0 = np.where(c == 0.0, m0 > c, m0 >= c)
+        above1 = np.where(c == 0.0, m1 > c, m1 >= c)
+        xc = np.where(above0 != above1, x0 + (c - m0) * self._seg_dx / self._seg_dmf, x0)
+        left = np.broadcast_to(x0, (n, 1, x0.shape[0]))
+        right = np.broadcast_to(x0 + self._seg_dx, (n, 1, x0.shape[0]))
+        xs = np.concatenate([left, np.sort(xc, axis=1), right], axis=1)         # (N, T+2, S)
+        local = xs[:, :-1, :] - x0
+        mf = m0[None, :, None, :] + self._seg_slope[None, :, None, :] * local[:, None, :, :]
+        ys = np.minimum(mf, c[:, :, None, :]).max(axis=1)                      # (N, T+1, S)
+        y_end = np.minimum(m1, c).max(axis=1)[:, None, :]
+        ys = np.concatenate([ys, y_end], axis=1)                                # (N, T+2, S)
+
+        x1, x2 = xs[:, :-1], xs[:, 1:]
+        y1, y2 = ys[:, :-1], ys[:, 1:]
+        w = x2 - x1
+        h = y1 + y2
+        area = 0.5 * w * h
+        with np.errstate(invalid="ignore", divide="ignore"):
+            moment = np.where(h > 0.0, (2.0 / 3.0 * w * (y2 + 0.5 * y1)) / h + x1, 0.0)
+        starts = self._seg_starts
+        total = np.add.reduceat(area.sum(axis=1), starts, axis=1)
+        res = np.add.reduceat((moment * area).sum(axis=1), starts, axis=1) / np.fmax(total, _EPS)
+        peak = np.maximum.reduceat(ys.max(axis=1), starts, axis=1)
+        res[peak == 0.0] = np.nan
+        return res
+
+    def compute_batch(self, X: np.ndarray) -> np.ndarray:
+        """Crisp outputs (N, n_outputs) for inputs X (N, n_inputs).
+
+        Large batches are processed `chunk_rows` at a time, which bounds the
+        temporary arrays of `defuzzify` (a few kB per row).
+        """
+        X = np.atleast_2d(np.asarray(X, float))
+        if X.shape[0] <= self.chunk_rows:
+            return self.defuzzify(self.cuts(self.rule_strengths(X)))
+        out = np.empty((X.shape[0], len(self.outputs)))
+        for i in range(0, X.shape[0], self.chunk_rows):
+            part = X[i:i + self.chunk_rows]
+            out[i:i + part.shape[0]] = self.defuzzify(self.cuts(self.rule_strengths(part)))
+        return out
+
+    def compute(self, inputs: Mapping[str, float]) -> Dict[str, float]:
+        """Single inference, like ``sim.input[...] = ...; sim.compute(); sim.output``."""
+        row = np.array([[inputs[name] for name in self.inputs]], float)
+        res = self.compute_batch(row)[0]
+        return {name: float(v) for name, v in zip(self.outputs, res)}
+
+
+# --------------------------------------------------------------------
+# Compilation from skfuzzy rules
+# --------------------------------------------------------------------
+
+def _dnf(node, negate: bool = False) -> List[List[Tuple[object, bool]]]:
+    """Antecedent as a list of clauses, each a list of (Term, negated)."""
+    from skfuzzy.control.term import Term, TermAggregate
+
+    if isinstance(node, Term):
+        return [[(node, negate)]]
+    if not isinstance(node, TermAggregate):
+        raise TypeError(f"Nieobsługiwany element reguły: {node!r}")
+    if node.kind == "not":
+        return _dnf(node.term1, not negate)
+    kind = node.kind
+    if negate:  # De Morgan
+        kind = "or" if kind == "and" else "and"
+    left, right = _dnf(node.term1, negate), _dnf(node.term2, negate)
+    if kind == "or":
+        return left + right
+    return [a + b for a in left for b in right]
+
+
+def compile_rules(rules: Sequence, inputs: Optional[Sequence[str]] = None,
+                  outputs: Optional[Sequence[str]] = None) -> Dict[str, object]:
+    """Turn `ctrl.Rule` objects into the arrays of `CompiledController`.
+
+    Args:
+        rules: Rules using fmin/fmax aggregation and centroid outputs.
+        inputs: Input labels in column order (default: order of appearance).
+        outputs: Output labels in column order (default: order of appearance).
+
+    Raises:
+        ValueError: For rules or variables this compiler does not support.
+    """
+    clauses_per_rule = []
+    in_vars: Dict[str, object] = {}
+    out_vars: Dict[str, object] = {}
+    for rule in rules:
+        if rule.and_func is not np.fmin or rule.or_func is not np.fmax:
+            raise ValueError(f"Reguła {rule.label}: obsługiwane są tylko and=fmin, or=fmax")
+        clauses = _dnf(rule.antecedent)
+        for clause in clauses:
+            for term, _ in clause:
+                in_vars.setdefault(term.parent.label, term.parent)
+        clauses_per_rule.append(clauses)
+        for wt in rule.consequent:
+            var = wt.term.parent
+            if var.defuzzify_method != "centroid":
+                raise ValueError(f"{var.label}: obsługiwana jest tylko defuzyfikacja 'centroid'")
+            out_vars.setdefault(var.label, var)
+
+    inputs = list(inputs) if inputs is not None else list(in_vars)
+    outputs = list(outputs) if outputs is not None else list(out_vars)
+    if set(inputs) != set(in_vars):
+        raise ValueError(f"Wejścia reguł {sorted(in_vars)} nie zgadzają się z {sorted(inputs)}")
+    if set(outputs) != set(out_vars):
+        raise ValueError(f"Wyjścia reguł {sorted(out_vars)} nie zgadzają się z {sorted(outputs)}")
+
+    # Literal columns: every input term, then negated ones.
+    term_col: Dict[Tuple[str, str], int] = {}
+    in_universes, in_mfs = [], []
+    for name in inputs:
+        var = in_vars[name]
+        in_universes.append(np.asarray(var.universe, float))
+        in_mfs.append(np.array([np.asarray(t.mf, float) for t in var.terms.values()]))
+        for label in var.terms:
+            term_col[(name, label)] = len(term_col)
+    neg_terms: List[int] = []
+    neg_col: Dict[int, int] = {}
+
+    def literal(term, negated: bool) -> int:
+        col = term_col[(term.parent.label, term.label)]
+        if not negated:
+            return col
+        if col not in neg_col:
+            neg_col[col] = len(term_col) + len(neg_terms)
+            neg_terms.append(col)
+        return neg_col[col]
+
+    clause_rows: List[List[int]] = []
+    rule_starts: List[int] = []
+    for clauses in clauses_per_rule:
+        rule_starts.append(len(clause_rows))
+        for clause in clauses:
+            clause_rows.append(sorted({literal(t, n) for t, n in clause}))
+    ones = len(term_col) + len(neg_terms)
+    width = max(len(r) for r in clause_rows)
+    clause_lits = np.full((len(clause_rows), width), ones, np.intp)
+    for i, row in enumerate(clause_rows):
+        clause_lits[i, :len(row)] = row
+
+    # Output terms that some rule activates (others stay "None" in skfuzzy).
+    out_terms: List[Tuple[str, str]] = []
+    for name in outputs:
+        for label in out_vars[name].terms:
+            out_terms.append((name, label))
+    pairs: Dict[Tuple[str, str], List[int]] = {k: [] for k in out_terms}
+    pair_rule, pair_weight = [], []
+    for r, rule in enumerate(rules):
+        for wt in rule.consequent:
+            pairs[(wt.term.parent.label, wt.term.label)].append(len(pair_rule))
+            pair_rule.append(r)
+            pair_weight.append(float(wt.weight))
+    used = [k for k in out_terms if pairs[k]]
+    pmax = max(len(pairs[k]) for k in used)
+    term_pairs = np.full((len(used), pmax), len(pair_rule), np.intp)
+    for i, k in enumerate(used):
+        term_pairs[i, :len(pairs[k])] = pairs[k]
+
+    out_universes, out_mfs, offsets = [], [], [0]
+    for name in outputs:
+        var = out_vars[name]
+        labels = [label for (n, label) in used if n == name]
+        out_universes.append(np.asarray(var.universe, float))
+        out_mfs.append(np.array([np.asarray(var.terms[label].mf, float) for label in labels]))
+        offsets.append(offsets[-1] + len(labels))
+
+    return {
+        "inputs": inputs, "outputs": outputs,
+        "rule_labels": [str(rule.label) for rule in rules],
+        "in_universes": in_universes, "in_mfs": in_mfs,
+        "neg_terms": np.array(neg_terms, np.intp), "clause_lits": clause_lits,
+        "rule_starts": np.array(rule_starts, np.intp),
+        "pair_rule": np.array(pair_rule, np.intp), "pair_weight": np.array(pair_weight, float),
+        "term_pairs": term_pairs,
+        "out_universes": out_universes, "out_mfs": out_mfs,
+        "out_term_offsets": np.array(offsets, np.intp),
+    }
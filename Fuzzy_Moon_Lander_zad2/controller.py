@@ -0,0 +1,102 @@
+"""
+====================================================================
+STEROWNIK BEZ STANU GLOBALNEGO (WIELOWĄTKOWY)
+====================================================================
+
+Autorzy: s27433, s28866
+Technologia: Python 3.11, NumPy, Gymnasium
+
+--------------------------------------------------------------------
+OPIS:
+--------------------------------------------------------------------
+`main.fuzzy_action` trzyma wygładzoną akcję w zmiennej globalnej
+`_prev_action` i korzysta z jednej, współdzielonej symulacji skfuzzy
+(`sim`), więc dwa loty naraz w jednym procesie psują sobie nawzajem
+stan.
+
+`LanderController` trzyma tylko skompilowaną bazę reguł (tablice NumPy
+z `CompiledController` lub `LookupController`; wspólny `main.controller`
+jest tylko do odczytu od wczytania) i stałe ALPHA / DEADZONE. Stan lotu
+– poprzednia akcja i licznik kroków – jest w małym obiekcie
+`EpisodeState` (``__slots__``), który wywołujący tworzy na każdy lot
+i przekazuje do `act`. Jeden sterownik
+może więc obsługiwać dowolnie wiele lotów naraz, także w wątkach
+(`fly_many`), bez budowania grafu skfuzzy na nowo.
+
+Wynik `act` jest identyczny z `fuzzy_action` (backend "compiled").
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+import main
+
+
+class EpisodeState:
+    """Per-episode state of a `LanderController`."""
+
+    __slots__ = ("prev_action", "steps")
+
+    def __init__(self) -> None:
+        self.prev_action = np.zeros(2, dtype=np.float32)
+        self.steps = 0
+
+
+class LanderController:
+    """Re-entrant fuzzy controller: shared rules, caller-owned episode state.
+
+    Attributes:
+        model: `CompiledController` or `LookupController`; it is only read,
+            and must not be modified while episodes are flying.
+        alpha: Smoothing factor of the action.
+        deadzone: Lateral thruster deadzone.
+    """
+
+    __slots__ = ("model", "alpha", "deadzone")
+
+    def __init__(self, model=None, alpha: Optional[float] = None, deadzone: Optional[float] = None) -> None:
+        self.model = main.controller if model is None else model
+        self.alpha = main.ALPHA if alpha is None else alpha
+        self.deadzone = main.DEADZONE if deadzone is None else deadzone
+
+    def new_episode(self) -> EpisodeState:
+        return EpisodeState()
+
+    def act(self, obs, state: EpisodeState) -> np.ndarray:
+        """Action for one observation; updates `state` (like `fuzzy_action`)."""
+        action = main.fuzzy_action_batch(np.asarray(obs)[None], state.prev_action[None], self.model,
+                                         self.alpha, self.deadzone)[0]
+        state.prev_action = action
+        state.steps += 1
+        return action
+
+    def act_batch(self, obs: np.ndarray, prev: np.ndarray) -> np.ndarray:
+        """Actions for N landers (see `main.fuzzy_action_batch`)."""
+        return main.fuzzy_action_batch(obs, prev, self.model, self.alpha, self.deadzone)
+
+    def fly(self, seed: Optional[int] = None, max_steps: int = 600, render: bool = False) -> float:
+        """Fly one episode on its own env and return the total reward."""
+        import gymnasium as gym
+        env = gym.make("LunarLanderContinuous-v3", render_mode="human" if render else None)
+        try:
+            obs, _ = env.reset(seed=seed)
+            state = self.new_episode()
+            total_reward = 0.0
+            for _ in range(max_steps):
+                obs, reward, terminated, truncated, _ = env.step(self.act(obs, state))
+                total_reward += reward
+                if terminated or truncated:
+                    break
+        finally:
+            env.close()
+        return total_reward
+
+
+def fly_many(seeds: Sequence[int], workers: int = 4, max_steps: int = 600,
+             controller: Optional[LanderController] = None) -> List[float]:
+    """Fly one episode per seed in a thread pool sharing one controller."""
+    controller = controller or LanderController()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(pool.map(lambda s: controller.fly(s, max_steps), seeds))
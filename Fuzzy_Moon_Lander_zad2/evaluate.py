@@ -0,0 +1,235 @@
+"""
+====================================================================
+EWALUACJA STEROWNIKA NA WEKTOROWYCH ŚRODOWISKACH
+====================================================================
+
+Autorzy: s27433, s28866
+Technologia: Python 3.11, Gymnasium (gymnasium.vector), NumPy
+
+--------------------------------------------------------------------
+OPIS:
+--------------------------------------------------------------------
+Bez okna (render_mode=None) uruchamia wiele lotów naraz na
+`gymnasium.vector.SyncVectorEnv` (jeden proces) lub `AsyncVectorEnv`
+(podprocesy). W każdym kroku sterownik dostaje całą partię obserwacji
+(`fuzzy_action_batch`), a stan wygładzania jest trzymany osobno dla
+każdego środowiska.
+
+Każdy lot ma własny seed z listy. Gdy lot się kończy, jego środowisko
+jest resetowane (``reset_mask``) z następnym seedem z kolejki, więc
+wynik dla danego seeda nie zależy od liczby środowisk ani kolejności.
+
+Raport:
+- odsetek udanych lądowań (lot zakończony spoczynkiem, a nie katastrofą),
+- odsetek lotów z wynikiem >= 200 (kryterium „rozwiązania” zadania),
+- rozkład nagród (średnia, odchylenie, percentyle, min, max),
+- liczba lotów na sekundę,
+- czas sterownika na krok jednego lądownika i na wywołanie partii.
+
+Przykład:
+
+    python evaluate.py --episodes 1000 --envs 64 --mode async --seed 0
+"""
+
+import argparse
+import functools
+import json
+import time
+from typing import Callable, Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+import gymnasium as gym
+from gymnasium.vector import AsyncVectorEnv, AutoresetMode, SyncVectorEnv
+
+from main import fuzzy_action_batch
+
+
+ENV_ID = "LunarLanderContinuous-v3"
+
+
+class EpisodeResult(NamedTuple):
+    """Outcome of one flight.
+
+    Attributes:
+        seed: Seed the environment was reset with.
+        reward: Total reward.
+        steps: Number of steps.
+        landed: True if the lander came to rest (final reward +100),
+            False after a crash, flying off-screen or the step limit.
+    """
+
+    seed: int
+    reward: float
+    steps: int
+    landed: bool
+
+
+class Evaluation(NamedTuple):
+    """Episodes of one run plus timing.
+
+    Attributes:
+        episodes: One result per seed, in seed order.
+        wall_s: Total wall-clock time.
+        controller_s: Time spent in the controller.
+        lander_steps: Steps summed over all episodes.
+        batch_calls: Controller calls (one per vector step).
+    """
+
+    episodes: List[EpisodeResult]
+    wall_s: float
+    controller_s: float
+    lander_steps: int
+    batch_calls: int
+
+
+def make_vector_env(num_envs: int, mode: str = "sync", max_steps: int = 600):
+    """Headless vector env with manual resets (autoreset disabled)."""
+    make = functools.partial(gym.make, ENV_ID, max_episode_steps=max_steps)
+    fns = [make] * num_envs
+    if mode == "sync":
+        return SyncVectorEnv(fns, autoreset_mode=AutoresetMode.DISABLED)
+    if mode == "async":
+        return AsyncVectorEnv(fns, autoreset_mode=AutoresetMode.DISABLED)
+    raise ValueError(f"Nieznany tryb: {mode!r} (sync / async)")
+
+
+def evaluate(seeds: Sequence[int], num_envs: int = 32, mode: str = "sync", max_steps: int = 600,
+             policy: Callable[[np.ndarray, np.ndarray], np.ndarray] = fuzzy_action_batch) -> Evaluation:
+    """Fly one episode per seed on a vector env and collect the results.
+
+    Args:
+        seeds: Episode seeds.
+        num_envs: Environments stepped together (capped at len(seeds)).
+        mode: "sync" (one process) or "async" (one subprocess per env).
+        max_steps: Step limit per episode (truncation).
+        policy: Batched controller, ``policy(obs (N, 8), prev (N, 2)) -> (N, 2)``.
+    """
+    seeds = list(seeds)
+    if len(set(seeds)) != len(seeds):
+        raise ValueError("Seedy muszą być unikalne")
+    if not seeds:
+        return Evaluation([], 0.0, 0.0, 0, 0)
+    n = min(num_envs, len(seeds))
+    envs = make_vector_env(n, mode, max_steps)
+
+    results: Dict[int, EpisodeResult] = {}
+    slot_seed = seeds[:n]
+    queue = iter(seeds[n:])
+    active = np.ones(n, dtype=bool)
+    reward = np.zeros(n)
+    steps = np.zeros(n, dtype=np.int64)
+    prev = np.zeros((n, 2), dtype=np.float32)
+    actions = np.zeros((n, 2), dtype=np.float32)
+    controller_s = 0.0
+    calls = 0
+
+    t0 = time.perf_counter()
+    try:
+        obs, _ = envs.reset(seed=slot_seed)
+        while active.any():
+            t = time.perf_counter()
+            actions[active] = policy(obs[active], prev[active])
+            controller_s += time.perf_counter() - t
+            calls += 1
+            prev[active] = actions[active]
+
+            obs, rew, terminated, truncated, _ = envs.step(actions)
+            reward[active] += rew[active]
+            steps[active] += 1
+            # With autoreset off every finished env must be reset before the next
+            # step, including idle ones (no seeds left) whose results are ignored.
+            done = terminated | truncated
+            if not done.any():
+                continue
+
+            reset_seeds: List[Optional[int]] = [None] * n
+            for i in np.flatnonzero(done):
+                if active[i]:
+                    seed = slot_seed[i]
+                    results[seed] = EpisodeResult(seed, float(reward[i]), int(steps[i]),
+                                                  bool(terminated[i] and rew[i] > 0.0))
+                    nxt = next(queue, None)
+                    if nxt is None:
+                        active[i] = False
+                    else:
+                        slot_seed[i] = nxt
+                reset_seeds[i] = slot_seed[i]
+                reward[i] = 0.0
+                steps[i] = 0
+                prev[i] = 0.0
+                actions[i] = 0.0
+            new_obs, _ = envs.reset(seed=reset_seeds, options={"reset_mask": done})
+            obs[done] = new_obs[done]
+    finally:
+        envs.close()
+    wall = time.perf_counter() - t0
+
+    episodes = [results[s] for s in seeds]
+    return Evaluation(episodes, wall, controller_s, sum(e.steps for e in episodes), calls)
+
+
+def summarize(ev: Evaluation) -> Dict[str, object]:
+    """Success rates, reward distribution and throughput of an evaluation."""
+    rewards = np.array([e.reward for e in ev.episodes])
+    count = len(ev.episodes)
+    if count == 0:
+        return {"episodes": 0}
+    pct = np.percentile(rewards, [5, 25, 50, 75, 95])
+    return {
+        "episodes": count,
+        "landed": float(np.mean([e.landed for e in ev.episodes])),
+        "solved": float(np.mean(rewards >= 200.0)),
+        "reward": {
+            "mean": float(rewards.mean()), "std": float(rewards.std()),
+            "min": float(rewards.min()), "max": float(rewards.max()),
+            "p5": float(pct[0]), "p25": float(pct[1]), "p50": float(pct[2]),
+            "p75": float(pct[3]), "p95": float(pct[4]),
+        },
+        "mean_steps": ev.lander_steps / count,
+        "episodes_per_s": count / ev.wall_s if ev.wall_s else 0.0,
+        "lander_steps_per_s": ev.lander_steps / ev.wall_s if ev.wall_s else 0.0,
+        "controller_us_per_step": 1e6 * ev.controller_s / max(ev.lander_steps, 1),
+        "controller_us_per_call": 1e6 * ev.controller_s / max(ev.batch_calls, 1),
+        "wall_s": ev.wall_s,
+    }
+
+
+def format_summary(s: Dict[str, object]) -> str:
+    """Human-readable report (see `summarize`)."""
+    if not s["episodes"]:
+        return "No episodes."
+    r = s["reward"]
+    return "\n".join([
+        "========== EVALUATION ==========",
+        f"Episodes:        {s['episodes']}",
+        f"Landed:          {100 * s['landed']:.1f}%",
+        f"Score >= 200:    {100 * s['solved']:.1f}%",
+        f"Reward:          mean {r['mean']:.2f}  std {r['std']:.2f}  min {r['min']:.2f}  max {r['max']:.2f}",
+        f"Percentiles:     p5 {r['p5']:.2f}  p25 {r['p25']:.2f}  p50 {r['p50']:.2f}  "
+        f"p75 {r['p75']:.2f}  p95 {r['p95']:.2f}",
+        f"Throughput:      {s['episodes_per_s']:.2f} episodes/s  {s['lander_steps_per_s']:.0f} steps/s",
+        f"Controller:      {s['controller_us_per_step']:.1f} us/step  "
+        f"{s['controller_us_per_call']:.1f} us/batch call",
+        "================================",
+    ])
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Headless batch evaluation of the fuzzy lander controller")
+    parser.add_argument("--episodes", type=int, default=200, help="Number of episodes")
+    parser.add_argument("--envs", type=int, default=32, help="Environments stepped together")
+    parser.add_argument("--mode", choices=("sync", "async"), default="sync", help="Vector env type")
+    parser.add_argument("--seed", type=int, default=0, help="First seed (seeds are consecutive)")
+    parser.add_argument("--max-steps", type=int, default=600, help="Step limit per episode")
+    parser.add_argument("--json", default=None, help="Write the summary and per-seed results here")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    ev = evaluate(range(args.seed, args.seed + args.episodes), args.envs, args.mode, args.max_steps)
+    summary = summarize(ev)
+    print(format_summary(summary))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "episodes": [e._asdict() for e in ev.episodes]}, f, indent=2)
@@ -0,0 +1,341 @@
+"""
+====================================================================
+TABLICA PRZEGLĄDOWA (LUT) ZAMIAST WNIOSKOWANIA ROZMYTEGO
+====================================================================
+
+Autorzy: s27433, s28866
+Technologia: Python 3.11, NumPy (np.memmap), concurrent.futures
+
+--------------------------------------------------------------------
+OPIS:
+--------------------------------------------------------------------
+Wyjście systemu Mamdaniego (main_thrust, lat_thrust) jest
+deterministyczną funkcją sześciu przyciętych wejść
+(theta, dtheta, vx, vy, x, y). Ten moduł:
+
+1.  próbkuje sterownik (`CompiledController` z main.py) na siatce
+    węzłów w każdej osi – równomiernej lub uzupełnionej o punkty załamania
+    funkcji przynależności – w wielu procesach naraz,
+2.  zapisuje wynik jako tablicę .npy (float32) otwieraną przez
+    `np.memmap` – strony pliku są ładowane przez system dopiero przy
+    odczycie i współdzielone między procesami; osie siatki i klucz
+    sterownika (`main.controller_key`) trafiają do pliku .json obok,
+3.  w czasie działania odpowiada interpolacją wieloliniową (64 rogi
+    komórki w 6D) – stała liczba operacji niezależnie od reguł,
+4.  porównuje tablicę z dokładnym sterownikiem (raport błędów) i
+    podpowiada rozdzielczość dla zadanego budżetu pamięci.
+
+W komórce są cztery kanały: dwa wyjścia (0 tam, gdzie skfuzzy nie ma
+wyniku) i dwie flagi ważności (1 / 0). Interpolacja dzieli wyjście przez
+interpolowaną flagę, więc przy brzegu obszaru bez wyniku liczą się tylko
+ważne rogi; gdy flaga < 0.5 wynik to NaN (jak w `CompiledController`).
+
+Tablica próbkowana z innych funkcji przynależności (np. sprzed
+`tune.py`) ma inny klucz: `LookupController.load` z kluczem ją odrzuca,
+więc backend "lut" nie serwuje po cichu starej powierzchni – trzeba ją
+zbudować na nowo.
+
+Domyślnie tablica trafia do main.LUT_PATH (obok main.py), skąd czyta ją
+backend "lut" niezależnie od katalogu roboczego.
+
+Przykład:
+
+    python lut.py sizes
+    python lut.py build
+    python lut.py build --points 11 --out lander_lut_small.npy
+    python lut.py report --samples 20000
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+# Input ranges, as clipped in `fuzzy_action`.
+RANGES: Dict[str, Tuple[float, float]] = {
+    'theta':  (-1.8, 1.8),
+    'dtheta': (-3.5, 3.5),
+    'vx':     (-3.5, 3.5),
+    'vy':     (-7.0, 3.0),
+    'x':      (-1.6, 1.6),
+    'y':      (0.0, 1.6),
+}
+
+CHANNELS = 4          # main, lat, main valid, lat valid
+CHUNK_CELLS = 1 << 16
+
+# Default grid (57 MB): the lateral output changes fastest with theta and
+# dtheta. With this grid the landing rate over 200 seeds is within a few
+# percent of the exact controller; a uniform 11^6 grid (27 MB) loses much
+# more.
+DEFAULT_POINTS = (21, 15, 11, 11, 9, 11)
+
+
+def knots(universe: np.ndarray, mfs: np.ndarray) -> np.ndarray:
+    """Points where some membership function bends (plus both ends).
+
+    skfuzzy interpolates the sampled functions linearly, so bends can only
+    be at universe points.
+    """
+    idx = {0, universe.shape[0] - 1}
+    for mf in mfs:
+        idx.update((np.flatnonzero(np.abs(np.diff(mf, 2)) > 1e-12) + 1).tolist())
+    return universe[sorted(idx)]
+
+
+def make_axes(points=DEFAULT_POINTS, controller=None) -> List[np.ndarray]:
+    """Grid nodes per input: evenly spaced, plus the MF bends of `controller`.
+
+    Args:
+        points: Nodes per axis, one int for all axes or one per input.
+        controller: If given, its membership function bends are added.
+    """
+    if np.isscalar(points):
+        points = [points] * len(RANGES)
+    if len(points) != len(RANGES):
+        raise ValueError(f"Potrzeba {len(RANGES)} liczb węzłów, jest {len(points)}")
+    axes = []
+    for i, name in enumerate(RANGES):
+        lo, hi = RANGES[name]
+        ax = np.linspace(lo, hi, points[i])
+        if controller is not None:
+            ax = np.union1d(ax, knots(controller.in_universes[i], controller.in_mfs[i]))
+        axes.append(ax)
+    return axes
+
+
+def table_bytes(axes: Sequence[np.ndarray]) -> int:
+    """Size of the table for `axes` (float32, `CHANNELS` per cell)."""
+    return int(np.prod([len(a) for a in axes])) * CHANNELS * 4
+
+
+# --------------------------------------------------------------------
+# Building
+# --------------------------------------------------------------------
+
+_worker_controller = None
+
+
+def _init_worker() -> None:
+    global _worker_controller
+    from main import controller
+    _worker_controller = controller
+
+
+def _fill_chunk(path: str, axes: List[np.ndarray], start: int, stop: int) -> None:
+    """Evaluate the controller for flat cells [start, stop) and write them."""
+    shape = tuple(len(a) for a in axes)
+    idx = np.unravel_index(np.arange(start, stop), shape)
+    X = np.column_stack([a[i] for a, i in zip(axes, idx)])
+    out = _worker_controller.compute_batch(X)
+    valid = ~np.isnan(out)
+    block = np.concatenate([np.where(valid, out, 0.0), valid], axis=1).astype(np.float32)
+    table = np.load(path, mmap_mode="r+")
+    table.reshape(-1, CHANNELS)[start:stop] = block
+    table.flush()
+
+
+def build(path: str, axes: Sequence[np.ndarray], workers: Optional[int] = None) -> "LookupController":
+    """Sample the controller on the grid `axes` into `path` (.npy + .json).
+
+    Args:
+        path: Output table (.npy); the axes and `main.controller_key` are
+            written to ``path + ".json"``.
+        axes: Sorted grid nodes for each input, in `RANGES` order.
+        workers: Worker processes (default: CPU count).
+    """
+    from main import controller_key
+    axes = [np.asarray(a, float) for a in axes]
+    shape = tuple(len(a) for a in axes) + (CHANNELS,)
+    table = np.lib.format.open_memmap(path, mode="w+", dtype=np.float32, shape=shape)
+    del table
+    cells = int(np.prod(shape[:-1]))
+    workers = workers or os.cpu_count() or 1
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+        futures = [pool.submit(_fill_chunk, path, axes, s, min(s + CHUNK_CELLS, cells))
+                   for s in range(0, cells, CHUNK_CELLS)]
+        for f in futures:
+            f.result()
+    with open(path + ".json", "w", encoding="utf-8") as f:
+        json.dump({"key": controller_key(), "inputs": list(RANGES),
+                   "outputs": ["main_thrust", "lat_thrust"], "axes": [a.tolist() for a in axes]}, f)
+    return LookupController.load(path)
+
+
+# --------------------------------------------------------------------
+# Runtime
+# --------------------------------------------------------------------
+
+class LookupController:
+    """Multilinear interpolation in a gridded table of controller outputs.
+
+    Same interface as `compiled.CompiledController` (`compute_batch`,
+    `compute`); NaN where the exact controller has no output.
+
+    Attributes:
+        inputs: Input labels, in column order of `compute_batch`.
+        outputs: Output labels.
+        axes: Grid nodes per input.
+        table: Array (*grid, 4), usually a read-only memmap.
+        key: `main.controller_key` of the sampled controller, if known.
+    """
+
+    def __init__(self, table: np.ndarray, axes: Sequence[np.ndarray],
+                 inputs: Sequence[str] = tuple(RANGES),
+                 outputs: Sequence[str] = ("main_thrust", "lat_thrust"), key: Optional[str] = None) -> None:
+        self.table = table
+        self.key = key
+        self.axes = [np.asarray(a, float) for a in axes]
+        self.inputs = tuple(inputs)
+        self.outputs = tuple(outputs)
+        if table.shape != tuple(len(a) for a in self.axes) + (CHANNELS,):
+            raise ValueError(f"Kształt tablicy {table.shape} nie pasuje do osi")
+        self._flat = table.reshape(-1, CHANNELS)
+        strides = np.cumprod([1] + [len(a) for a in self.axes[:0:-1]])[::-1]
+        self._strides = strides.astype(np.intp)
+        # Flat offset of each of the 2^d cell corners; bit d set = upper node on axis d.
+        corners = np.array(np.meshgrid(*[[0, 1]] * len(self.axes), indexing="ij")).reshape(len(self.axes), -1)
+        self._corner_bits = corners.T.astype(bool)                  # (2^d, d)
+        self._offsets = corners.T @ self._strides                   # (2^d,)
+
+    @classmethod
+    def load(cls, path: str, key: Optional[str] = None) -> "LookupController":
+        """Open a table written by `build` (memory-mapped, read-only).
+
+        Args:
+            path: Table (.npy).
+            key: Expected `main.controller_key`; None accepts any table.
+
+        Raises:
+            ValueError: If the table was sampled from another controller.
+        """
+        with open(path + ".json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if key is not None and meta.get("key") != key:
+            raise ValueError(f"{path}: tablica z innego sterownika (zmienione funkcje przynależności "
+                             f"lub reguły) – zbuduj ją ponownie: python lut.py build")
+        return cls(np.load(path, mmap_mode="r"), meta["axes"], meta["inputs"], meta["outputs"], meta.get("key"))
+
+    @property
+    def nbytes(self) -> int:
+        return self.table.nbytes
+
+    def compute_batch(self, X: np.ndarray) -> np.ndarray:
+        """Interpolated outputs (N, 2) for inputs X (N, 6)."""
+        X = np.atleast_2d(np.asarray(X, float))
+        n, d = X.shape
+        base = np.zeros(n, dtype=np.intp)
+        frac = np.empty((n, d))
+        for k, ax in enumerate(self.axes):
+            v = np.clip(X[:, k], ax[0], ax[-1])
+            i = np.clip(np.searchsorted(ax, v, side="right") - 1, 0, len(ax) - 2)
+            frac[:, k] = (v - ax[i]) / (ax[i + 1] - ax[i])
+            base += i * self._strides[k]
+        w = np.where(self._corner_bits, frac[:, None, :], 1.0 - frac[:, None, :]).prod(axis=2)  # (N, 2^d)
+        corners = self._flat[base[:, None] + self._offsets].astype(float)                          # (N, 2^d, 4)
+        acc = np.einsum("nc,nck->nk", w, corners)
+        value, valid = acc[:, :2], acc[:, 2:]
+        with np.errstate(invalid="ignore", divide="ignore"):
+            return np.where(valid >= 0.5, value / valid, np.nan)
+
+    def compute(self, inputs: Mapping[str, float]) -> Dict[str, float]:
+        """Single lookup, like `CompiledController.compute`."""
+        row = np.array([[inputs[name] for name in self.inputs]], float)
+        res = self.compute_batch(row)[0]
+        return {name: float(v) for name, v in zip(self.outputs, res)}
+
+
+# --------------------------------------------------------------------
+# Error report
+# --------------------------------------------------------------------
+
+def random_inputs(samples: int, seed: int = 0) -> np.ndarray:
+    """Uniform random inputs over `RANGES`."""
+    rng = np.random.default_rng(seed)
+    lo = np.array([r[0] for r in RANGES.values()])
+    hi = np.array([r[1] for r in RANGES.values()])
+    return lo + (hi - lo) * rng.random((samples, len(RANGES)))
+
+
+def error_report(lut: LookupController, controller, X: np.ndarray) -> Dict[str, object]:
+    """Errors of `lut` against the exact `controller` on inputs X.
+
+    NaN agreement (both have an output or both have none) is reported
+    separately; errors are over rows where both have an output.
+    """
+    exact = controller.compute_batch(X)
+    t = time.perf_counter()
+    approx = lut.compute_batch(X)
+    lut_s = time.perf_counter() - t
+    report: Dict[str, object] = {"samples": int(X.shape[0]), "table_mb": lut.nbytes / 2**20,
+                                 "grid": [len(a) for a in lut.axes],
+                                 "lut_us_per_row": 1e6 * lut_s / X.shape[0]}
+    for k, name in enumerate(lut.outputs):
+        e_nan, a_nan = np.isnan(exact[:, k]), np.isnan(approx[:, k])
+        both = ~e_nan & ~a_nan
+        err = np.abs(exact[both, k] - approx[both, k])
+        report[name] = {
+            "nan_mismatch": float(np.mean(e_nan != a_nan)),
+            "mae": float(err.mean()) if err.size else 0.0,
+            "rmse": float(np.sqrt((err ** 2).mean())) if err.size else 0.0,
+            "p99": float(np.percentile(err, 99)) if err.size else 0.0,
+            "max": float(err.max()) if err.size else 0.0,
+        }
+    return report
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    import main
+    parser = argparse.ArgumentParser(description="Lookup-table surrogate of the fuzzy lander controller")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    b = sub.add_parser("build", help="Sample the controller into a table")
+    b.add_argument("--points", default=",".join(map(str, DEFAULT_POINTS)),
+                   help="Evenly spaced nodes per axis: one number or six, comma separated")
+    b.add_argument("--knots", action="store_true", help="Also add the membership function bends")
+    b.add_argument("--out", default=main.LUT_PATH, help="Output table (.npy, default: main.LUT_PATH)")
+    b.add_argument("--workers", type=int, default=None, help="Worker processes")
+    r = sub.add_parser("report", help="Compare a table with the exact controller")
+    r.add_argument("path", nargs="?", default=main.LUT_PATH, help="Table (.npy, default: main.LUT_PATH)")
+    r.add_argument("--samples", type=int, default=20000, help="Random test inputs")
+    r.add_argument("--seed", type=int, default=0, help="Seed of the test inputs")
+    s = sub.add_parser("sizes", help="Table size for several resolutions")
+    s.add_argument("--budget-mb", type=float, default=None, help="Mark the finest grid within this size")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    if args.cmd == "build":
+        from main import controller
+        points = [int(p) for p in args.points.split(",")]
+        axes = make_axes(points[0] if len(points) == 1 else points, controller if args.knots else None)
+        print(f"Grid {[len(a) for a in axes]}, {table_bytes(axes) / 2**20:.1f} MB")
+        t0 = time.perf_counter()
+        build(args.out, axes, args.workers)
+        print(f"Built {args.out} in {time.perf_counter() - t0:.1f} s")
+    elif args.cmd == "report":
+        from main import controller, controller_key
+        lut = LookupController.load(args.path, controller_key())
+        print(json.dumps(error_report(lut, controller, random_inputs(args.samples, args.seed)), indent=2))
+    else:
+        from main import controller
+        best = None
+        for points in range(3, 22, 2):
+            for with_knots in (False, True):
+                axes = make_axes(points, controller if with_knots else None)
+                mb = table_bytes(axes) / 2**20
+                if args.budget_mb is not None and mb <= args.budget_mb:
+                    best = (points, with_knots, mb)
+                print(f"points={points:2d} knots={'yes' if with_knots else 'no ':3s} "
+                      f"grid={[len(a) for a in axes]} {mb:10.1f} MB")
+        if args.budget_mb is not None:
+            if best is None:
+                print(f"Nothing fits in {args.budget_mb} MB")
+            else:
+                print(f"Within {args.budget_mb} MB: --points {best[0]}{' --knots' if best[1] else ''} "
+                      f"({best[2]:.1f} MB)")
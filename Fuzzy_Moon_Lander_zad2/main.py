@@ -37,83 +37,231 @@ WYJŚCIA SYSTEMU (zmienne wynikowe – Consequents):
 
 """
 
+import inspect
+import json
+import os
+from typing import NamedTuple, Optional
+
 import numpy as np
-import gymnasium as gym
-import skfuzzy as fuzz
-from skfuzzy import control as ctrl
-
-
-theta   = ctrl.Antecedent(np.linspace(-1.8, 1.8, 121),  'theta')
-dtheta  = ctrl.Antecedent(np.linspace(-3.5, 3.5, 121),  'dtheta')
-vx      = ctrl.Antecedent(np.linspace(-3.5, 3.5, 121),  'vx')
-vy      = ctrl.Antecedent(np.linspace(-7.0, 3.0, 121),  'vy')
-x_pos   = ctrl.Antecedent(np.linspace(-1.6, 1.6, 121),  'x')
-y_alt   = ctrl.Antecedent(np.linspace(0.0, 1.6, 121),   'y')
-
-main_thrust = ctrl.Consequent(np.linspace(0.0, 1.0, 121), 'main_thrust')
-lat_thrust  = ctrl.Consequent(np.linspace(-1.0, 1.0, 121), 'lat_thrust')
-
-
-theta['right'] = fuzz.trimf(theta.universe, [-1.8, -0.5,  0.0])
-theta['level'] = fuzz.trimf(theta.universe, [-0.07, 0.0,  0.07])
-theta['left']  = fuzz.trimf(theta.universe, [ 0.0,  0.5,  1.8])
-
-dtheta['cw']   = fuzz.trimf(dtheta.universe, [-3.5, -1.0, -0.25])
-dtheta['zero'] = fuzz.trimf(dtheta.universe, [-0.25, 0.0, 0.25])
-dtheta['ccw']  = fuzz.trimf(dtheta.universe, [ 0.25, 1.0,  3.5])
-
-vx['left']  = fuzz.trimf(vx.universe,  [-3.5, -1.2, -0.25])
-vx['zero']  = fuzz.trimf(vx.universe,  [-0.30, 0.0,  0.30])
-vx['right'] = fuzz.trimf(vx.universe,  [ 0.25, 1.2,  3.5])
-
-vy['fast'] = fuzz.trimf(vy.universe,  [-7.0, -7.0, -2.0])
-vy['down'] = fuzz.trimf(vy.universe,  [-2.8, -1.2, -0.25])
-vy['soft'] = fuzz.trimf(vy.universe,  [-0.5, -0.05, 1.2])
-
-x_pos['far_left']  = fuzz.trimf(x_pos.universe, [-1.6, -0.7, -0.20])
-x_pos['center']    = fuzz.trimf(x_pos.universe, [-0.12, 0.0,  0.12])
-x_pos['far_right'] = fuzz.trimf(x_pos.universe, [ 0.20, 0.7,  1.6])
-
-y_alt['very_high'] = fuzz.trimf(y_alt.universe, [0.9,  1.6, 1.6])
-y_alt['high']      = fuzz.trimf(y_alt.universe, [0.5,  0.9,  1.3])
-y_alt['mid']       = fuzz.trimf(y_alt.universe, [0.25, 0.60, 1.05])
-y_alt['low']       = fuzz.trimf(y_alt.universe, [0.06, 0.18, 0.40])
-y_alt['very_low']  = fuzz.trimf(y_alt.universe, [0.0,  0.03, 0.10])
-
-main_thrust['low']   = fuzz.trimf(main_thrust.universe, [0.0,  0.0,  0.35])
-main_thrust['med']   = fuzz.trimf(main_thrust.universe, [0.20, 0.55, 0.85])
-main_thrust['high']  = fuzz.trimf(main_thrust.universe, [0.70, 1.0,  1.0])
-
-lat_thrust['left']  = fuzz.trimf(lat_thrust.universe,  [-1.0, -1.0, -0.25])
-lat_thrust['zero']  = fuzz.trimf(lat_thrust.universe,  [-0.20, 0.0,  0.20])
-lat_thrust['right'] = fuzz.trimf(lat_thrust.universe,  [ 0.25, 1.0,  1.0])
-
-
-rules = [
-    ctrl.Rule(theta['left']  | dtheta['ccw'],  lat_thrust['right']),
-    ctrl.Rule(theta['right'] | dtheta['cw'],   lat_thrust['left']),
-    ctrl.Rule(theta['level'] & dtheta['zero'], lat_thrust['zero']),
-    ctrl.Rule(x_pos['far_right'] & theta['level'], lat_thrust['left']),
-    ctrl.Rule(x_pos['far_left']  & theta['level'], lat_thrust['right']),
-    ctrl.Rule(vx['right'], lat_thrust['left']),
-    ctrl.Rule(vx['left'],  lat_thrust['right']),
-    ctrl.Rule(vy['fast'], main_thrust['high']),
-    ctrl.Rule(vy['down'], main_thrust['med']),
-    ctrl.Rule(vy['soft'], main_thrust['med']),
-    ctrl.Rule(y_alt['very_high'] & vy['fast'], main_thrust['med']),
-    ctrl.Rule(y_alt['high']      & vy['fast'], main_thrust['high']),
-    ctrl.Rule(y_alt['mid'] & (vy['down'] | vy['fast']), main_thrust['high']),
-    ctrl.Rule(y_alt['low'] & (vy['down'] | vy['fast']), main_thrust['high']),
-    ctrl.Rule(y_alt['very_low'] & vy['soft'], main_thrust['low']),
-    ctrl.Rule(y_alt['low'] & (theta['left']  | dtheta['ccw']),  lat_thrust['right']),
-    ctrl.Rule(y_alt['low'] & (theta['right'] | dtheta['cw']),   lat_thrust['left']),
-]
-
-system = ctrl.ControlSystem(rules)
-sim = ctrl.ControlSystemSimulation(system)
 
-_prev_action = np.array([0.0, 0.0], dtype=np.float32)
+import artifact
+from compiled import CompiledController
+
+# skfuzzy (z networkx), gymnasium i pygame są importowane dopiero tam,
+# gdzie są potrzebne: budowa reguł, symulacja skfuzzy, lot w środowisku.
+# Skompilowany sterownik jest wczytywany z artefaktu ARTIFACT_PATH (artifact.py),
+# więc sam import main.py wymaga tylko NumPy.
+
+
+# Trójkątne funkcje przynależności [a, b, c] (fuzz.trimf) każdego termu.
+# Plik CONFIG_PATH (wynik tune.py) może nadpisać je razem z ALPHA i DEADZONE.
+MF_PARAMS = {
+    'theta': {
+        'right': [-1.8, -0.5,  0.0],
+        'level': [-0.07, 0.0,  0.07],
+        'left':  [ 0.0,  0.5,  1.8],
+    },
+    'dtheta': {
+        'cw':   [-3.5, -1.0, -0.25],
+        'zero': [-0.25, 0.0, 0.25],
+        'ccw':  [ 0.25, 1.0,  3.5],
+    },
+    'vx': {
+        'left':  [-3.5, -1.2, -0.25],
+        'zero':  [-0.30, 0.0,  0.30],
+        'right': [ 0.25, 1.2,  3.5],
+    },
+    'vy': {
+        'fast': [-7.0, -7.0, -2.0],
+        'down': [-2.8, -1.2, -0.25],
+        'soft': [-0.5, -0.05, 1.2],
+    },
+    'x': {
+        'far_left':  [-1.6, -0.7, -0.20],
+        'center':    [-0.12, 0.0,  0.12],
+        'far_right': [ 0.20, 0.7,  1.6],
+    },
+    'y': {
+        'very_high': [0.9,  1.6, 1.6],
+        'high':      [0.5,  0.9,  1.3],
+        'mid':       [0.25, 0.60, 1.05],
+        'low':       [0.06, 0.18, 0.40],
+        'very_low':  [0.0,  0.03, 0.10],
+    },
+    'main_thrust': {
+        'low':  [0.0,  0.0,  0.35],
+        'med':  [0.20, 0.55, 0.85],
+        'high': [0.70, 1.0,  1.0],
+    },
+    'lat_thrust': {
+        'left':  [-1.0, -1.0, -0.25],
+        'zero':  [-0.20, 0.0,  0.20],
+        'right': [ 0.25, 1.0,  1.0],
+    },
+}
+
 ALPHA = 0.50
+DEADZONE = 0.12
+
+CONFIG_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lander_config.json")
+
+
+def load_config(path=CONFIG_PATH):
+    """Read a tuned config (see tune.py): returns (mf_params, alpha, deadzone)."""
+    with open(path, "r", encoding="utf-8") as f:
+        cfg = json.load(f)
+    mf = {var: {term: [float(v) for v in abc] for term, abc in terms.items()}
+          for var, terms in cfg["mf"].items()}
+    if set(mf) != set(MF_PARAMS) or any(set(mf[v]) != set(MF_PARAMS[v]) for v in MF_PARAMS):
+        raise ValueError(f"{path}: zmienne lub termy nie pasują do MF_PARAMS")
+    return mf, float(cfg["alpha"]), float(cfg["deadzone"])
+
+
+if os.path.exists(CONFIG_PATH):
+    MF_PARAMS, ALPHA, DEADZONE = load_config(CONFIG_PATH)
+
+
+def build_rules(mf=None):
+    """Create the fuzzy variables with membership functions `mf` and return the rules."""
+    import skfuzzy as fuzz
+    from skfuzzy import control as ctrl
+
+    mf = MF_PARAMS if mf is None else mf
+
+    theta   = ctrl.Antecedent(np.linspace(-1.8, 1.8, 121),  'theta')
+    dtheta  = ctrl.Antecedent(np.linspace(-3.5, 3.5, 121),  'dtheta')
+    vx      = ctrl.Antecedent(np.linspace(-3.5, 3.5, 121),  'vx')
+    vy      = ctrl.Antecedent(np.linspace(-7.0, 3.0, 121),  'vy')
+    x_pos   = ctrl.Antecedent(np.linspace(-1.6, 1.6, 121),  'x')
+    y_alt   = ctrl.Antecedent(np.linspace(0.0, 1.6, 121),   'y')
+
+    main_thrust = ctrl.Consequent(np.linspace(0.0, 1.0, 121), 'main_thrust')
+    lat_thrust  = ctrl.Consequent(np.linspace(-1.0, 1.0, 121), 'lat_thrust')
+
+    for var in (theta, dtheta, vx, vy, x_pos, y_alt, main_thrust, lat_thrust):
+        for term, abc in mf[var.label].items():
+            var[term] = fuzz.trimf(var.universe, abc)
+
+    return [
+        ctrl.Rule(theta['left']  | dtheta['ccw'],  lat_thrust['right']),
+        ctrl.Rule(theta['right'] | dtheta['cw'],   lat_thrust['left']),
+        ctrl.Rule(theta['level'] & dtheta['zero'], lat_thrust['zero']),
+        ctrl.Rule(x_pos['far_right'] & theta['level'], lat_thrust['left']),
+        ctrl.Rule(x_pos['far_left']  & theta['level'], lat_thrust['right']),
+        ctrl.Rule(vx['right'], lat_thrust['left']),
+        ctrl.Rule(vx['left'],  lat_thrust['right']),
+        ctrl.Rule(vy['fast'], main_thrust['high']),
+        ctrl.Rule(vy['down'], main_thrust['med']),
+        ctrl.Rule(vy['soft'], main_thrust['med']),
+        ctrl.Rule(y_alt['very_high'] & vy['fast'], main_thrust['med']),
+        ctrl.Rule(y_alt['high']      & vy['fast'], main_thrust['high']),
+        ctrl.Rule(y_alt['mid'] & (vy['down'] | vy['fast']), main_thrust['high']),
+        ctrl.Rule(y_alt['low'] & (vy['down'] | vy['fast']), main_thrust['high']),
+        ctrl.Rule(y_alt['very_low'] & vy['soft'], main_thrust['low']),
+        ctrl.Rule(y_alt['low'] & (theta['left']  | dtheta['ccw']),  lat_thrust['right']),
+        ctrl.Rule(y_alt['low'] & (theta['right'] | dtheta['cw']),   lat_thrust['left']),
+    ]
+
+
+# "compiled" – reguły skompilowane do tablic NumPy (compiled.py),
+# "lut"      – interpolacja w tablicy przeglądowej LUT_PATH (lut.py),
+# "sugeno"   – te same reguły z następnikami Sugeno z SUGENO_PATH (sugeno.py),
+# "skfuzzy"  – oryginalna symulacja ctrl.ControlSystemSimulation.
+BACKEND = "compiled"
+LUT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lander_lut.npy")
+SUGENO_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lander_sugeno.npz")
+ARTIFACT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "lander_controller.npz")
+INPUTS = ('theta', 'dtheta', 'vx', 'vy', 'x', 'y')
+OUTPUTS = ('main_thrust', 'lat_thrust')
+_lut = None
+_sugeno = None
+
+
+def build_controller(mf=None):
+    """`CompiledController` for membership functions `mf` (default MF_PARAMS)."""
+    return CompiledController.from_rules(build_rules(mf), inputs=INPUTS, outputs=OUTPUTS)
+
+
+def controller_key(mf=None):
+    """Artifact key: hash of the membership functions and the rule definitions."""
+    mf = MF_PARAMS if mf is None else mf
+    return artifact.spec_key(mf, list(INPUTS), list(OUTPUTS), inspect.getsource(build_rules))
+
+
+def load_controller(mf=None, path=None):
+    """Compiled controller from the artifact, rebuilt (and saved) if it is stale.
+
+    The result is the shared `controller` of this module, so its arrays are
+    made read-only (`CompiledController.freeze`); build a private one with
+    `build_controller` to modify it.
+    """
+    path = ARTIFACT_PATH if path is None else path
+    key = controller_key(mf)
+    ctl = artifact.load(path, key)
+    if ctl is None:
+        ctl = build_controller(mf)
+        try:
+            artifact.save(path, ctl, key)
+        except OSError:
+            pass  # read-only location: just use the freshly built controller
+    return ctl.freeze()
+
+
+def _make_system():
+    from skfuzzy import control as ctrl
+    return ctrl.ControlSystem(_lazy('rules'))
+
+
+def _make_sim():
+    from skfuzzy import control as ctrl
+    return ctrl.ControlSystemSimulation(_lazy('system'))
+
+
+_LAZY = {
+    'rules':      build_rules,
+    'system':     _make_system,
+    'sim':        _make_sim,
+    'controller': load_controller,
+}
+
+
+def _lazy(name):
+    """Module attribute `name` from _LAZY, created on first use."""
+    value = globals().get(name)
+    if value is None:
+        value = globals()[name] = _LAZY[name]()
+    return value
+
+
+def __getattr__(name):
+    """Lazy `rules`, `system`, `sim` and `controller` (PEP 562)."""
+    if name in _LAZY:
+        return _lazy(name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def _fast_controller():
+    """Controller used by the "compiled", "lut" and "sugeno" backends.
+
+    Raises:
+        ValueError: If the LUT table or the Sugeno consequents were made
+            from another controller (see `controller_key`).
+    """
+    global _lut, _sugeno
+    if BACKEND == "sugeno":
+        if _sugeno is None:
+            from sugeno import SugenoController
+            _sugeno = SugenoController.load(SUGENO_PATH, _lazy('controller'), controller_key())
+        return _sugeno
+    if BACKEND != "lut":
+        return _lazy('controller')
+    if _lut is None:
+        from lut import LookupController
+        _lut = LookupController.load(LUT_PATH, controller_key())
+    return _lut
+
+
+_prev_action = np.array([0.0, 0.0], dtype=np.float32)
 
 
 def _lateral_shaper(lat: float, deadzone: float = 0.5) -> float:
@@ -127,29 +275,47 @@ def _lateral_shaper(lat: float, deadzone: float = 0.5) -> float:
     return float(np.clip(s * out, -1.0, 1.0))
 
 
+def _lateral_shaper_batch(lat: np.ndarray, deadzone: float = 0.5) -> np.ndarray:
+    """Vectorized `_lateral_shaper` over an array of lateral commands."""
+    a = np.abs(lat)
+    out = np.tanh(1.8 * ((a - deadzone) / (1.0 - deadzone)))
+    return np.where(a <= deadzone, 0.0, np.clip(np.sign(lat) * out, -1.0, 1.0))
+
+
 def fuzzy_action(obs):
     """Compute control action using fuzzy logic and safety heuristics."""
     global _prev_action
     x, y, vx_val, vy_val, th, dth, leg_l, leg_r = obs
 
-    sim.reset()
-    sim.input['theta']  = float(np.clip(th,     -1.8, 1.8))
-    sim.input['dtheta'] = float(np.clip(dth,    -3.5, 3.5))
-    sim.input['vx']     = float(np.clip(vx_val, -3.5, 3.5))
-    sim.input['vy']     = float(np.clip(vy_val, -7.0, 3.0))
-    sim.input['x']      = float(np.clip(x,      -1.6, 1.6))
-    sim.input['y']      = float(np.clip(y,       0.0, 1.6))
-
-    try:
-        sim.compute()
-    except Exception:
-        return _prev_action
-
-    if 'main_thrust' not in sim.output or 'lat_thrust' not in sim.output:
+    inputs = {
+        'theta':  float(np.clip(th,     -1.8, 1.8)),
+        'dtheta': float(np.clip(dth,    -3.5, 3.5)),
+        'vx':     float(np.clip(vx_val, -3.5, 3.5)),
+        'vy':     float(np.clip(vy_val, -7.0, 3.0)),
+        'x':      float(np.clip(x,      -1.6, 1.6)),
+        'y':      float(np.clip(y,       0.0, 1.6)),
+    }
+
+    if BACKEND != "skfuzzy":
+        out = _fast_controller().compute(inputs)
+        if np.isnan(out['main_thrust']) or np.isnan(out['lat_thrust']):
+            return _prev_action
+    else:
+        sim = _lazy('sim')
+        sim.reset()
+        for name, value in inputs.items():
+            sim.input[name] = value
+        try:
+            sim.compute()
+        except Exception:
+            return _prev_action
+        out = sim.output
+
+    if 'main_thrust' not in out or 'lat_thrust' not in out:
         return _prev_action
 
-    main = float(sim.output['main_thrust'])
-    lat  = float(sim.output['lat_thrust'])
+    main = float(out['main_thrust'])
+    lat  = float(out['lat_thrust'])
 
     if vy_val < -0.2:
         main = 1.0
@@ -158,7 +324,7 @@ def fuzzy_action(obs):
     elif y < 0.28 and vy_val < -0.35:
         main = max(main, 0.90)
 
-    lat = _lateral_shaper(lat, deadzone=0.12)
+    lat = _lateral_shaper(lat, deadzone=DEADZONE)
 
     main_cmd = 2.0 * main - 1.0
     lat_cmd  = np.clip(lat, -1.0, 1.0)
@@ -179,9 +345,120 @@ def fuzzy_action(obs):
     return action
 
 
+# Kody nadpisań bezpieczeństwa (bity), zwracane przez `fuzzy_action_details`.
+OVR_FULL_THRUST = 1    # vy < -0.2: pełny ciąg główny
+OVR_LOW_FAST    = 2    # nisko i szybko w dół: ciąg >= 0.80
+OVR_LOW_SLOW    = 4    # bardzo nisko i w dół: ciąg >= 0.90
+OVR_RISING      = 8    # wysoko i w górę: ciąg ograniczony
+OVR_CEILING     = 16   # za wysoko: silnik wyłączony
+OVR_LEGS        = 32   # kontakt nóg z gruntem
+OVR_NO_OUTPUT   = 64   # brak wyniku reguł: poprzednia akcja
+
+
+class ActionDetails(NamedTuple):
+    """Everything `fuzzy_action_details` computed for a batch of N landers.
+
+    Attributes:
+        action: Smoothed actions (N, 2), float32 – what goes to the env.
+        raw: Actions before smoothing (N, 2), float32.
+        out: Raw controller outputs (main_thrust, lat_thrust), (N, 2);
+            NaN where no rule fired.
+        strengths: Rule firing strengths (N, R), or None.
+        overrides: OVR_* bits of the safety overrides that fired, (N,) uint8.
+    """
+
+    action: np.ndarray
+    raw: np.ndarray
+    out: np.ndarray
+    strengths: Optional[np.ndarray]
+    overrides: np.ndarray
+
+
+def fuzzy_action_details(obs, prev, controller=None, alpha=None, deadzone=None, strengths=False):
+    """`fuzzy_action_batch` with its intermediate results (see `ActionDetails`).
+
+    Args:
+        strengths: Also return the rule firing strengths (needs a
+            controller with `rule_strengths`, i.e. not the LUT).
+    """
+    obs = np.asarray(obs, dtype=np.float64).reshape(-1, 8)
+    prev = np.asarray(prev, dtype=np.float32).reshape(-1, 2)
+    x, y, vx_val, vy_val, th, dth, leg_l, leg_r = obs.T
+
+    X = np.column_stack([
+        np.clip(th,     -1.8, 1.8),
+        np.clip(dth,    -3.5, 3.5),
+        np.clip(vx_val, -3.5, 3.5),
+        np.clip(vy_val, -7.0, 3.0),
+        np.clip(x,      -1.6, 1.6),
+        np.clip(y,       0.0, 1.6),
+    ])
+    alpha = ALPHA if alpha is None else alpha
+    deadzone = DEADZONE if deadzone is None else deadzone
+    ctl = controller if controller is not None else _fast_controller()
+    fired = None
+    if strengths:
+        fired = ctl.rule_strengths(X)
+        out = ctl.defuzzify(ctl.cuts(fired))
+    else:
+        out = ctl.compute_batch(X)
+    valid = ~np.isnan(out).any(axis=1)
+    main, lat = out[:, 0], out[:, 1]
+
+    full = vy_val < -0.2
+    low_fast = ~full & (y < 0.40) & (vy_val < -0.5)
+    low_slow = ~full & ~low_fast & (y < 0.28) & (vy_val < -0.35)
+    main = np.where(full, 1.0,
+           np.where(low_fast, np.maximum(main, 0.80),
+           np.where(low_slow, np.maximum(main, 0.90), main)))
+
+    lat = _lateral_shaper_batch(lat, deadzone=deadzone)
+
+    main_cmd = 2.0 * main - 1.0
+    lat_cmd  = np.clip(lat, -1.0, 1.0)
+
+    rising = (y > 0.80) & (vy_val > 0.15)
+    ceiling = y > 1.25
+    main_cmd = np.where(rising, np.minimum(main_cmd, -0.15), main_cmd)
+    main_cmd = np.where(ceiling, -1.0, main_cmd)
+
+    legs = (leg_l > 0.5) | (leg_r > 0.5)
+    main_cmd = np.where(legs, -0.8, main_cmd)
+    lat_cmd  = np.where(legs, 0.0, lat_cmd)
+
+    action_raw = np.column_stack([np.clip(main_cmd, -1.0, 1.0),
+                                  np.clip(lat_cmd,  -1.0, 1.0)]).astype(np.float32)
+    action = (1 - alpha) * prev + alpha * action_raw
+    action = np.where(valid[:, None], action, prev)
+
+    codes = (full * OVR_FULL_THRUST | low_fast * OVR_LOW_FAST | low_slow * OVR_LOW_SLOW
+             | rising * OVR_RISING | ceiling * OVR_CEILING | legs * OVR_LEGS
+             | ~valid * OVR_NO_OUTPUT).astype(np.uint8)
+    return ActionDetails(action, action_raw, out, fired, codes)
+
+
+def fuzzy_action_batch(obs, prev, controller=None, alpha=None, deadzone=None):
+    """Vectorized `fuzzy_action` for N landers at once ("compiled" or "lut" backend).
+
+    Args:
+        obs: Observations, shape (N, 8).
+        prev: Previous (smoothed) actions, shape (N, 2).
+        controller: Controller to use instead of the BACKEND one (e.g. a
+            candidate from tune.py).
+        alpha: Smoothing factor (default ALPHA).
+        deadzone: Lateral deadzone (default DEADZONE).
+
+    Returns:
+        np.ndarray: New actions, shape (N, 2), float32. Rows where no rule
+        fires keep their previous action, like `fuzzy_action`.
+    """
+    return fuzzy_action_details(obs, prev, controller, alpha, deadzone).action
+
+
 def run_episode(render=True, seed=None, max_steps=600):
     """Run a single simulation episode and return the total reward."""
-    env = gym.make("LunarLanderContinuous-v3", render_mode="human")
+    import gymnasium as gym
+    env = gym.make("LunarLanderContinuous-v3", render_mode="human" if render else None)
     obs, info = env.reset(seed=seed)
     global _prev_action; _prev_action = np.array([0.0, 0.0], dtype=np.float32)
 
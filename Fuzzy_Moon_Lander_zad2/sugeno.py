@@ -0,0 +1,301 @@
+"""
+====================================================================
+TRYB TAKAGI–SUGENO
+====================================================================
+
+Autorzy: s27433, s28866
+Technologia: Python 3.11, NumPy
+
+--------------------------------------------------------------------
+OPIS:
+--------------------------------------------------------------------
+W systemie Mamdaniego najdroższa jest defuzyfikacja: obcinanie termów
+wyjściowych i całkowanie środka ciężkości na 121-punktowych uniwersach.
+W systemie Sugeno każda reguła ma zamiast termu wyjściowego funkcję
+wejść:
+
+-   rząd 0:  z_r = c_r                       (stała),
+-   rząd 1:  z_r = p_r · [θ, dθ, vx, vy, x, y] + c_r   (funkcja liniowa),
+
+a wyjście to średnia ważona siłą zadziałania reguł:
+
+    wyjście = Σ w_r z_r / Σ w_r      (po regułach danego wyjścia).
+
+Część „jeżeli” jest ta sama co w main.py – siły reguł liczy
+`CompiledController.rule_strengths` (te same funkcje przynależności
+i klauzule, wagi reguł też). Gdy żadna reguła wyjścia nie zadziała,
+wynik to NaN, jak w `CompiledController`.
+
+Następniki dopasowuje metoda najmniejszych kwadratów do powierzchni
+Mamdaniego: wyjście jest liniowe względem parametrów przy ustalonych
+znormalizowanych siłach reguł, więc wystarcza jedno `np.linalg.lstsq`
+(z małą regularyzacją) na wyjście. Próbki to stany z prawdziwych lotów
+(sterownik Mamdaniego) uzupełnione losowymi punktami z całej dziedziny.
+Bez dopasowania każda reguła zwraca środek ciężkości swojego termu
+wyjściowego (punkt startowy i cel regularyzacji).
+
+Plik następników zawiera klucz sterownika (`main.controller_key`);
+po zmianie funkcji przynależności (np. przez `tune.py`) `load` z kluczem
+odrzuca stary plik zamiast po cichu użyć nieaktualnego dopasowania.
+
+Domyślnie następniki trafiają do main.SUGENO_PATH (obok main.py), skąd
+czyta je backend "sugeno" niezależnie od katalogu roboczego.
+
+Przykład:
+
+    python sugeno.py fit --order 1 --flights 50 --samples 20000
+    python sugeno.py report
+"""
+
+import argparse
+import json
+import time
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from compiled import CompiledController
+
+
+class SugenoController:
+    """Zero- or first-order Sugeno system on the antecedents of a compiled rule base.
+
+    Attributes:
+        base: `CompiledController` that provides the rule strengths.
+        order: 0 (constant consequents) or 1 (linear consequents).
+        params: Per output, one row per rule of that output: ``[c]`` for
+            order 0, ``[p_1 .. p_6, c]`` for order 1.
+    """
+
+    def __init__(self, base: CompiledController, order: int = 0,
+                 params: Optional[Sequence[np.ndarray]] = None) -> None:
+        if order not in (0, 1):
+            raise ValueError(f"Rząd Sugeno musi być 0 lub 1, jest {order}")
+        self.base = base
+        self.order = order
+        self.inputs = base.inputs
+        self.outputs = base.outputs
+        self._rules, self._weights, self._terms = self._output_rules(base)
+        self._ranges = [(u[0], u[-1]) for u in base.out_universes]
+        if params is None:
+            params = self.centroid_params()
+        self.params: List[np.ndarray] = [np.asarray(p, float) for p in params]
+        width = 1 if order == 0 else len(self.inputs) + 1
+        for o, p in enumerate(self.params):
+            if p.shape != (len(self._rules[o]), width):
+                raise ValueError(f"{self.outputs[o]}: parametry {p.shape}, oczekiwano "
+                                 f"{(len(self._rules[o]), width)}")
+
+    @staticmethod
+    def _output_rules(base: CompiledController) -> Tuple[List[np.ndarray], List[np.ndarray], List[np.ndarray]]:
+        """Rule, weight and output term (row of ``base.out_mfs[o]``) of the pairs of every output."""
+        rules, weights, terms = [], [], []
+        n_pairs = base.pair_rule.shape[0]
+        for o in range(len(base.outputs)):
+            rows = base.term_pairs[base.out_term_offsets[o]:base.out_term_offsets[o + 1]]
+            term, slot = np.nonzero(rows < n_pairs)
+            pairs = rows[term, slot]
+            rules.append(base.pair_rule[pairs])
+            weights.append(base.pair_weight[pairs])
+            terms.append(term)
+        return rules, weights, terms
+
+    def centroid_params(self) -> List[np.ndarray]:
+        """Starting point: every rule outputs the centroid of its Mamdani term."""
+        params = []
+        width = 1 if self.order == 0 else len(self.inputs) + 1
+        for o, (u, mfs) in enumerate(zip(self.base.out_universes, self.base.out_mfs)):
+            centroids = (mfs * u).sum(axis=1) / mfs.sum(axis=1)
+            p = np.zeros((len(self._rules[o]), width))
+            p[:, -1] = centroids[self._terms[o]]
+            params.append(p)
+        return params
+
+    def normalized_strengths(self, X: np.ndarray) -> List[np.ndarray]:
+        """Per output, w_r / Σ w_r (N, rules of the output); NaN rows where Σ w_r = 0."""
+        s = self.base.rule_strengths(X)
+        out = []
+        for rules, weights in zip(self._rules, self._weights):
+            w = s[:, rules] * weights
+            total = w.sum(axis=1, keepdims=True)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                out.append(np.where(total > 0.0, w / total, np.nan))
+        return out
+
+    def _features(self, X: np.ndarray) -> np.ndarray:
+        return np.concatenate([X, np.ones((X.shape[0], 1))], axis=1) if self.order else np.ones((X.shape[0], 1))
+
+    def compute_batch(self, X: np.ndarray) -> np.ndarray:
+        """Crisp outputs (N, n_outputs) for inputs X (N, n_inputs)."""
+        X = np.atleast_2d(np.asarray(X, float))
+        feats = self._features(X)
+        res = np.empty((X.shape[0], len(self.outputs)))
+        for o, phi in enumerate(self.normalized_strengths(X)):
+            z = feats @ self.params[o].T                        # (N, rules)
+            res[:, o] = np.clip((phi * z).sum(axis=1), *self._ranges[o])
+        return res
+
+    def compute(self, inputs: Mapping[str, float]) -> Dict[str, float]:
+        """Single inference, like `CompiledController.compute`."""
+        row = np.array([[inputs[name] for name in self.inputs]], float)
+        res = self.compute_batch(row)[0]
+        return {name: float(v) for name, v in zip(self.outputs, res)}
+
+    # ----------------------------------------------------------------
+    # Fitting and storage
+    # ----------------------------------------------------------------
+
+    def fit(self, X: np.ndarray, target: np.ndarray, ridge: float = 1e-6) -> "SugenoController":
+        """Least-squares fit of the consequents to `target` (N, n_outputs) at X.
+
+        Rows where the target or the rule strengths are NaN are skipped.
+        """
+        X = np.atleast_2d(np.asarray(X, float))
+        feats = self._features(X)
+        for o, phi in enumerate(self.normalized_strengths(X)):
+            ok = ~np.isnan(target[:, o]) & ~np.isnan(phi).any(axis=1)
+            A = (phi[ok, :, None] * feats[ok, None, :]).reshape(ok.sum(), -1)
+            b = target[ok, o]
+            # Ridge towards the current parameters keeps rules that rarely fire sensible.
+            p0 = self.params[o].ravel()
+            reg = np.sqrt(ridge * max(len(b), 1))
+            A_aug = np.vstack([A, reg * np.eye(A.shape[1])])
+            b_aug = np.concatenate([b, reg * p0])
+            sol, *_ = np.linalg.lstsq(A_aug, b_aug, rcond=None)
+            self.params[o] = sol.reshape(self.params[o].shape)
+        return self
+
+    def save(self, path: str, key: Optional[str] = None) -> None:
+        """Write the consequents to `path`, tagged with the `main.controller_key` of the base."""
+        meta = {"order": self.order, "key": key, "inputs": list(self.inputs), "outputs": list(self.outputs),
+                "rule_labels": list(self.base.rule_labels)}
+        np.savez(path, meta=np.array(json.dumps(meta)),
+                 **{f"params.{o}": p for o, p in enumerate(self.params)})
+
+    @classmethod
+    def load(cls, path: str, base: CompiledController, key: Optional[str] = None) -> "SugenoController":
+        """Consequents from `path` on top of `base`.
+
+        Args:
+            path: File written by `save`.
+            base: Compiled Mamdani controller the consequents were fitted to.
+            key: Expected `main.controller_key` of `base`; None skips the
+                check (rule labels and outputs must still match).
+
+        Raises:
+            ValueError: If the consequents were fitted to another controller.
+        """
+        with np.load(path) as f:
+            meta = json.loads(str(f["meta"]))
+            params = [f[f"params.{o}"] for o in range(len(meta["outputs"]))]
+        if meta["rule_labels"] != list(base.rule_labels) or meta["outputs"] != list(base.outputs):
+            raise ValueError(f"{path}: następniki dopasowane do innej bazy reguł")
+        if key is not None and meta.get("key") != key:
+            raise ValueError(f"{path}: następniki dopasowane do innego sterownika (zmienione funkcje "
+                             f"przynależności lub reguły) – dopasuj je ponownie: python sugeno.py fit")
+        return cls(base, meta["order"], params)
+
+
+# --------------------------------------------------------------------
+# Training data and report
+# --------------------------------------------------------------------
+
+def flight_inputs(seeds: Sequence[int], max_steps: int = 600) -> np.ndarray:
+    """Clipped controller inputs seen while flying `seeds` with the Mamdani controller.
+
+    The flights always use the compiled `main.controller`, whatever
+    `main.BACKEND` is, so the states do not come from a surrogate.
+    """
+    from evaluate import evaluate
+    import main
+
+    seen: List[np.ndarray] = []
+
+    def policy(obs, prev):
+        seen.append(np.asarray(obs, float))
+        return main.fuzzy_action_batch(obs, prev, controller=main.controller)
+
+    evaluate(seeds, num_envs=min(len(seeds), 50), max_steps=max_steps, policy=policy)
+    obs = np.concatenate(seen)
+    x, y, vx, vy, th, dth = obs[:, :6].T
+    return np.column_stack([np.clip(th, -1.8, 1.8), np.clip(dth, -3.5, 3.5), np.clip(vx, -3.5, 3.5),
+                            np.clip(vy, -7.0, 3.0), np.clip(x, -1.6, 1.6), np.clip(y, 0.0, 1.6)])
+
+
+def random_inputs(samples: int, base: CompiledController, seed: int = 0) -> np.ndarray:
+    """Uniform random inputs over the input universes of `base`."""
+    rng = np.random.default_rng(seed)
+    lo = np.array([u[0] for u in base.in_universes])
+    hi = np.array([u[-1] for u in base.in_universes])
+    return lo + (hi - lo) * rng.random((samples, len(lo)))
+
+
+def error_report(sugeno: SugenoController, X: np.ndarray) -> Dict[str, object]:
+    """Errors of `sugeno` against its Mamdani base on X, and both inference times."""
+    t = time.perf_counter()
+    exact = sugeno.base.compute_batch(X)
+    mamdani_s = time.perf_counter() - t
+    t = time.perf_counter()
+    approx = sugeno.compute_batch(X)
+    sugeno_s = time.perf_counter() - t
+    row = dict(zip(sugeno.inputs, X[0]))
+    t = time.perf_counter()
+    for _ in range(200):
+        sugeno.base.compute(row)
+    mamdani_one = (time.perf_counter() - t) / 200
+    t = time.perf_counter()
+    for _ in range(200):
+        sugeno.compute(row)
+    sugeno_one = (time.perf_counter() - t) / 200
+    report: Dict[str, object] = {
+        "samples": int(X.shape[0]), "order": sugeno.order,
+        "mamdani_us_per_row": 1e6 * mamdani_s / X.shape[0], "sugeno_us_per_row": 1e6 * sugeno_s / X.shape[0],
+        "mamdani_us_single": 1e6 * mamdani_one, "sugeno_us_single": 1e6 * sugeno_one,
+    }
+    for k, name in enumerate(sugeno.outputs):
+        both = ~np.isnan(exact[:, k]) & ~np.isnan(approx[:, k])
+        err = np.abs(exact[both, k] - approx[both, k])
+        report[name] = {
+            "nan_mismatch": float(np.mean(np.isnan(exact[:, k]) != np.isnan(approx[:, k]))),
+            "mae": float(err.mean()) if err.size else 0.0,
+            "rmse": float(np.sqrt((err ** 2).mean())) if err.size else 0.0,
+            "max": float(err.max()) if err.size else 0.0,
+        }
+    return report
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    import main
+    parser = argparse.ArgumentParser(description="Takagi-Sugeno version of the lander controller")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    f = sub.add_parser("fit", help="Fit the consequents to the Mamdani surface")
+    f.add_argument("--order", type=int, choices=(0, 1), default=1, help="Sugeno order")
+    f.add_argument("--flights", type=int, default=50, help="Flights whose states are used as samples")
+    f.add_argument("--samples", type=int, default=20000, help="Extra uniform random samples")
+    f.add_argument("--seed", type=int, default=0, help="Seed of flights and samples")
+    f.add_argument("--ridge", type=float, default=1e-6, help="Regularization towards the start point")
+    f.add_argument("--out", default=main.SUGENO_PATH, help="Output file (default: main.SUGENO_PATH)")
+    r = sub.add_parser("report", help="Compare fitted consequents with the Mamdani controller")
+    r.add_argument("path", nargs="?", default=main.SUGENO_PATH,
+                   help="Fitted consequents (.npz, default: main.SUGENO_PATH)")
+    r.add_argument("--flights", type=int, default=20, help="Flights for test states (other seeds)")
+    r.add_argument("--samples", type=int, default=20000, help="Uniform random test samples")
+    return parser
+
+
+if __name__ == "__main__":
+    import main
+    args = build_arg_parser().parse_args()
+    base = main.controller
+    if args.cmd == "fit":
+        X = np.concatenate([flight_inputs(range(args.seed, args.seed + args.flights)),
+                            random_inputs(args.samples, base, args.seed)])
+        sugeno = SugenoController(base, args.order).fit(X, base.compute_batch(X), args.ridge)
+        sugeno.save(args.out, main.controller_key())
+        print(f"Fitted order {args.order} on {X.shape[0]} samples -> {args.out}")
+    else:
+        sugeno = SugenoController.load(args.path, base, main.controller_key())
+        test_seeds = range(1_000_000, 1_000_000 + args.flights)
+        for label, X in (("flights", flight_inputs(test_seeds)),
+                         ("uniform", random_inputs(args.samples, base, seed=12345))):
+            print(label, json.dumps(error_report(sugeno, X), indent=2))
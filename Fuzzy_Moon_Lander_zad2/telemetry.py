@@ -0,0 +1,285 @@
+"""
+====================================================================
+TELEMETRIA LOTÓW I PROFIL OPÓŹNIEŃ
+====================================================================
+
+Autorzy: s27433, s28866
+Technologia: Python 3.11, NumPy, Gymnasium
+
+--------------------------------------------------------------------
+OPIS:
+--------------------------------------------------------------------
+`run_episode` zwraca tylko sumę nagród. Ten moduł zapisuje dla każdego
+kroku każdego lotu:
+
+-   numer lotu, seed, numer kroku, obserwację (8 liczb) i nagrodę,
+-   czas wnioskowania sterownika i czas `env.step` (µs),
+-   siłę zadziałania każdej reguły,
+-   surowe wyjścia reguł (main_thrust, lat_thrust), akcję przed
+    wygładzeniem i akcję wysłaną do środowiska,
+-   bity nadpisań bezpieczeństwa (`main.OVR_*`), które zadziałały.
+
+Kroki trafiają do bufora o stałym rozmiarze (``chunk_steps`` wierszy);
+pełny bufor jest zapisywany jako osobny plik ``<prefix>-00000.npz``,
+``<prefix>-00001.npz``, ... (kolumny = tablice), więc zużycie pamięci
+nie zależy od liczby lotów. Po zamknięciu powstaje też
+``<prefix>-episodes.npz`` z podsumowaniem lotów (seed, nagroda, liczba
+kroków, lądowanie). Nowy zapis pod tym samym prefiksem usuwa pliki
+poprzedniego.
+
+`iter_chunks` / `load_columns` czytają zapis bez ponownej symulacji;
+``python telemetry.py report <prefix>`` pokazuje rozkład opóźnień,
+największe skoki, częstość nadpisań i nieudane lądowania.
+
+Przykład:
+
+    python telemetry.py record runs/t1 --episodes 2000
+    python telemetry.py report runs/t1
+"""
+
+import argparse
+import glob
+import os
+import re
+import time
+from typing import Dict, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+import main
+
+
+OVERRIDES = {
+    "full_thrust": main.OVR_FULL_THRUST,
+    "low_fast":    main.OVR_LOW_FAST,
+    "low_slow":    main.OVR_LOW_SLOW,
+    "rising":      main.OVR_RISING,
+    "ceiling":     main.OVR_CEILING,
+    "legs":        main.OVR_LEGS,
+    "no_output":   main.OVR_NO_OUTPUT,
+}
+
+
+class TelemetryWriter:
+    """Buffers per-step records and writes them in fixed-size NPZ chunks.
+
+    Attributes:
+        prefix: Path prefix of the chunk files.
+        chunk_steps: Rows per chunk (the buffer size).
+        chunks: Chunk files written so far.
+    """
+
+    def __init__(self, prefix: str, n_rules: int, chunk_steps: int = 1 << 16, compress: bool = False) -> None:
+        self.prefix = prefix
+        self.chunk_steps = chunk_steps
+        self.compress = compress
+        self.chunks: List[str] = []
+        d = os.path.dirname(prefix)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        # A previous recording under the same prefix would mix with this one.
+        for path in chunk_files(prefix) + glob.glob(f"{glob.escape(prefix)}-episodes.npz"):
+            os.remove(path)
+        n = chunk_steps
+        self._cols: Dict[str, np.ndarray] = {
+            "episode":   np.empty(n, np.int32),
+            "seed":      np.empty(n, np.int64),
+            "step":      np.empty(n, np.int32),
+            "obs":       np.empty((n, 8), np.float32),
+            "reward":    np.empty(n, np.float32),
+            "ctrl_us":   np.empty(n, np.float32),
+            "env_us":    np.empty(n, np.float32),
+            "strengths": np.empty((n, n_rules), np.float32),
+            "out":       np.empty((n, 2), np.float32),
+            "raw":       np.empty((n, 2), np.float32),
+            "action":    np.empty((n, 2), np.float32),
+            "override":  np.empty(n, np.uint8),
+        }
+        self._rows = 0
+        self._episodes: Dict[str, List] = {"seed": [], "reward": [], "steps": [], "landed": []}
+
+    def add(self, **row) -> None:
+        """Append one step; keys are the column names."""
+        i = self._rows
+        for name, col in self._cols.items():
+            col[i] = row[name]
+        self._rows += 1
+        if self._rows == self.chunk_steps:
+            self.flush()
+
+    def end_episode(self, seed: int, reward: float, steps: int, landed: bool) -> None:
+        self._episodes["seed"].append(seed)
+        self._episodes["reward"].append(reward)
+        self._episodes["steps"].append(steps)
+        self._episodes["landed"].append(landed)
+
+    def flush(self) -> None:
+        """Write the buffered rows (if any) as the next chunk."""
+        if not self._rows:
+            return
+        path = f"{self.prefix}-{len(self.chunks):05d}.npz"
+        save = np.savez_compressed if self.compress else np.savez
+        save(path, **{name: col[:self._rows] for name, col in self._cols.items()})
+        self.chunks.append(path)
+        self._rows = 0
+
+    def close(self) -> None:
+        self.flush()
+        np.savez(f"{self.prefix}-episodes.npz",
+                 seed=np.array(self._episodes["seed"], np.int64),
+                 reward=np.array(self._episodes["reward"], np.float64),
+                 steps=np.array(self._episodes["steps"], np.int32),
+                 landed=np.array(self._episodes["landed"], bool))
+
+    def __enter__(self) -> "TelemetryWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def record_episode(writer: TelemetryWriter, env, episode: int, seed: int, max_steps: int = 600,
+                   controller=None) -> float:
+    """Fly one episode on `env`, recording every step; returns the total reward."""
+    obs, _ = env.reset(seed=seed)
+    prev = np.zeros((1, 2), dtype=np.float32)
+    total_reward = 0.0
+    landed = False
+    steps = 0
+    for step in range(max_steps):
+        t0 = time.perf_counter()
+        d = main.fuzzy_action_details(obs, prev, controller, strengths=True)
+        t1 = time.perf_counter()
+        next_obs, reward, terminated, truncated, _ = env.step(d.action[0])
+        t2 = time.perf_counter()
+        writer.add(episode=episode, seed=seed, step=step, obs=obs, reward=reward,
+                   ctrl_us=1e6 * (t1 - t0), env_us=1e6 * (t2 - t1), strengths=d.strengths[0],
+                   out=d.out[0], raw=d.raw[0], action=d.action[0], override=d.overrides[0])
+        prev = d.action
+        obs = next_obs
+        total_reward += reward
+        steps += 1
+        if terminated or truncated:
+            landed = bool(terminated and reward > 0.0)
+            break
+    writer.end_episode(seed, total_reward, steps, landed)
+    return total_reward
+
+
+def record(prefix: str, seeds: Sequence[int], max_steps: int = 600, chunk_steps: int = 1 << 16,
+           compress: bool = False) -> List[str]:
+    """Record one episode per seed (compiled backend); returns the chunk files."""
+    import gymnasium as gym
+    ctl = main.controller
+    env = gym.make("LunarLanderContinuous-v3")
+    try:
+        with TelemetryWriter(prefix, len(ctl.rule_labels), chunk_steps, compress) as writer:
+            for k, seed in enumerate(seeds):
+                record_episode(writer, env, k, seed, max_steps, ctl)
+    finally:
+        env.close()
+    return writer.chunks
+
+
+# --------------------------------------------------------------------
+# Reading
+# --------------------------------------------------------------------
+
+def chunk_files(prefix: str) -> List[str]:
+    """Chunk files of `prefix`: exactly ``<prefix>-NNNNN.npz``, in order."""
+    pattern = re.compile(re.escape(os.path.basename(prefix)) + r"-\d{5}\.npz")
+    return sorted(p for p in glob.glob(f"{glob.escape(prefix)}-*.npz")
+                  if pattern.fullmatch(os.path.basename(p)))
+
+
+def iter_chunks(prefix: str, columns: Optional[Sequence[str]] = None) -> Iterator[Dict[str, np.ndarray]]:
+    """Chunks of a recording, one dict of columns at a time."""
+    for path in chunk_files(prefix):
+        with np.load(path) as f:
+            yield {name: f[name] for name in (columns or f.files)}
+
+
+def load_columns(prefix: str, columns: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Selected columns of the whole recording, concatenated."""
+    parts: Dict[str, List[np.ndarray]] = {name: [] for name in columns}
+    for chunk in iter_chunks(prefix, columns):
+        for name in columns:
+            parts[name].append(chunk[name])
+    return {name: np.concatenate(p) if p else np.empty(0) for name, p in parts.items()}
+
+
+def load_episodes(prefix: str) -> Dict[str, np.ndarray]:
+    with np.load(f"{prefix}-episodes.npz") as f:
+        return {name: f[name] for name in f.files}
+
+
+def report(prefix: str, top: int = 10) -> Dict[str, object]:
+    """Latency distribution, spikes, override counts and failed landings.
+
+    Chunks are read one at a time; only the two latency columns (for the
+    percentiles) and the `top` slowest steps are kept in memory.
+    """
+    ctrl_hist, env_hist = [], []
+    spikes = np.empty(0, dtype=[("ctrl_us", np.float32), ("seed", np.int64), ("step", np.int32)])
+    counts = {name: 0 for name in OVERRIDES}
+    steps = 0
+    for chunk in iter_chunks(prefix, ("ctrl_us", "env_us", "seed", "step", "override")):
+        steps += chunk["ctrl_us"].shape[0]
+        ctrl_hist.append(chunk["ctrl_us"])
+        env_hist.append(chunk["env_us"])
+        worst = np.argsort(-chunk["ctrl_us"])[:top]
+        cand = np.empty(worst.shape[0], dtype=spikes.dtype)
+        cand["ctrl_us"], cand["seed"], cand["step"] = (chunk["ctrl_us"][worst], chunk["seed"][worst],
+                                                       chunk["step"][worst])
+        spikes = np.sort(np.concatenate([spikes, cand]), order="ctrl_us")[::-1][:top]
+        for name, bit in OVERRIDES.items():
+            counts[name] += int(np.count_nonzero(chunk["override"] & bit))
+    ctrl = np.concatenate(ctrl_hist) if ctrl_hist else np.zeros(1)
+    env = np.concatenate(env_hist) if env_hist else np.zeros(1)
+    eps = load_episodes(prefix)
+    failed = ~eps["landed"]
+
+    def dist(a: np.ndarray) -> Dict[str, float]:
+        p = np.percentile(a, [50, 90, 99, 99.9])
+        return {"mean": float(a.mean()), "p50": float(p[0]), "p90": float(p[1]), "p99": float(p[2]),
+                "p99.9": float(p[3]), "max": float(a.max())}
+
+    return {
+        "steps": steps,
+        "episodes": int(eps["seed"].shape[0]),
+        "landed": float(eps["landed"].mean()) if eps["seed"].size else 0.0,
+        "ctrl_us": dist(ctrl),
+        "env_us": dist(env),
+        "spikes": [{"ctrl_us": float(s["ctrl_us"]), "seed": int(s["seed"]), "step": int(s["step"])}
+                   for s in spikes],
+        "override_share": {name: c / max(steps, 1) for name, c in counts.items()},
+        "failed_seeds": eps["seed"][failed][:50].tolist(),
+        "failed_mean_reward": float(eps["reward"][failed].mean()) if failed.any() else 0.0,
+    }
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Per-step telemetry of lander episodes")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    r = sub.add_parser("record", help="Fly episodes and record every step")
+    r.add_argument("prefix", help="Path prefix of the chunk files")
+    r.add_argument("--episodes", type=int, default=100, help="Number of episodes")
+    r.add_argument("--seed", type=int, default=0, help="First seed (seeds are consecutive)")
+    r.add_argument("--max-steps", type=int, default=600, help="Step limit per episode")
+    r.add_argument("--chunk-steps", type=int, default=1 << 16, help="Rows per chunk file")
+    r.add_argument("--compress", action="store_true", help="Compress the chunk files")
+    p = sub.add_parser("report", help="Summarize a recording")
+    p.add_argument("prefix", help="Path prefix of the chunk files")
+    p.add_argument("--top", type=int, default=10, help="Number of latency spikes to list")
+    return parser
+
+
+if __name__ == "__main__":
+    import json
+    args = build_arg_parser().parse_args()
+    if args.cmd == "record":
+        files = record(args.prefix, range(args.seed, args.seed + args.episodes), args.max_steps,
+                       args.chunk_steps, args.compress)
+        print(f"{len(files)} chunk(s) written to {args.prefix}-*.npz")
+    else:
+        print(json.dumps(report(args.prefix, args.top), indent=2))
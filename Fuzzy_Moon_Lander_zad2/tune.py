@@ -0,0 +1,224 @@
+"""
+====================================================================
+STROJENIE FUNKCJI PRZYNALEŻNOŚCI (STRATEGIA EWOLUCYJNA)
+====================================================================
+
+Autorzy: s27433, s28866
+Technologia: Python 3.11, NumPy, Gymnasium, concurrent.futures
+
+--------------------------------------------------------------------
+OPIS:
+--------------------------------------------------------------------
+Wszystkie punkty [a, b, c] funkcji przynależności z `MF_PARAMS` oraz
+ALPHA i DEADZONE tworzą jeden wektor parametrów. Wektor jest
+przeskalowany do kostki [0, 1]^D (granice: uniwersum zmiennej, dla ALPHA
+i DEADZONE stałe przedziały) i optymalizowany strategią ewolucyjną
+(μ/μ_w, λ):
+
+-   z rozkładu N(średnia, σ²) losowanych jest λ kandydatów
+    (przycinanych do kostki, punkty każdego trójkąta sortowane),
+-   każdy kandydat to skompilowany sterownik (`build_controller`)
+    oceniany na tym samym, stałym zbiorze seedów (`evaluate.evaluate`)
+    – kandydaci są rozdzielani między procesy,
+-   nowa średnia to ważona suma μ najlepszych, σ maleje co pokolenie.
+
+Po każdym pokoleniu stan (średnia, σ, stan generatora, najlepszy
+kandydat, historia) jest zapisywany do pliku kontrolnego; ``--resume``
+wznawia od ostatniego pełnego pokolenia z identycznymi wynikami.
+Najlepszy kandydat trafia do pliku konfiguracyjnego JSON, który main.py
+wczytuje przy starcie (CONFIG_PATH).
+
+Przykład:
+
+    python tune.py --generations 40 --popsize 16 --seeds 100 --workers 8
+    python tune.py --resume
+"""
+
+import argparse
+import functools
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+import main
+from evaluate import evaluate
+
+
+# Bounds of the variables (their universes) and of the two constants.
+BOUNDS: Dict[str, Tuple[float, float]] = {
+    'theta':       (-1.8, 1.8),
+    'dtheta':      (-3.5, 3.5),
+    'vx':          (-3.5, 3.5),
+    'vy':          (-7.0, 3.0),
+    'x':           (-1.6, 1.6),
+    'y':           (0.0, 1.6),
+    'main_thrust': (0.0, 1.0),
+    'lat_thrust':  (-1.0, 1.0),
+    'alpha':       (0.05, 1.0),
+    'deadzone':    (0.0, 0.6),
+}
+
+
+class ParamSpace:
+    """Mapping between controller parameters and a vector in [0, 1]^D."""
+
+    def __init__(self, template: Optional[Dict[str, Dict[str, List[float]]]] = None) -> None:
+        template = main.MF_PARAMS if template is None else template
+        self.slots: List[Tuple[str, str]] = [(var, term) for var, terms in template.items() for term in terms]
+        lo, hi = [], []
+        for var, _ in self.slots:
+            lo += [BOUNDS[var][0]] * 3
+            hi += [BOUNDS[var][1]] * 3
+        lo += [BOUNDS['alpha'][0], BOUNDS['deadzone'][0]]
+        hi += [BOUNDS['alpha'][1], BOUNDS['deadzone'][1]]
+        self.lo, self.hi = np.array(lo), np.array(hi)
+
+    @property
+    def dim(self) -> int:
+        return self.lo.shape[0]
+
+    def encode(self, mf: Dict[str, Dict[str, List[float]]], alpha: float, deadzone: float) -> np.ndarray:
+        raw = [v for var, term in self.slots for v in mf[var][term]] + [alpha, deadzone]
+        return np.clip((np.array(raw) - self.lo) / (self.hi - self.lo), 0.0, 1.0)
+
+    def decode(self, u: np.ndarray) -> Tuple[Dict[str, Dict[str, List[float]]], float, float]:
+        """Parameters of point `u` (clipped; each triangle's points sorted)."""
+        raw = self.lo + np.clip(u, 0.0, 1.0) * (self.hi - self.lo)
+        mf: Dict[str, Dict[str, List[float]]] = {}
+        for k, (var, term) in enumerate(self.slots):
+            mf.setdefault(var, {})[term] = sorted(float(v) for v in raw[3 * k:3 * k + 3])
+        return mf, float(raw[-2]), float(raw[-1])
+
+    def repair(self, u: np.ndarray) -> np.ndarray:
+        """Canonical form of `u`: the point that `decode` actually uses."""
+        return self.encode(*self.decode(u))
+
+
+def score_candidate(u: np.ndarray, seeds: Sequence[int], max_steps: int, envs: int) -> Dict[str, float]:
+    """Mean reward and landing rate of candidate `u` over `seeds` (runs in a worker)."""
+    mf, alpha, deadzone = ParamSpace().decode(u)
+    policy = functools.partial(main.fuzzy_action_batch, controller=main.build_controller(mf),
+                               alpha=alpha, deadzone=deadzone)
+    ev = evaluate(seeds, num_envs=envs, mode="sync", max_steps=max_steps, policy=policy)
+    rewards = np.array([e.reward for e in ev.episodes])
+    return {"score": float(rewards.mean()),
+            "landed": float(np.mean([e.landed for e in ev.episodes]))}
+
+
+def _weights(mu: int) -> np.ndarray:
+    w = np.log(mu + 0.5) - np.log(np.arange(1, mu + 1))
+    return w / w.sum()
+
+
+def _save_json(path: str, data: dict) -> None:
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+def write_config(path: str, space: ParamSpace, u: np.ndarray, info: dict) -> None:
+    """Write the controller config of `u` in the format of `main.load_config`."""
+    mf, alpha, deadzone = space.decode(u)
+    _save_json(path, {"mf": mf, "alpha": alpha, "deadzone": deadzone, **info})
+
+
+def tune(checkpoint: str, out: str, generations: int = 30, popsize: int = 16, sigma: float = 0.03,
+         decay: float = 0.95, seeds: Sequence[int] = range(1000, 1100), max_steps: int = 600,
+         envs: int = 50, workers: Optional[int] = None, rng_seed: int = 0, resume: bool = False) -> dict:
+    """Run (or resume) the evolution strategy; returns the final checkpoint state.
+
+    Args:
+        checkpoint: State file, rewritten after every generation.
+        out: Config file with the best candidate so far.
+        generations: Total generations (including those already done when resuming).
+        popsize: Candidates per generation (λ); the best half are recombined.
+        sigma: Initial step size in the unit cube.
+        decay: σ multiplier per generation.
+        seeds: Episode seeds every candidate is scored on.
+        max_steps: Step limit per episode.
+        envs: Vector environments per candidate.
+        workers: Worker processes (default: CPU count).
+        rng_seed: Seed of the sampling generator.
+        resume: Continue from `checkpoint` if it exists.
+    """
+    space = ParamSpace()
+    seeds = list(seeds)
+    settings = {"popsize": popsize, "decay": decay, "seeds": seeds, "max_steps": max_steps,
+                "dim": space.dim}
+    if resume and os.path.exists(checkpoint):
+        with open(checkpoint, "r", encoding="utf-8") as f:
+            state = json.load(f)
+        if state["settings"] != settings:
+            raise ValueError(f"{checkpoint}: inne ustawienia niż w tym uruchomieniu")
+        rng = np.random.default_rng()
+        rng.bit_generator.state = state["rng"]
+    else:
+        rng = np.random.default_rng(rng_seed)
+        state = {"settings": settings, "generation": 0, "sigma": sigma,
+                 "mean": space.encode(main.MF_PARAMS, main.ALPHA, main.DEADZONE).tolist(),
+                 "best": None, "history": []}
+
+    mu = popsize // 2
+    weights = _weights(mu)
+    score = functools.partial(score_candidate, seeds=seeds, max_steps=max_steps, envs=envs)
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+        while state["generation"] < generations:
+            t0 = time.perf_counter()
+            mean = np.array(state["mean"])
+            cands = mean + state["sigma"] * rng.standard_normal((popsize, space.dim))
+            if state["generation"] == 0:
+                cands[0] = mean          # score the hand-tuned controller too
+            cands = np.array([space.repair(c) for c in cands])
+            results = list(pool.map(score, cands))
+            scores = np.array([r["score"] for r in results])
+
+            order = np.argsort(-scores)
+            state["mean"] = (weights @ cands[order[:mu]]).tolist()
+            state["sigma"] *= decay
+            top = order[0]
+            if state["best"] is None or scores[top] > state["best"]["score"]:
+                state["best"] = {"u": cands[top].tolist(), **results[top],
+                                 "generation": state["generation"]}
+            state["generation"] += 1
+            state["history"].append({"generation": state["generation"], "best": float(scores[top]),
+                                     "median": float(np.median(scores)), "sigma": state["sigma"],
+                                     "seconds": time.perf_counter() - t0})
+            state["rng"] = rng.bit_generator.state
+            _save_json(checkpoint, state)
+            best = state["best"]
+            write_config(out, space, np.array(best["u"]),
+                         {"score": best["score"], "landed": best["landed"], "seeds": [seeds[0], seeds[-1]]})
+            print(f"gen {state['generation']:3d}  best {scores[top]:8.2f}  median {np.median(scores):8.2f}  "
+                  f"overall {best['score']:8.2f}  sigma {state['sigma']:.4f}  "
+                  f"{state['history'][-1]['seconds']:.1f} s", flush=True)
+    return state
+
+
+def build_arg_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Tune membership functions, ALPHA and DEADZONE of the lander")
+    parser.add_argument("--generations", type=int, default=30, help="Total generations")
+    parser.add_argument("--popsize", type=int, default=16, help="Candidates per generation")
+    parser.add_argument("--sigma", type=float, default=0.03, help="Initial step size (unit cube)")
+    parser.add_argument("--decay", type=float, default=0.95, help="Step size decay per generation")
+    parser.add_argument("--seeds", type=int, default=100, help="Episodes per candidate")
+    parser.add_argument("--seed-start", type=int, default=1000, help="First episode seed")
+    parser.add_argument("--max-steps", type=int, default=600, help="Step limit per episode")
+    parser.add_argument("--envs", type=int, default=50, help="Vector environments per candidate")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes")
+    parser.add_argument("--rng-seed", type=int, default=0, help="Seed of the search itself")
+    parser.add_argument("--checkpoint", default="tune_checkpoint.json", help="Checkpoint file")
+    parser.add_argument("--out", default=main.CONFIG_PATH, help="Tuned config loaded by main.py")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint")
+    return parser
+
+
+if __name__ == "__main__":
+    args = build_arg_parser().parse_args()
+    tune(args.checkpoint, args.out, args.generations, args.popsize, args.sigma, args.decay,
+         range(args.seed_start, args.seed_start + args.seeds), args.max_steps, args.envs,
+         args.workers, args.rng_seed, args.resume)